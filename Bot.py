@@ -3,12 +3,25 @@ from discord.ext import commands, tasks
 from discord.ui import Button, View, Select, Modal, TextInput
 from discord import app_commands
 import asyncio
+import bisect
+import csv
+import hashlib
 import os
+import re
+import sys
 import json
-from datetime import datetime
+import io
+import math
+import time
+import signal
+import atexit
+from collections import deque
+from datetime import datetime, timedelta
 from typing import Optional
 import uuid
 import random
+import zipfile
+from storage import JournalStore, SQLiteStore, PersistService, SeasonArchive, atomic_write
 
 # ── Oracle AI Agent ───────────────────────────────────────────────────
 try:
@@ -32,6 +45,11 @@ MODERATOR_ROLE_NAME = "KNIGHTS"
 # CRITICAL: Use persistent volume for data storage
 DATA_DIR = os.getenv("DATA_DIR", "/data")
 DATA_FILE = os.path.join(DATA_DIR, "squad_data.json")
+# "json" (snapshot + journal) or "sqlite" (one row per record in DB_FILE)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+DB_FILE = os.path.join(DATA_DIR, "squad_data.db")
+# Deployment-local state, kept out of squad_data so backups don't carry it
+TREE_HASH_FILE = os.path.join(DATA_DIR, ".tree_hash")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Royal color scheme
@@ -143,7 +161,13 @@ GLORY_BASE_WIN = 3
 GLORY_BASE_DRAW = 1
 GLORY_STREAK_BONUS = 1        # 3+ win streak
 GLORY_CLEAN_SHEET_BONUS = 1   # opponent scored 0
-GLORY_EXPECTED_TAX = -1       # beating much weaker team (rank 8+ below)
+GLORY_EXPECTED_TAX = -1       # beating a heavy underdog (won with 85%+ expectation)
+
+# Elo ratings
+ELO_BASE = 1500
+ELO_K = 32
+ELO_K_PROVISIONAL = 48        # faster movement while a squad is still being placed
+ELO_PROVISIONAL_GAMES = 10
 
 # Fun battle quotes
 VICTORY_QUOTES = [
@@ -217,55 +241,164 @@ def _new_squad_entry():
     }
 
 
+if STORAGE_BACKEND == "sqlite":
+    # First start on an empty DB imports squad_data.json (+ journal) once
+    _store = SQLiteStore(DB_FILE, json_path=DATA_FILE)
+else:
+    _store = JournalStore(DATA_FILE)
+_persist = PersistService(_store)
+
+
+def _migrate_registries(data):
+    """Rebuild SQUADS / GUEST_ROLES from data, migrating old layouts in place."""
+    for match in data.get("matches", []):
+        if "team1_participants" not in match:
+            match["team1_participants"] = []
+        if "team2_participants" not in match:
+            match["team2_participants"] = []
+
+    # --- Rebuild SQUADS from data file (single source of truth) ---
+    if "squad_registry" in data:
+        SQUADS.clear()
+        SQUADS.update(data["squad_registry"])
+    else:
+        # Migration: old data without registry
+        SQUADS.clear()
+        SQUADS.update(DEFAULT_SQUADS)
+        for sn, info in data.get("dynamic_squads", {}).items():
+            SQUADS[sn] = info.get("tag", "?")
+        for sn, si in data.get("squads", {}).items():
+            if si.get("disbanded") and sn in SQUADS:
+                del SQUADS[sn]
+        data["squad_registry"] = dict(SQUADS)
+
+    # --- Rebuild GUEST_ROLES from data file ---
+    if "guest_registry" in data:
+        GUEST_ROLES.clear()
+        GUEST_ROLES.update(data["guest_registry"])
+    else:
+        GUEST_ROLES.clear()
+        GUEST_ROLES.update(DEFAULT_GUEST_ROLES)
+        for sn, info in data.get("dynamic_squads", {}).items():
+            if info.get("guest_role"):
+                GUEST_ROLES[sn] = info["guest_role"]
+        for sn, si in data.get("squads", {}).items():
+            if si.get("disbanded") and sn in GUEST_ROLES:
+                del GUEST_ROLES[sn]
+        data["guest_registry"] = dict(GUEST_ROLES)
+
+
+def _migrate_match_history(data):
+    """Squad match_history holds match IDs into data["matches"].
+
+    Older files stored a full copy of every match in both squads' history;
+    replace those copies with their IDs (dropping duplicates). Copies whose
+    match is missing from data["matches"] are backfilled into it first.
+    """
+    def content_key(m):
+        return (m.get("date"), m.get("team1"), m.get("team2"), m.get("score"))
+
+    # Pre-ID records get a stable ID first so their history copies resolve to them
+    unnamed = {}
+    for m in data.setdefault("matches", []):
+        if not m.get("match_id"):
+            m["match_id"] = unnamed.setdefault(content_key(m), str(uuid.uuid4())[:8])
+    known = {m["match_id"] for m in data["matches"]}
+    backfill = []
+    converted = 0
+    for si in data.get("squads", {}).values():
+        ids, seen = [], set()
+        for entry in si.get("match_history", []):
+            if isinstance(entry, dict):
+                match, entry = entry, entry.get("match_id")
+                converted += 1
+                if not entry:
+                    # Pre-ID copy — both squads held one, so key it by its contents
+                    entry = unnamed.setdefault(content_key(match), str(uuid.uuid4())[:8])
+                if entry not in known:
+                    known.add(entry)
+                    backfill.append(dict(match, match_id=entry))
+            if entry and entry not in seen:
+                seen.add(entry)
+                ids.append(entry)
+        si["match_history"] = ids
+    if backfill:
+        data["matches"].extend(backfill)
+        data["matches"].sort(key=lambda m: m.get("date") or "")
+        print(f"🧹 Backfilled {len(backfill)} matches found only in squad history")
+    if converted:
+        print(f"🧹 Replaced {converted} duplicated match copies with ID references")
+
+
+# Match result enum (match["result"]), relative to team1
+RESULT_T1, RESULT_T2, RESULT_DRAW = "t1", "t2", "draw"
+
+
+def parse_match_score(match):
+    """Store the parsed "X-Y" score as match["s1"]/["s2"] plus match["result"]."""
+    try:
+        s1, s2 = map(int, str(match.get("score", "")).split('-'))
+    except:
+        match["s1"] = match["s2"] = match["result"] = None
+        return match
+    match["s1"], match["s2"] = s1, s2
+    match["result"] = RESULT_T1 if s1 > s2 else RESULT_T2 if s2 > s1 else RESULT_DRAW
+    return match
+
+
+def match_outcome(match, squad_name):
+    """"W", "L" or "D" for squad_name in match, or None if the score is unreadable."""
+    if "result" not in match:
+        parse_match_score(match)
+    r = match["result"]
+    if r is None:
+        return None
+    if r == RESULT_DRAW:
+        return "D"
+    return "W" if (r == RESULT_T1) == (match["team1"] == squad_name) else "L"
+
+
+def _migrate_match_scores(data):
+    """Backfill parsed scores on matches recorded before they were stored."""
+    todo = [m for m in data.get("matches", []) if "result" not in m]
+    for m in todo:
+        parse_match_score(m)
+    if todo:
+        print(f"🔢 Parsed scores for {len(todo)} matches")
+
+
+def _migrate_season(data):
+    """Open season 1 for files from before seasons, starting at the first match."""
+    if "season" in data:
+        return
+    days = [m["date"] for m in data.get("matches", []) if m.get("date")]
+    data["season"] = {"number": len(data.get("seasons", [])) + 1,
+                      "started": min(days) if days else datetime.utcnow().isoformat()}
+    print(f"🗓️ Opened season {data['season']['number']}")
+
+
 def load_data():
     global ALL_TAGS
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            for match in data.get("matches", []):
-                if "team1_participants" not in match:
-                    match["team1_participants"] = []
-                if "team2_participants" not in match:
-                    match["team2_participants"] = []
-
-            # --- Rebuild SQUADS from data file (single source of truth) ---
-            if "squad_registry" in data:
-                SQUADS.clear()
-                SQUADS.update(data["squad_registry"])
-            else:
-                # Migration: old data without registry
-                SQUADS.clear()
-                SQUADS.update(DEFAULT_SQUADS)
-                for sn, info in data.get("dynamic_squads", {}).items():
-                    SQUADS[sn] = info.get("tag", "?")
-                for sn, si in data.get("squads", {}).items():
-                    if si.get("disbanded") and sn in SQUADS:
-                        del SQUADS[sn]
-                data["squad_registry"] = dict(SQUADS)
-
-            # --- Rebuild GUEST_ROLES from data file ---
-            if "guest_registry" in data:
-                GUEST_ROLES.clear()
-                GUEST_ROLES.update(data["guest_registry"])
-            else:
-                GUEST_ROLES.clear()
-                GUEST_ROLES.update(DEFAULT_GUEST_ROLES)
-                for sn, info in data.get("dynamic_squads", {}).items():
-                    if info.get("guest_role"):
-                        GUEST_ROLES[sn] = info["guest_role"]
-                for sn, si in data.get("squads", {}).items():
-                    if si.get("disbanded") and sn in GUEST_ROLES:
-                        del GUEST_ROLES[sn]
-                data["guest_registry"] = dict(GUEST_ROLES)
-
-            # Ensure every active squad has a data entry
-            for sn in list(SQUADS.keys()):
-                if sn not in data["squads"]:
-                    data["squads"][sn] = _new_squad_entry()
+    # Snapshot + journal (falling back to the newest valid generation), or SQLite
+    data = _store.load()
+    if data is not None:
+        _migrate_registries(data)
+        _migrate_match_history(data)
+        _migrate_match_scores(data)
+        _migrate_season(data)
+
+        # Ensure every active squad has a data entry
+        for sn in list(SQUADS.keys()):
+            if sn not in data["squads"]:
+                data["squads"][sn] = _new_squad_entry()
+        # List-typed keys exist in the snapshot, so journaled appends land on a list
+        for key in ("predictions", "events", "challenges"):
+            data.setdefault(key, [])
+        data.setdefault("bounties", {})
 
-            ALL_TAGS = list(SQUADS.values())
-            save_data(data)
-            return data
+        ALL_TAGS = list(SQUADS.values())
+        save_data(data)
+        return data
 
     # First run — seed from defaults
     SQUADS.clear()
@@ -276,8 +409,10 @@ def load_data():
 
     data = {
         "squads": {}, "players": {}, "matches": [],
+        "predictions": [], "events": [], "challenges": [], "bounties": {},
         "squad_registry": dict(SQUADS),
         "guest_registry": dict(GUEST_ROLES),
+        "season": {"number": 1, "started": datetime.utcnow().isoformat()},
     }
     for sn in SQUADS:
         data["squads"][sn] = _new_squad_entry()
@@ -285,9 +420,35 @@ def load_data():
     return data
 
 
-def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, indent=2, fp=f, ensure_ascii=False)
+def save_data(data, *paths):
+    """Persist squad_data.
+
+    With paths (tuples like ("squads", name) or ("matches", idx)) only those
+    entries are appended to the journal. Without paths a full snapshot is
+    written and the journal is compacted. Writes are coalesced and done on
+    a worker thread — call _persist.flush() / flush_async() to wait for them.
+    """
+    if not paths or any(p[0] in ("squads", "squad_registry") for p in paths):
+        invalidate_ranking()
+    if not paths:
+        invalidate_report()
+        rebuild_squad_aggregates(data)
+    for p in paths:
+        if p[0] == "squads":
+            invalidate_report(p[1] if len(p) > 1 else None)
+            if len(p) > 1:
+                refresh_squad_aggregate(data, p[1])
+            else:
+                rebuild_squad_aggregates(data)
+    _persist.mark(data, paths)
+
+
+def _list_path(key, item):
+    """Journal path for an entry of a top-level list (events, challenges)."""
+    for i, x in enumerate(squad_data.get(key, [])):
+        if x is item:
+            return (key, i)
+    return (key,)
 
 
 def init_squad_data(squad_name):
@@ -330,7 +491,9 @@ async def add_new_squad(guild, squad_name: str, tag: str, guest_role_name: str =
     squad_data["guest_registry"] = dict(GUEST_ROLES)
 
     init_squad_data(squad_name)
-    save_data(squad_data)
+    save_data(squad_data, ("squads", squad_name), ("squad_registry",), ("guest_registry",))
+    invalidate_squad_roles()
+    mark_squad_nicks_dirty(guild, squad_name)
 
     return squad_role, guest_role
 
@@ -343,6 +506,7 @@ async def remove_existing_squad(guild, squad_name: str, delete_roles: bool = Tru
         # Delete squad role
         role = discord.utils.get(guild.roles, name=squad_name)
         if role:
+            mark_nick_dirty(guild, [m.id for m in role.members])
             try:
                 await role.delete(reason=f"Majestic Dominion: Kingdom '{squad_name}' disbanded")
             except:
@@ -359,9 +523,14 @@ async def remove_existing_squad(guild, squad_name: str, delete_roles: bool = Tru
                     pass
 
     # Remove from runtime dicts
+    if squad_name in SQUADS:
+        _retired_tags.add(SQUADS[squad_name])
+    if not delete_roles:
+        mark_squad_nicks_dirty(guild, squad_name)
     SQUADS.pop(squad_name, None)
     GUEST_ROLES.pop(squad_name, None)
     ALL_TAGS = list(SQUADS.values())
+    invalidate_squad_roles()
 
     # Persist registries (single source of truth)
     squad_data["squad_registry"] = dict(SQUADS)
@@ -371,10 +540,659 @@ async def remove_existing_squad(guild, squad_name: str, delete_roles: bool = Tru
     if squad_name in squad_data["squads"]:
         squad_data["squads"][squad_name]["disbanded"] = True
 
+    save_data(squad_data, ("squads", squad_name), ("squad_registry",), ("guest_registry",))
+
+
+# -------------------- MATCH INDEXES --------------------
+# In-memory indexes over squad_data["matches"]. Rebuilt after load,
+# /restore and squad renames, kept current by add_match_record() /
+# remove_match_record() through _index_match() / _unindex_match().
+# Anything else that rewrites the list calls mark_match_index_dirty().
+_match_pos = {}  # match_id → position in squad_data["matches"]
+_match_index = {"dirty": True}
+# (squad, player_id) → {"wins", "draws", "losses", "matches": [match_id, ...]}
+# player_id None holds the squad's matches recorded without a roster,
+# which count for every member (same rule get_player_stats always used).
+_player_idx = {}
+# (squad_a, squad_b) sorted pair → {"wins": {a: n, b: n}, "draws": n, "matches": [match_id, ...]}
+_h2h = {}
+
+
+def _player_keys(m):
+    for team, side in ((m["team1"], "team1_participants"), (m["team2"], "team2_participants")):
+        parts = m.get(side) or []
+        if parts:
+            for p in parts:
+                yield team, (team, str(p))
+        else:
+            yield team, (team, None)
+
+
+def _h2h_key(sq1, sq2):
+    return (sq1, sq2) if sq1 <= sq2 else (sq2, sq1)
+
+
+def _index_match(m):
+    _count_match(m, 1)
+    _bucket_match(m)
+    mid = m.get("match_id")
+    key = _h2h_key(m["team1"], m["team2"])
+    pair = _h2h.setdefault(key, {"wins": {key[0]: 0, key[1]: 0}, "draws": 0, "matches": []})
+    pair["matches"].append(mid)
+    outcome = match_outcome(m, m["team1"])
+    if outcome == "W": pair["wins"][m["team1"]] += 1
+    elif outcome == "L": pair["wins"][m["team2"]] += 1
+    elif outcome == "D": pair["draws"] += 1
+    for team, key in _player_keys(m):
+        b = _player_idx.setdefault(key, {"wins": 0, "draws": 0, "losses": 0, "matches": []})
+        b["matches"].append(mid)
+        outcome = match_outcome(m, team)
+        if outcome == "W": b["wins"] += 1
+        elif outcome == "L": b["losses"] += 1
+        elif outcome == "D": b["draws"] += 1
+
+
+def _unindex_match(m):
+    _count_match(m, -1)
+    _unbucket_match(m)
+    mid = m.get("match_id")
+    pair = _h2h.get(_h2h_key(m["team1"], m["team2"]))
+    if pair:
+        if mid in pair["matches"]:
+            pair["matches"].remove(mid)
+        outcome = match_outcome(m, m["team1"])
+        if outcome == "W": pair["wins"][m["team1"]] -= 1
+        elif outcome == "L": pair["wins"][m["team2"]] -= 1
+        elif outcome == "D": pair["draws"] -= 1
+    for team, key in _player_keys(m):
+        b = _player_idx.get(key)
+        if not b:
+            continue
+        for k in range(len(b["matches"]) - 1, -1, -1):
+            if b["matches"][k] == mid:
+                del b["matches"][k]
+                break
+        outcome = match_outcome(m, team)
+        if outcome == "W": b["wins"] -= 1
+        elif outcome == "L": b["losses"] -= 1
+        elif outcome == "D": b["draws"] -= 1
+
+
+def rebuild_match_indexes():
+    _match_pos.clear()
+    _player_idx.clear()
+    _h2h.clear()
+    _reset_match_aggregates()
+    _day_matches.clear()
+    _day_keys.clear()
+    for i, m in enumerate(squad_data["matches"]):
+        if m.get("match_id"):
+            _match_pos[m["match_id"]] = i
+        _index_match(m)
+    _match_index["dirty"] = False
+    rebuild_ratings()
+    rebuild_streaks()
+    invalidate_report()
+
+
+def mark_match_index_dirty():
+    """The match list changed outside the helpers — rebuild on the next lookup miss."""
+    _match_index["dirty"] = True
+
+
+# -------------------- RATINGS --------------------
+# Elo ratings replayed from squad_data["matches"] in order. _rating_deltas
+# runs parallel to the match list so deleting match i only has to unwind
+# and replay matches i..end instead of the whole history.
+_ratings = {}        # team → {"rating": float, "games": int}
+_rating_deltas = []  # per match: (team1 delta, team2 delta, counted)
+
+
+def expected_score(r1, r2):
+    """Chance (draws counted as half) that a side rated r1 beats one rated r2."""
+    return 1 / (1 + 10 ** ((r2 - r1) / 400))
+
+
+def get_rating(team):
+    r = _ratings.get(team)
+    return r["rating"] if r else ELO_BASE
+
+
+def get_rating_games(team):
+    r = _ratings.get(team)
+    return r["games"] if r else 0
+
+
+def _k_factor(entry):
+    return ELO_K_PROVISIONAL if entry["games"] < ELO_PROVISIONAL_GAMES else ELO_K
+
+
+def _rate_match(m):
+    outcome = match_outcome(m, m["team1"])
+    if outcome is None or m["team1"] == m["team2"]:
+        _rating_deltas.append((0.0, 0.0, False))
+        return
+    a = _ratings.setdefault(m["team1"], {"rating": float(ELO_BASE), "games": 0})
+    b = _ratings.setdefault(m["team2"], {"rating": float(ELO_BASE), "games": 0})
+    s1 = 1.0 if outcome == "W" else 0.5 if outcome == "D" else 0.0
+    e1 = expected_score(a["rating"], b["rating"])
+    d1 = _k_factor(a) * (s1 - e1)
+    d2 = _k_factor(b) * ((1 - s1) - (1 - e1))
+    a["rating"] += d1; a["games"] += 1
+    b["rating"] += d2; b["games"] += 1
+    _rating_deltas.append((d1, d2, True))
+
+
+def _unrate_match(m, delta):
+    d1, d2, counted = delta
+    if not counted:
+        return
+    for team, d in ((m["team1"], d1), (m["team2"], d2)):
+        r = _ratings[team]
+        r["rating"] -= d
+        r["games"] -= 1
+
+
+def rebuild_ratings():
+    """Replay the season's matches on top of the ratings carried into it."""
+    _ratings.clear()
+    _rating_deltas.clear()
+    for team, r in squad_data.get("season", {}).get("base_ratings", {}).items():
+        _ratings[team] = dict(r)
+    for m in squad_data["matches"]:
+        _rate_match(m)
+
+
+def _rerate_after_removal(idx, removed):
+    """Undo matches idx..end (removed sat at idx), then replay the survivors."""
+    matches = squad_data["matches"]
+    if len(_rating_deltas) != len(matches) + 1:
+        return rebuild_ratings()
+    for j in range(len(matches), idx, -1):
+        _unrate_match(matches[j - 1], _rating_deltas[j])
+    _unrate_match(removed, _rating_deltas[idx])
+    del _rating_deltas[idx:]
+    for m in matches[idx:]:
+        _rate_match(m)
+
+
+# -------------------- STREAK TRACKER --------------------
+# Per-squad ring buffer of the last RESULT_BUFFER results ("W"/"D"/"L",
+# oldest first) plus the current streak, pushed as matches are added.
+# A deletion only re-reads the tail of that squad's history. The hottest
+# win / loss streak leaders are kept as matches come in; a missing entry in
+# _streak_leaders means "rescan on next read".
+RESULT_BUFFER = 10
+_STREAK_NAMES = {"W": "win", "L": "loss", "D": "draw"}
+_recent = {}          # squad → deque(maxlen=RESULT_BUFFER)
+_streaks = {}         # squad → {"type": "win"/"loss"/"draw", "count": n}
+_streak_leaders = {}  # "win"/"loss" → squad name or None
+
+
+def _touch_leaders(squad):
+    cs = _streaks.get(squad)
+    for kind in ("win", "loss"):
+        if kind not in _streak_leaders:
+            continue
+        leader = _streak_leaders[kind]
+        if cs and cs["type"] == kind and (leader is None or leader == squad
+                                          or cs["count"] > _streaks[leader]["count"]):
+            _streak_leaders[kind] = squad
+        elif leader == squad:
+            del _streak_leaders[kind]
+
+
+def _push_result(squad, outcome):
+    _recent.setdefault(squad, deque(maxlen=RESULT_BUFFER)).append(outcome)
+    kind = _STREAK_NAMES[outcome]
+    cs = _streaks.get(squad)
+    if cs and cs["type"] == kind:
+        cs["count"] += 1
+    else:
+        _streaks[squad] = {"type": kind, "count": 1}
+    _touch_leaders(squad)
+
+
+def _push_match_results(m):
+    for team in (m["team1"], m["team2"]):
+        outcome = match_outcome(m, team)
+        if outcome:
+            _push_result(team, outcome)
+
+
+def _rebuild_squad_tail(squad):
+    """Re-read squad's history from the newest match back, only as far as the
+    ring buffer and the current streak need."""
+    history = squad_data["squads"].get(squad, {}).get("match_history", [])
+    tail, streak_type, streak, streak_open = [], None, 0, True
+    for k in range(len(history) - 1, -1, -1):
+        m = find_match_by_id(history[k])[1]
+        outcome = match_outcome(m, squad) if m else None
+        if not outcome:
+            continue
+        if len(tail) < RESULT_BUFFER:
+            tail.append(outcome)
+        if streak_open:
+            if streak_type in (None, outcome):
+                streak_type, streak = outcome, streak + 1
+            else:
+                streak_open = False
+        if not streak_open and len(tail) >= RESULT_BUFFER:
+            break
+    _recent[squad] = deque(reversed(tail), maxlen=RESULT_BUFFER)
+    if streak_type:
+        _streaks[squad] = {"type": _STREAK_NAMES[streak_type], "count": streak}
+    else:
+        _streaks.pop(squad, None)
+    # Streaks can only shrink on delete — let the leaders rescan
+    _streak_leaders.clear()
+
+
+def rebuild_streaks():
+    _recent.clear()
+    _streaks.clear()
+    _streak_leaders.clear()
+    for m in squad_data["matches"]:
+        _push_match_results(m)
+
+
+def get_recent_results(squad, n=RESULT_BUFFER):
+    """Last n (≤ RESULT_BUFFER) results as "W"/"D"/"L", oldest first."""
+    buf = _recent.get(squad)
+    if not buf:
+        return []
+    return list(buf)[-n:]
+
+
+def streak_leader(kind):
+    """(squad, count) holding the longest current "win" or "loss" streak, or (None, 0)."""
+    if kind not in _streak_leaders:
+        best, best_n = None, 0
+        for sn, cs in _streaks.items():
+            if cs["type"] == kind and cs["count"] > best_n:
+                best, best_n = sn, cs["count"]
+        _streak_leaders[kind] = best
+    leader = _streak_leaders[kind]
+    return (leader, _streaks[leader]["count"]) if leader else (None, 0)
+
+
+# -------------------- RANKING CACHE --------------------
+# Sorted standings + name → rank, rebuilt lazily after invalidate_ranking().
+# Call it whenever points/W/D/L, disband flags or SQUADS change; save_data()
+# also does for any squad save as a safety net.
+_ranking_cache = {"table": None, "rank": {}}
+
+
+def invalidate_ranking():
+    _ranking_cache["table"] = None
+
+
+# -------------------- REALM AGGREGATES --------------------
+# Realm-wide numbers for fun stats, news and the daily / weekly posts,
+# maintained on write so none of them rescan the archive:
+#   match counters move with _index_match() / _unindex_match();
+#   squad totals are diffed in from save_data() squad paths;
+#   records (best streak, most active, most achievements) follow the same
+#   lazy-leader rule as the streak tracker.
+_realm = {
+    "matches": 0, "draws": 0,
+    "per_week": {},   # "YYYY-Www" (ISO week) → matches
+    "day_wins": {},   # "YYYY-MM-DD" → {squad: wins}
+    "day_played": {}, # "YYYY-MM-DD" → {squad: matches}
+    "points": 0, "wins": 0, "losses": 0,
+}
+_squad_contrib = {}   # squad → {"points", "wins", "losses", "played", "best_streak", "achievements"}
+_realm_records = {}   # "best_streak" / "played" / "achievements" → squad name or None
+REALM_RECORDS = ("best_streak", "played", "achievements")
+
+
+def _bump(d, key, n):
+    d[key] = d.get(key, 0) + n
+    if not d[key]:
+        del d[key]
+
+
+def _count_match(m, sign):
+    _realm["matches"] += sign
+    outcome = match_outcome(m, m["team1"])
+    if outcome == "D":
+        _realm["draws"] += sign
+    day = (m.get("date") or "")[:10]
+    try:
+        year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+    except ValueError:
+        return
+    _bump(_realm["per_week"], f"{year}-W{week:02d}", sign)
+    winner = m["team1"] if outcome == "W" else m["team2"] if outcome == "L" else None
+    for key, teams in (("day_played", (m["team1"], m["team2"])), ("day_wins", (winner,) if winner else ())):
+        for team in teams:
+            tally = _realm[key].setdefault(day, {})
+            _bump(tally, team, sign)
+            if not tally:
+                del _realm[key][day]
+
+
+def _reset_match_aggregates():
+    _realm.update(matches=0, draws=0, per_week={}, day_wins={}, day_played={})
+
+
+def refresh_squad_aggregate(data, name):
+    """Swap one squad's previous contribution to the realm totals for its current one."""
+    old = _squad_contrib.pop(name, None)
+    if old:
+        for k in ("points", "wins", "losses"):
+            _realm[k] -= old[k]
+    sd = data["squads"].get(name)
+    new = None
+    if sd is not None:
+        w, d, l = sd.get("wins", 0), sd.get("draws", 0), sd.get("losses", 0)
+        new = _squad_contrib[name] = {
+            "points": sd.get("points", 0), "wins": w, "losses": l, "played": w + d + l,
+            "best_streak": sd.get("biggest_win_streak", 0),
+            "achievements": len(sd.get("achievements", [])),
+        }
+        for k in ("points", "wins", "losses"):
+            _realm[k] += new[k]
+    for key in REALM_RECORDS:
+        if key not in _realm_records:
+            continue
+        holder = _realm_records[key]
+        if holder == name and (not new or new[key] < old[key]):
+            del _realm_records[key]
+        elif new and new[key] > 0 and (holder is None or new[key] > _squad_contrib[holder][key]):
+            _realm_records[key] = name
+
+
+def rebuild_squad_aggregates(data):
+    _squad_contrib.clear()
+    _realm_records.clear()
+    _realm.update(points=0, wins=0, losses=0)
+    for name in data["squads"]:
+        refresh_squad_aggregate(data, name)
+
+
+def realm_record(key):
+    """(squad, value) holding a REALM_RECORDS record, or (None, 0)."""
+    if key not in _realm_records:
+        best, best_n = None, 0
+        for name, c in _squad_contrib.items():
+            if c[key] > best_n:
+                best, best_n = name, c[key]
+        _realm_records[key] = best
+    holder = _realm_records[key]
+    return (holder, _squad_contrib[holder][key]) if holder else (None, 0)
+
+
+def matches_on(day):
+    """Number of matches recorded on a date (datetime or "YYYY-MM-DD")."""
+    if not isinstance(day, str):
+        day = day.strftime("%Y-%m-%d")
+    return len(_day_matches.get(day, ()))
+
+
+def recent_day_keys(days, now=None):
+    now = now or datetime.utcnow()
+    return [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def _tally_last_days(key, days, now):
+    totals = {}
+    for day in recent_day_keys(days, now):
+        for sq, n in _realm[key].get(day, {}).items():
+            totals[sq] = totals.get(sq, 0) + n
+    return totals
+
+
+def wins_in_last_days(days, now=None):
+    """{squad: wins} over the last `days` calendar days, today included."""
+    return _tally_last_days("day_wins", days, now)
+
+
+def played_in_last_days(days, now=None):
+    """{squad: matches played} over the last `days` calendar days, today included."""
+    return _tally_last_days("day_played", days, now)
+
+
+# -------------------- TIME INDEX --------------------
+# Matches bucketed by UTC day. _day_keys stays sorted so a date window is
+# two bisects plus the matches inside it: O(log days + k).
+_day_matches = {}  # "YYYY-MM-DD" → [match_id, ...] in record order
+_day_keys = []
+
+
+def _match_day(m):
+    day = (m.get("date") or "")[:10]
+    try:
+        datetime.strptime(day, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return day
+
+
+def _bucket_match(m):
+    day = _match_day(m)
+    if not day or not m.get("match_id"):
+        return
+    bucket = _day_matches.get(day)
+    if bucket is None:
+        bucket = _day_matches[day] = []
+        bisect.insort(_day_keys, day)
+    bucket.append(m["match_id"])
+
+
+def _unbucket_match(m):
+    day = _match_day(m)
+    bucket = _day_matches.get(day)
+    if not bucket or m.get("match_id") not in bucket:
+        return
+    for k in range(len(bucket) - 1, -1, -1):
+        if bucket[k] == m["match_id"]:
+            del bucket[k]
+            break
+    if not bucket:
+        del _day_matches[day]
+        del _day_keys[bisect.bisect_left(_day_keys, day)]
+
+
+def matches_between(start=None, end=None):
+    """Matches from day `start` up to (not including) day `end`, oldest first.
+
+    Bounds are datetimes or "YYYY-MM-DD" strings; None leaves that side open."""
+    if start is not None and not isinstance(start, str):
+        start = start.strftime("%Y-%m-%d")
+    if end is not None and not isinstance(end, str):
+        end = end.strftime("%Y-%m-%d")
+    lo = bisect.bisect_left(_day_keys, start) if start else 0
+    hi = bisect.bisect_left(_day_keys, end) if end else len(_day_keys)
+    out = []
+    for day in _day_keys[lo:hi]:
+        for mid in _day_matches[day]:
+            m = find_match_by_id(mid)[1]
+            if m:
+                out.append(m)
+    return out
+
+
+def current_season_start():
+    """Start of the running season, or None when no season has been opened."""
+    started = squad_data.get("season", {}).get("started")
+    try:
+        return datetime.fromisoformat(started) if started else None
+    except ValueError:
+        return None
+
+
+PERIODS = {"week": "This Week", "month": "This Month", "season": "This Season"}
+
+
+def period_start(period, now=None):
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "week":
+        return today - timedelta(days=today.weekday())
+    if period == "month":
+        return today.replace(day=1)
+    return current_season_start()
+
+
+def period_summary(period, now=None):
+    """Matches, draws, wins and activity per squad for a PERIODS window."""
+    matches = matches_between(period_start(period, now))
+    wins, played, draws = {}, {}, 0
+    for m in matches:
+        outcome = match_outcome(m, m["team1"])
+        for team in (m["team1"], m["team2"]):
+            played[team] = played.get(team, 0) + 1
+        if outcome == "D":
+            draws += 1
+        elif outcome:
+            w = m["team1"] if outcome == "W" else m["team2"]
+            wins[w] = wins.get(w, 0) + 1
+    return {"matches": matches, "draws": draws, "wins": wins, "played": played}
+
+
+# -------------------- REPORT CACHE --------------------
+# generate_squad_report() results per squad. A squad's report is dropped
+# when its entry is saved (stats, streak, roster, achievements) or it plays
+# a match; everything goes on a full save, a match delete (ratings replay)
+# or an index rebuild.
+_report_cache = {}
+
+
+def invalidate_report(squad_name=None):
+    if squad_name is None:
+        _report_cache.clear()
+    else:
+        _report_cache.pop(squad_name, None)
+
+
+# -------------------- SEASONS --------------------
+# squad_data only carries the running season: its matches, predictions and
+# standings. close_season() freezes the table into squad_data["seasons"] and
+# moves the season's matches + predictions into a gzipped file under
+# DATA_DIR/seasons, read back only when someone opens that season. Elo
+# ratings carry over as the next season's base_ratings.
+SEASON_CACHE_SIZE = 3
+_season_archive = SeasonArchive(os.path.join(DATA_DIR, "seasons"))
+_season_cache = {}  # number → archived document, least recently read first
+
+
+def current_season_number():
+    return squad_data.get("season", {}).get("number", 1)
+
+
+def season_summary(number):
+    """Frozen standings of a closed season, or None."""
+    return next((s for s in squad_data.get("seasons", []) if s["number"] == number), None)
+
+
+def load_season(number):
+    """Archived document of a closed season (matches, predictions, standings), or None."""
+    doc = _season_cache.pop(number, None)
+    if doc is None:
+        try:
+            doc = _season_archive.load(number)
+        except Exception as e:
+            print(f"⚠️ Season {number} archive unreadable: {e}")
+            return None
+        if doc is None:
+            return None
+    _season_cache[number] = doc
+    while len(_season_cache) > SEASON_CACHE_SIZE:
+        _season_cache.pop(next(iter(_season_cache)))
+    return doc
+
+
+def full_match_archive():
+    """Every match on record, oldest season first. Reads every archive."""
+    out = []
+    for s in squad_data.get("seasons", []):
+        doc = _season_cache.get(s["number"]) or _season_archive.load(s["number"])
+        if doc:
+            out.extend(doc.get("matches", []))
+    out.extend(squad_data["matches"])
+    return out
+
+
+# Backups are a zip: the live document plus every closed season's archive
+BACKUP_DATA_NAME = "squad_data.json"
+
+
+def build_backup_zip(raw, numbers):
+    """(zip bytes, season numbers with no archive on disk). File work only — runs off the loop."""
+    buf, missing = io.BytesIO(), []
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(BACKUP_DATA_NAME, raw)
+        for number in numbers:
+            gz = _season_archive.read_raw(number)
+            if gz is None:
+                missing.append(number)
+                continue
+            zf.writestr(f"seasons/{os.path.basename(_season_archive.path(number))}", gz,
+                        compress_type=zipfile.ZIP_STORED)  # already gzipped
+    return buf.getvalue(), missing
+
+
+def read_backup(file_bytes, filename):
+    """(data, {season number: archive bytes}) from a .zip backup or a plain .json one."""
+    if not filename.lower().endswith(".zip"):
+        return json.loads(file_bytes.decode("utf-8")), {}
+    archives = {}
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as zf:
+        data = json.loads(zf.read(BACKUP_DATA_NAME).decode("utf-8"))
+        for name in zf.namelist():
+            number = SeasonArchive.number_of(name)
+            if number is not None:
+                archives[number] = zf.read(name)
+    return data, archives
+
+
+def restore_season_archives(archives, seasons):
+    """Write backed-up season archives to disk. Returns closed seasons still without one."""
+    for number, raw in sorted(archives.items()):
+        try:
+            _season_archive.write_raw(number, raw)
+        except Exception as e:
+            print(f"⚠️ Season {number} archive in backup is unreadable: {e}")
+    _season_cache.clear()
+    on_disk = set(_season_archive.numbers())
+    return [s["number"] for s in seasons if s["number"] not in on_disk]
+
+
+def close_season(now=None):
+    """Freeze the standings, archive the season's matches and open the next season."""
+    now = now or datetime.utcnow()
+    season = squad_data.setdefault("season", {"number": 1, "started": None})
+    number = season.get("number", 1)
+    standings = [dict(s, rating=round(get_rating(s["name"]), 1)) for s in get_squad_ranking()]
+    champion = standings[0]["name"] if standings and standings[0]["total_matches"] else None
+    summary = {"number": number, "started": season.get("started"), "ended": now.isoformat(),
+               "match_count": len(squad_data["matches"]), "champion": champion, "standings": standings}
+    # Archive first: if anything below fails, closing again rewrites the same file
+    _season_archive.write(number, dict(summary, matches=squad_data["matches"],
+                                       predictions=squad_data.get("predictions", []),
+                                       base_ratings=season.get("base_ratings", {})))
+    carry = {team: dict(r) for team, r in _ratings.items()}
+
+    squad_data.setdefault("seasons", []).append(summary)
+    squad_data["matches"] = []
+    squad_data["predictions"] = []
+    squad_data["bounties"] = {}
+    # Season standings reset; career records (best streaks, titles, achievements) stay
+    for si in squad_data["squads"].values():
+        si.update({"wins": 0, "draws": 0, "losses": 0, "points": 0, "match_history": [],
+                   "current_streak": {"type": "none", "count": 0}})
+        si.pop("adjust", None)
+    squad_data["season"] = {"number": number + 1, "started": now.isoformat(), "base_ratings": carry}
+    _season_cache.pop(number, None)
+    rebuild_match_indexes()
+    invalidate_ranking()
     save_data(squad_data)
+    return summary
 
 
 squad_data = load_data()
+rebuild_match_indexes()
 
 # ── Initialize Oracle AI Agent ────────────────────────────────────────
 oracle = None
@@ -430,7 +1248,7 @@ async def cache_transparent_logo(guild):
         if msg.attachments:
             _transparent_logo_url = msg.attachments[0].url
             squad_data["_transparent_logo_url"] = _transparent_logo_url
-            save_data(squad_data)
+            save_data(squad_data, ("_transparent_logo_url",))
             print("✅ Transparent logo cached for embeds")
     except Exception as e:
         print(f"⚠️ Could not cache logo: {e}")
@@ -465,11 +1283,26 @@ async def log_action(guild: discord.Guild, title: str, description: str):
 
 
 # -------------------- HELPERS --------------------
+_retired_tags = set()  # tags renamed or removed since startup — still stripped from nicks
+# One compiled "^(?:(?:TAG1|TAG2|...) )+" for ALL_TAGS + _retired_tags, rebuilt
+# when either changes (ALL_TAGS is always replaced, never mutated in place)
+_tag_stripper = {"tags": None, "retired": None, "re": None}
+
+
+def _tag_pattern():
+    c = _tag_stripper
+    if c["tags"] is not ALL_TAGS or c["retired"] != _retired_tags:
+        # Longest first so "SAT2" isn't cut as "SAT" + "2"
+        tags = sorted({t for t in ALL_TAGS if t} | {t for t in _retired_tags if t}, key=len, reverse=True)
+        c["re"] = re.compile("^(?:(?:" + "|".join(map(re.escape, tags)) + ") )+") if tags else None
+        c["tags"], c["retired"] = ALL_TAGS, set(_retired_tags)
+    return c["re"]
+
+
 def remove_all_tags(name):
-    for tag in ALL_TAGS:
-        if name.startswith(f"{tag} "):
-            return name[len(f"{tag} "):]
-    return name
+    """name without its leading squad tags (stacked or repeated ones too)."""
+    pattern = _tag_pattern()
+    return pattern.sub("", name, count=1) if pattern else name
 
 
 def is_leader(member):
@@ -480,12 +1313,45 @@ def is_moderator(member):
     return any(role.name == MODERATOR_ROLE_NAME for role in member.roles)
 
 
+# Per-guild squad role index: guild id → {role id: squad name}. Built on
+# first use from one pass over the guild's roles; dropped on role
+# create/update/delete and whenever the squad registry changes.
+_squad_roles = {}
+
+
+def invalidate_squad_roles(guild=None):
+    if guild is None:
+        _squad_roles.clear()
+    else:
+        _squad_roles.pop(guild.id, None)
+
+
+def squad_role_index(guild):
+    idx = _squad_roles.get(guild.id)
+    if idx is None:
+        first = {}
+        for role in guild.roles:
+            first.setdefault(role.name, role.id)  # discord.utils.get picks the first match
+        idx = _squad_roles[guild.id] = {first[n]: n for n in SQUADS if n in first}
+    return idx
+
+
 def get_member_squad(member, guild):
-    for role_name, tag in SQUADS.items():
-        role = discord.utils.get(guild.roles, name=role_name)
-        if role and role in member.roles:
-            return role, tag
-    return None, None
+    idx = squad_role_index(guild)
+    hits = [rid for rid in member._roles if rid in idx]
+    if any(idx[rid] not in SQUADS for rid in hits):
+        # Registry changed under the index (e.g. a rename without a role edit)
+        invalidate_squad_roles(guild)
+        idx = squad_role_index(guild)
+        hits = [rid for rid in member._roles if rid in idx]
+    if not hits:
+        return None, None
+    if len(hits) > 1:
+        # Several squad roles: same pick as registry order
+        order = {n: i for i, n in enumerate(SQUADS)}
+        hits.sort(key=lambda rid: order[idx[rid]])
+    role = guild.get_role(hits[0])
+    return (role, SQUADS[idx[hits[0]]]) if role else (None, None)
 
 
 def get_leaders_for_squad(guild, squad_role):
@@ -495,16 +1361,16 @@ def get_leaders_for_squad(guild, squad_role):
     return [m.display_name for m in leader_role.members if squad_role in m.roles]
 
 
-async def safe_nick_update(member, role, tag):
+def desired_nick(member, role, tag):
     clean = remove_all_tags(member.display_name)
-    desired = f"{tag} {clean}" if role else clean
-    if member.display_name == desired:
-        return
-    try:
-        await member.edit(nick=desired)
-        await asyncio.sleep(0.4)
-    except:
-        pass
+    return f"{tag} {clean}" if role else clean
+
+
+async def safe_nick_update(member, role, tag):
+    """Queue a nick edit if member's nick doesn't match their squad (see NICKNAME SYNC)."""
+    desired = desired_nick(member, role, tag)
+    if member.display_name != desired:
+        queue_nick_edit(member, desired)
 
 
 def update_player_squad(player_id, new_squad=None, old_squad=None):
@@ -521,10 +1387,12 @@ def update_player_squad(player_id, new_squad=None, old_squad=None):
             player_data["squad_history"] = []
         player_data["squad_history"].append(entry)
     player_data["squad"] = new_squad
-    save_data(squad_data)
+    save_data(squad_data, ("players", player_key))
 
 
 def get_squad_ranking():
+    if _ranking_cache["table"] is not None:
+        return list(_ranking_cache["table"])
     rankings = []
     for squad_name, data in squad_data["squads"].items():
         if squad_name not in SQUADS or data.get("disbanded"):
@@ -539,71 +1407,118 @@ def get_squad_ranking():
     sorted_r = sorted(rankings, key=lambda x: x["points"], reverse=True)
     for i, s in enumerate(sorted_r, 1):
         s["rank"] = i
-    return sorted_r
+    _ranking_cache["table"] = sorted_r
+    _ranking_cache["rank"] = {s["name"]: s["rank"] for s in sorted_r}
+    return list(sorted_r)
 
 
 def get_squad_rank(squad_name):
-    for s in get_squad_ranking():
-        if s["name"] == squad_name:
-            return s["rank"]
-    return None
+    if _ranking_cache["table"] is None:
+        get_squad_ranking()
+    return _ranking_cache["rank"].get(squad_name)
 
 
-def get_player_stats(player_id):
+def get_player_stats(player_id, form_len=5):
     player_key = str(player_id)
     player_data = squad_data["players"].get(player_key)
     if not player_data:
         return None
     matches_played = wins = losses = draws = 0
+    form_ids = []
     squad_name = player_data.get("squad")
     if squad_name and squad_name != "Free Agent":
-        for match in squad_data["matches"]:
-            if match["team1"] == squad_name:
-                participants = match.get("team1_participants", [])
-            elif match["team2"] == squad_name:
-                participants = match.get("team2_participants", [])
-            else:
+        for key in ((squad_name, player_key), (squad_name, None)):
+            b = _player_idx.get(key)
+            if not b:
                 continue
-            if not participants or player_id in participants:
-                matches_played += 1
-                try:
-                    s1, s2 = map(int, match["score"].split('-'))
-                    if match["team1"] == squad_name:
-                        if s1 > s2: wins += 1
-                        elif s2 > s1: losses += 1
-                        else: draws += 1
-                    else:
-                        if s2 > s1: wins += 1
-                        elif s1 > s2: losses += 1
-                        else: draws += 1
-                except:
-                    pass
+            matches_played += len(b["matches"])
+            wins += b["wins"]; losses += b["losses"]; draws += b["draws"]
+            form_ids += b["matches"][-form_len:]
+    # Last N across both buckets, oldest first
+    form_ids.sort(key=lambda mid: _match_pos.get(mid, -1))
+    form = [match_outcome(find_match_by_id(mid)[1], squad_name) for mid in form_ids[-form_len:]]
     return {"matches_played": matches_played, "wins": wins, "losses": losses, "draws": draws,
-            "win_rate": (wins / matches_played * 100) if matches_played > 0 else 0}
+            "win_rate": (wins / matches_played * 100) if matches_played > 0 else 0,
+            "form": [r for r in form if r]}
 
 
 def find_match_by_id(match_id):
-    for i, match in enumerate(squad_data["matches"]):
-        if match.get("match_id") == match_id:
-            return i, match
-    return None, None
+    i = _match_pos.get(match_id)
+    matches = squad_data["matches"]
+    if i is None or i >= len(matches) or matches[i].get("match_id") != match_id:
+        if i is None and not _match_index["dirty"]:
+            return None, None
+        rebuild_match_indexes()
+        i = _match_pos.get(match_id)
+        if i is None:
+            return None, None
+    return i, matches[i]
+
+
+def get_squad_history(squad_name, last=None):
+    """Resolve a squad's match_history IDs to match records (oldest first)."""
+    ids = squad_data["squads"].get(squad_name, {}).get("match_history", [])
+    if last is not None:
+        ids = ids[-last:] if last else []
+    if not ids:
+        return []
+    found = []
+    for mid in ids:
+        _, m = find_match_by_id(mid)
+        if m is not None:
+            found.append(m)
+    return found
+
+
+def add_match_record(match_data):
+    """Store a new match once and reference it from both squads' history."""
+    parse_match_score(match_data)
+    squad_data["matches"].append(match_data)
+    _match_pos[match_data["match_id"]] = len(squad_data["matches"]) - 1
+    _index_match(match_data)
+    if len(_rating_deltas) == len(squad_data["matches"]) - 1:
+        _rate_match(match_data)
+    else:
+        rebuild_ratings()
+    _push_match_results(match_data)
+    invalidate_report(match_data["team1"])
+    invalidate_report(match_data["team2"])
+    for team in (match_data["team1"], match_data["team2"]):
+        squad_data["squads"].setdefault(team, _new_squad_entry()).setdefault(
+            "match_history", []).append(match_data["match_id"])
+
+
+def remove_match_record(match_id):
+    """Remove a match and its history references. Returns the record or None."""
+    idx, match = find_match_by_id(match_id)
+    if match is None:
+        return None
+    matches = squad_data["matches"]
+    matches.pop(idx)
+    del _match_pos[match_id]
+    _unindex_match(match)
+    _rerate_after_removal(idx, match)
+    invalidate_report()
+    forget_prediction(match_id)
+    for j in range(idx, len(matches)):
+        mid = matches[j].get("match_id")
+        if mid:
+            _match_pos[mid] = j
+    for team in (match["team1"], match["team2"]):
+        history = squad_data["squads"].get(team, {}).get("match_history", [])
+        # Deleted matches are almost always recent — search from the end
+        for k in range(len(history) - 1, -1, -1):
+            if history[k] == match_id:
+                del history[k]
+                break
+        _rebuild_squad_tail(team)
+    return match
 
 
 def get_squad_mood(squad_name):
-    squad_info = squad_data["squads"].get(squad_name, {})
-    recent_matches = squad_info.get("match_history", [])[-5:]
-    if len(recent_matches) < 3:
+    recent_results = get_recent_results(squad_name, 5)
+    if len(recent_results) < 3:
         return SQUAD_MOODS["steady"]
-    recent_results = []
-    for match in recent_matches:
-        try:
-            s1, s2 = map(int, match["score"].split('-'))
-            if match["team1"] == squad_name:
-                recent_results.append("W" if s1 > s2 else "L" if s1 < s2 else "D")
-            else:
-                recent_results.append("W" if s2 > s1 else "L" if s2 < s1 else "D")
-        except:
-            pass
     w = recent_results.count("W")
     l = recent_results.count("L")
     if w >= 4: return SQUAD_MOODS["fire"]
@@ -628,43 +1543,67 @@ def update_streak(squad_name, result):
     return cs
 
 
+def _achievement_keys(si):
+    """ACHIEVEMENTS keys the squad stats in si qualify for right now."""
+    keys = []
+    if si["wins"] == 1:
+        keys.append("first_blood")
+    if si["points"] >= 100:
+        keys.append("century_club")
+    cs = si.get("current_streak", {})
+    if cs.get("type") == "win" and cs.get("count") == 10:
+        keys.append("perfect_10")
+    if cs.get("type") == "win" and cs.get("count") == 5:
+        keys.append("undefeated_5")
+    if si["wins"] + si["draws"] + si["losses"] >= 50:
+        keys.append("warrior_50")
+    if si.get("championship_wins", 0) >= 1:
+        keys.append("champion")
+    return keys
+
+
 def check_achievements(squad_name):
     si = squad_data["squads"][squad_name]
     achievements = si.get("achievements", [])
     new_ach = []
-    if si["wins"] == 1 and "first_blood" not in achievements:
-        achievements.append("first_blood"); new_ach.append(ACHIEVEMENTS["first_blood"])
-    if si["points"] >= 100 and "century_club" not in achievements:
-        achievements.append("century_club"); new_ach.append(ACHIEVEMENTS["century_club"])
-    cs = si.get("current_streak", {})
-    if cs.get("type") == "win" and cs.get("count") == 10 and "perfect_10" not in achievements:
-        achievements.append("perfect_10"); new_ach.append(ACHIEVEMENTS["perfect_10"])
-    if cs.get("type") == "win" and cs.get("count") == 5 and "undefeated_5" not in achievements:
-        achievements.append("undefeated_5"); new_ach.append(ACHIEVEMENTS["undefeated_5"])
-    total = si["wins"] + si["draws"] + si["losses"]
-    if total >= 50 and "warrior_50" not in achievements:
-        achievements.append("warrior_50"); new_ach.append(ACHIEVEMENTS["warrior_50"])
-    if si.get("championship_wins", 0) >= 1 and "champion" not in achievements:
-        achievements.append("champion"); new_ach.append(ACHIEVEMENTS["champion"])
+    for key in _achievement_keys(si):
+        if key not in achievements:
+            achievements.append(key); new_ach.append(ACHIEVEMENTS[key])
     si["achievements"] = achievements
     return new_ach
 
 
 def get_head_to_head(sq1, sq2):
-    h2h = {"squad1_wins": 0, "squad2_wins": 0, "draws": 0, "total": 0}
-    for m in squad_data["matches"]:
-        if (m["team1"] == sq1 and m["team2"] == sq2) or (m["team1"] == sq2 and m["team2"] == sq1):
-            h2h["total"] += 1
-            s1, s2 = map(int, m["score"].split('-'))
-            if m["team1"] == sq1:
-                if s1 > s2: h2h["squad1_wins"] += 1
-                elif s2 > s1: h2h["squad2_wins"] += 1
-                else: h2h["draws"] += 1
-            else:
-                if s2 > s1: h2h["squad1_wins"] += 1
-                elif s1 > s2: h2h["squad2_wins"] += 1
-                else: h2h["draws"] += 1
-    return h2h
+    pair = _h2h.get(_h2h_key(sq1, sq2))
+    if not pair or not pair["matches"]:
+        return {"squad1_wins": 0, "squad2_wins": 0, "draws": 0, "total": 0, "last_match": None}
+    return {"squad1_wins": pair["wins"].get(sq1, 0), "squad2_wins": pair["wins"].get(sq2, 0),
+            "draws": pair["draws"], "total": len(pair["matches"]),
+            "last_match": find_match_by_id(pair["matches"][-1])[1]}
+
+
+def get_all_rivalries(min_matches=2):
+    """Every active pairing with at least min_matches meetings, most played first."""
+    rivalries = []
+    for (a, b), pair in _h2h.items():
+        total = len(pair["matches"])
+        if total < min_matches or a not in SQUADS or b not in SQUADS:
+            continue
+        wa, wb = pair["wins"][a], pair["wins"][b]
+        rivalries.append({"squad1": a, "squad2": b, "squad1_wins": wa, "squad2_wins": wb,
+                          "draws": pair["draws"], "total": total,
+                          "balance": 1 - abs(wa - wb) / total})
+    rivalries.sort(key=lambda r: (r["total"], r["balance"]), reverse=True)
+    return rivalries
+
+
+def get_biggest_rival(squad_name):
+    """Opponent squad_name has met most often, or None."""
+    best, best_n = None, 0
+    for (a, b), pair in _h2h.items():
+        if squad_name in (a, b) and a != b and len(pair["matches"]) > best_n:
+            best, best_n = (b if a == squad_name else a), len(pair["matches"])
+    return best
 
 
 def get_match_participants(squad_name):
@@ -674,29 +1613,8 @@ def get_match_participants(squad_name):
 
 
 def recalculate_streak(squad_name):
-    history = squad_data["squads"][squad_name].get("match_history", [])
-    if not history:
-        return {"type": "none", "count": 0}
-    results = []
-    for m in history:
-        try:
-            s1, s2 = map(int, m["score"].split('-'))
-            if m["team1"] == squad_name:
-                results.append("win" if s1 > s2 else "loss" if s1 < s2 else "draw")
-            else:
-                results.append("win" if s2 > s1 else "loss" if s2 < s1 else "draw")
-        except:
-            pass
-    if not results:
-        return {"type": "none", "count": 0}
-    ct = results[-1]
-    count = 1
-    for i in range(len(results) - 2, -1, -1):
-        if results[i] == ct:
-            count += 1
-        else:
-            break
-    return {"type": ct, "count": count}
+    cs = _streaks.get(squad_name)
+    return dict(cs) if cs else {"type": "none", "count": 0}
 
 
 # -------------------- SMART MEMBER SEARCH --------------------
@@ -800,83 +1718,49 @@ GUEST_QUOTES = [
 #                     AI ENGINE — Prediction & Intelligence
 # =====================================================================
 
-def predict_match(team1: str, team2: str):
-    """AI match prediction based on multiple factors. Returns dict with analysis."""
-    t1d = squad_data["squads"].get(team1, {})
-    t2d = squad_data["squads"].get(team2, {})
-
-    # Factor 1: Win Rate (weight: 35%)
-    t1_total = t1d.get("wins", 0) + t1d.get("draws", 0) + t1d.get("losses", 0)
-    t2_total = t2d.get("wins", 0) + t2d.get("draws", 0) + t2d.get("losses", 0)
-    t1_wr = (t1d.get("wins", 0) / t1_total * 100) if t1_total > 0 else 50
-    t2_wr = (t2d.get("wins", 0) / t2_total * 100) if t2_total > 0 else 50
+def elo_split(r1, r2, draw_base=30, draw_floor=5):
+    """(team1 %, draw %, team2 %) from two ratings.
 
-    # Factor 2: Head-to-Head (weight: 25%)
-    h2h = get_head_to_head(team1, team2)
-    if h2h["total"] > 0:
-        t1_h2h = (h2h["squad1_wins"] / h2h["total"]) * 100
-        t2_h2h = (h2h["squad2_wins"] / h2h["total"]) * 100
-    else:
-        t1_h2h = 50
-        t2_h2h = 50
-
-    # Factor 3: Current Form — last 5 matches (weight: 25%)
-    def get_form_score(squad_name):
-        history = squad_data["squads"].get(squad_name, {}).get("match_history", [])[-5:]
-        if not history:
-            return 50
-        score = 0
-        for i, m in enumerate(history):
-            weight = 1 + (i * 0.2)  # Recent matches weighted more
-            try:
-                s1, s2 = map(int, m["score"].split('-'))
-                if m["team1"] == squad_name:
-                    score += (20 * weight) if s1 > s2 else (5 * weight) if s1 == s2 else 0
-                else:
-                    score += (20 * weight) if s2 > s1 else (5 * weight) if s1 == s2 else 0
-            except:
-                pass
-        return min(score / len(history) * 5, 100)
-
-    t1_form = get_form_score(team1)
-    t2_form = get_form_score(team2)
-
-    # Factor 4: Momentum / Streak (weight: 15%)
-    t1_cs = t1d.get("current_streak", {"type": "none", "count": 0})
-    t2_cs = t2d.get("current_streak", {"type": "none", "count": 0})
+    Elo expectation splits the decisive share; closeness sets the draw chance."""
+    t1_pct = round(expected_score(r1, r2) * 100)
+    t2_pct = 100 - t1_pct
+    diff = abs(t1_pct - t2_pct)
+    draw_pct = max(draw_floor, draw_base - diff)
+    t1_pct = round(t1_pct * (100 - draw_pct) / 100)
+    t2_pct = 100 - t1_pct - draw_pct
+    return t1_pct, draw_pct, t2_pct
 
-    def streak_score(cs):
-        if cs["type"] == "win": return min(50 + cs["count"] * 10, 100)
-        elif cs["type"] == "loss": return max(50 - cs["count"] * 10, 0)
-        return 50
 
-    t1_streak = streak_score(t1_cs)
-    t2_streak = streak_score(t2_cs)
+def build_squad_features(names=None):
+    """Per-squad prediction inputs, computed once so a whole slate can reuse them.
 
-    # Factor 5: Roster completeness bonus
-    t1_roster = 10 if len(t1d.get("main_roster", [])) == 5 else 0
-    t2_roster = 10 if len(t2d.get("main_roster", [])) == 5 else 0
+    Names that aren't squads (solo/team event entrants) get neutral values."""
+    if names is None:
+        names = squad_data["squads"].keys()
+    features = {}
+    for name in names:
+        if name in features:
+            continue
+        sd = squad_data["squads"].get(name, {})
+        total = sd.get("wins", 0) + sd.get("draws", 0) + sd.get("losses", 0)
+        features[name] = {
+            "total": total,
+            "wr": (sd.get("wins", 0) / total * 100) if total > 0 else 50,
+            "rating": get_rating(name),
+            "cs": sd.get("current_streak", {"type": "none", "count": 0}),
+        }
+    return features
 
-    # Weighted composite score
-    t1_score = (t1_wr * 0.35) + (t1_h2h * 0.25) + (t1_form * 0.25) + (t1_streak * 0.15) + t1_roster
-    t2_score = (t2_wr * 0.35) + (t2_h2h * 0.25) + (t2_form * 0.25) + (t2_streak * 0.15) + t2_roster
 
-    # Normalize to percentages
-    total_score = t1_score + t2_score
-    if total_score > 0:
-        t1_pct = round(t1_score / total_score * 100)
-        t2_pct = 100 - t1_pct
-    else:
-        t1_pct = t2_pct = 50
+def _predict_pair(team1, team2, f1, f2):
+    """Score one fixture from precomputed features. Odds come from the Elo ratings."""
+    t1_wr, t2_wr = f1["wr"], f2["wr"]
+    h2h = get_head_to_head(team1, team2)
 
-    # Draw probability based on how close the scores are
-    diff = abs(t1_pct - t2_pct)
-    draw_pct = max(5, 30 - diff)
-    t1_pct = round(t1_pct * (100 - draw_pct) / 100)
-    t2_pct = 100 - t1_pct - draw_pct
+    t1_pct, draw_pct, t2_pct = elo_split(f1["rating"], f2["rating"])
 
     # Confidence level
-    data_points = t1_total + t2_total + h2h["total"]
+    data_points = f1["total"] + f2["total"] + h2h["total"]
     if data_points >= 20: confidence = "🟢 HIGH"
     elif data_points >= 8: confidence = "🟡 MEDIUM"
     else: confidence = "🔴 LOW"
@@ -894,6 +1778,7 @@ def predict_match(team1: str, team2: str):
         narrative = f"**{team2}** has a slight edge, but **{team1}** could easily pull off an upset. This one's unpredictable!"
 
     # Key factors text
+    t1_cs, t2_cs = f1["cs"], f2["cs"]
     factors = []
     if h2h["total"] > 0:
         factors.append(f"⚔️ H2H: {h2h['squad1_wins']}-{h2h['draws']}-{h2h['squad2_wins']} ({h2h['total']} meetings)")
@@ -905,6 +1790,7 @@ def predict_match(team1: str, team2: str):
         factors.append(f"{se} {team2} on a **{t2_cs['count']} {t2_cs['type']}** streak")
     if t1_wr > 0 or t2_wr > 0:
         factors.append(f"📊 Win Rates: {t1_wr:.0f}% vs {t2_wr:.0f}%")
+    factors.append(f"📈 Ratings: {f1['rating']:.0f} vs {f2['rating']:.0f}")
 
     return {
         "t1_pct": t1_pct, "t2_pct": t2_pct, "draw_pct": draw_pct,
@@ -913,7 +1799,194 @@ def predict_match(team1: str, team2: str):
     }
 
 
+def predict_fixtures(fixtures, features=None):
+    """Predict a whole slate of (team1, team2) fixtures in one pass.
+
+    Squad features are built once for every name on the slate; pass `features`
+    to reuse a set across several slates."""
+    fixtures = list(fixtures)
+    if features is None:
+        features = build_squad_features({t for pair in fixtures for t in pair})
+    return [_predict_pair(t1, t2, features[t1], features[t2]) for t1, t2 in fixtures]
+
+
+def predict_match(team1: str, team2: str):
+    """AI match prediction based on multiple factors. Returns dict with analysis."""
+    return predict_fixtures([(team1, team2)])[0]
+
+
+def scheduled_fixtures():
+    """(challenger, challenged) pairs for every scheduled challenge."""
+    return [(c["challenger"], c["challenged"]) for c in squad_data.get("challenges", [])
+            if c.get("status") == "scheduled"]
+
+
+def format_prediction_line(team1, team2, pred):
+    """One-line slate entry: favourite, split and confidence."""
+    fav = team1 if pred["t1_pct"] >= pred["t2_pct"] else team2
+    return (f"**{team1}** vs **{team2}** — 👑 {fav} "
+            f"({pred['t1_pct']}/{pred['draw_pct']}/{pred['t2_pct']}) {pred['confidence']}")
+
+
+def build_prediction_slate_embed(title, fixtures, limit=15):
+    """Embed listing predictions for a fixture list, computed as one batch."""
+    fixtures = list(fixtures)
+    embed = discord.Embed(title=title, color=ROYAL_PURPLE)
+    if not fixtures:
+        embed.description = "*No fixtures to predict.*"
+    else:
+        preds = predict_fixtures(fixtures[:limit])
+        lines = [format_prediction_line(t1, t2, p) for (t1, t2), p in zip(fixtures, preds)]
+        if len(fixtures) > limit:
+            lines.append(f"*…and {len(fixtures) - limit} more*")
+        embed.description = "\n".join(lines)
+        embed.set_footer(text="Split shown as win / draw / win %")
+    apply_branding(embed, thumbnail=True)
+    return embed
+
+
+# -------------------- PREDICTION TRACKER & BACKTEST --------------------
+# Every pre-match prediction is archived in squad_data["predictions"] with
+# the result it was judged against. backtest() replays the match archive
+# (every season) through a rating model (the live Elo config by default)
+# and scores it.
+OUTCOMES = ("t1", "draw", "t2")
+
+
+def _match_outcome_key(match):
+    return {"W": "t1", "D": "draw", "L": "t2"}.get(match_outcome(match, match["team1"]))
+
+
+def _favourite(probs):
+    return max(OUTCOMES, key=lambda k: probs[k])
+
+
+def log_prediction(match, pred):
+    """Archive the pre-match prediction for a recorded match. Returns its save path."""
+    outcome = _match_outcome_key(match)
+    probs = {"t1": pred["t1_pct"] / 100, "draw": pred["draw_pct"] / 100, "t2": pred["t2_pct"] / 100}
+    log = squad_data.setdefault("predictions", [])
+    log.append({
+        "match_id": match.get("match_id"), "team1": match["team1"], "team2": match["team2"],
+        "date": match.get("date"), "probs": probs, "outcome": outcome,
+        "correct": outcome is not None and _favourite(probs) == outcome,
+    })
+    return ("predictions", len(log) - 1)
+
+
+def forget_prediction(match_id):
+    """Drop the archived prediction for a deleted match."""
+    log = squad_data.get("predictions", [])
+    for k in range(len(log) - 1, -1, -1):
+        if log[k].get("match_id") == match_id:
+            del log[k]
+            return True
+    return False
+
+
+def score_predictions(rows):
+    """Brier score, log-loss and accuracy for (probs, outcome) pairs."""
+    rows = [(p, o) for p, o in rows if o in OUTCOMES]
+    if not rows:
+        return {"n": 0, "brier": None, "log_loss": None, "accuracy": None}
+    brier = log_loss = hits = 0.0
+    for probs, outcome in rows:
+        brier += sum((probs[k] - (1.0 if k == outcome else 0.0)) ** 2 for k in OUTCOMES)
+        log_loss -= math.log(max(probs[outcome], 1e-6))
+        hits += _favourite(probs) == outcome
+    n = len(rows)
+    return {"n": n, "brier": brier / n, "log_loss": log_loss / n, "accuracy": hits / n}
+
+
+class EloModel:
+    """Replayable Elo predictor. Defaults mirror the live rating config."""
+
+    def __init__(self, k=ELO_K, k_provisional=ELO_K_PROVISIONAL,
+                 provisional_games=ELO_PROVISIONAL_GAMES, draw_base=30, draw_floor=5):
+        self.k, self.k_provisional, self.provisional_games = k, k_provisional, provisional_games
+        self.draw_base, self.draw_floor = draw_base, draw_floor
+        self.ratings = {}
+
+    @property
+    def label(self):
+        return (f"Elo k={self.k}/{self.k_provisional} (<{self.provisional_games} games), "
+                f"draw {self.draw_base}/{self.draw_floor}")
+
+    def _entry(self, team):
+        return self.ratings.setdefault(team, {"rating": float(ELO_BASE), "games": 0})
+
+    def predict(self, team1, team2):
+        t1, d, t2 = elo_split(self._entry(team1)["rating"], self._entry(team2)["rating"],
+                              self.draw_base, self.draw_floor)
+        return {"t1": t1 / 100, "draw": d / 100, "t2": t2 / 100}
+
+    def update(self, match, outcome):
+        if outcome is None or match["team1"] == match["team2"]:
+            return
+        a, b = self._entry(match["team1"]), self._entry(match["team2"])
+        s1 = {"t1": 1.0, "draw": 0.5, "t2": 0.0}[outcome]
+        e1 = expected_score(a["rating"], b["rating"])
+        ka = self.k_provisional if a["games"] < self.provisional_games else self.k
+        kb = self.k_provisional if b["games"] < self.provisional_games else self.k
+        a["rating"] += ka * (s1 - e1); a["games"] += 1
+        b["rating"] -= kb * (s1 - e1); b["games"] += 1
+
+
+def backtest(model=None, matches=None):
+    """Replay matches in order, predicting each before the model sees its result."""
+    model = model or EloModel()
+    matches = full_match_archive() if matches is None else matches
+    rows = []
+    predict_s = update_s = 0.0
+    started = time.perf_counter()
+    for m in matches:
+        outcome = _match_outcome_key(m)
+        t0 = time.perf_counter()
+        probs = model.predict(m["team1"], m["team2"])
+        t1 = time.perf_counter()
+        model.update(m, outcome)
+        update_s += time.perf_counter() - t1
+        predict_s += t1 - t0
+        rows.append((probs, outcome))
+    report = score_predictions(rows)
+    report.update({
+        "model": getattr(model, "label", type(model).__name__), "matches": len(matches),
+        "total_ms": (time.perf_counter() - started) * 1000,
+        "predict_us": predict_s / max(len(matches), 1) * 1e6,
+        "update_us": update_s / max(len(matches), 1) * 1e6,
+    })
+    return report
+
+
+def archive_report():
+    """Score the live predictions archived at record time."""
+    log = squad_data.get("predictions", [])
+    report = score_predictions([(e["probs"], e.get("outcome")) for e in log])
+    report.update({"model": "live archive", "matches": len(log)})
+    return report
+
+
+def format_backtest_report(report):
+    if not report["n"]:
+        return f"**{report['model']}** — no scored matches yet."
+    lines = [f"**{report['model']}** — {report['n']} scored / {report['matches']} matches",
+             f"Brier: **{report['brier']:.4f}** · Log-loss: **{report['log_loss']:.4f}** · "
+             f"Accuracy: **{report['accuracy'] * 100:.1f}%**"]
+    if "total_ms" in report:
+        lines.append(f"⏱️ {report['total_ms']:.1f} ms total · {report['predict_us']:.1f} µs/predict · "
+                     f"{report['update_us']:.1f} µs/update")
+    return "\n".join(lines)
+
+
 def generate_squad_report(squad_name: str):
+    """AI intelligence report for a squad, served from the report cache."""
+    report = _report_cache.get(squad_name)
+    if report is None:
+        report = _report_cache[squad_name] = _build_squad_report(squad_name)
+    return report
+
+
+def _build_squad_report(squad_name):
     """Generate an AI intelligence report for a squad."""
     si = squad_data["squads"].get(squad_name, {})
     w, d, l = si.get("wins", 0), si.get("draws", 0), si.get("losses", 0)
@@ -922,9 +1995,9 @@ def generate_squad_report(squad_name: str):
 
     report = {"strengths": [], "weaknesses": [], "threat_level": 0, "form_trend": "", "rival": None, "insights": []}
 
-    # Threat Level (0-100)
-    rank = get_squad_rank(squad_name) or len(SQUADS)
-    rank_score = max(0, 100 - (rank - 1) * (100 / len(SQUADS)))
+    # Threat Level (0-100) — rating score is the chance of beating a base-rated squad
+    rating = get_rating(squad_name)
+    rating_score = expected_score(rating, ELO_BASE) * 100
     wr_score = wr
     cs = si.get("current_streak", {"type": "none", "count": 0})
     momentum = 10 if cs.get("type") == "win" else -10 if cs.get("type") == "loss" else 0
@@ -932,8 +2005,9 @@ def generate_squad_report(squad_name: str):
     roster_bonus = 15 if len(si.get("main_roster", [])) == 5 else 0
     title_bonus = min(si.get("championship_wins", 0) * 5, 15)
 
-    threat = min(100, max(0, int(rank_score * 0.4 + wr_score * 0.3 + momentum + roster_bonus + title_bonus)))
+    threat = min(100, max(0, int(rating_score * 0.4 + wr_score * 0.3 + momentum + roster_bonus + title_bonus)))
     report["threat_level"] = threat
+    report["rating"] = rating
 
     # Threat Tier
     if threat >= 85: report["threat_tier"] = ("☠️ LETHAL", "Extremely dangerous — approach with caution!")
@@ -943,20 +2017,10 @@ def generate_squad_report(squad_name: str):
     else: report["threat_tier"] = ("🌱 EMERGING", "Early stages — potential yet to be unlocked")
 
     # Form Trend (last 10 vs previous 10)
-    history = si.get("match_history", [])
+    history = get_recent_results(squad_name, 10)
     if len(history) >= 10:
-        def count_wins(matches, sn):
-            wins = 0
-            for m in matches:
-                try:
-                    s1, s2 = map(int, m["score"].split('-'))
-                    if (m["team1"] == sn and s1 > s2) or (m["team2"] == sn and s2 > s1):
-                        wins += 1
-                except:
-                    pass
-            return wins
-        recent_wins = count_wins(history[-5:], squad_name)
-        older_wins = count_wins(history[-10:-5], squad_name)
+        recent_wins = history[-5:].count("W")
+        older_wins = history[-10:-5].count("W")
         if recent_wins > older_wins + 1:
             report["form_trend"] = "📈 **ASCENDING** — Performance is improving rapidly!"
         elif recent_wins < older_wins - 1:
@@ -987,16 +2051,14 @@ def generate_squad_report(squad_name: str):
     if not report["weaknesses"]: report["weaknesses"].append("✨ No major weaknesses detected!")
 
     # Find biggest rival (most matches played against)
-    rival_counts = {}
-    for m in history:
-        opponent = m["team2"] if m["team1"] == squad_name else m["team1"]
-        rival_counts[opponent] = rival_counts.get(opponent, 0) + 1
-    if rival_counts:
-        rival_name = max(rival_counts, key=rival_counts.get)
+    rival_name = get_biggest_rival(squad_name)
+    if rival_name:
         h2h = get_head_to_head(squad_name, rival_name)
         report["rival"] = {"name": rival_name, "matches": h2h["total"], "h2h": h2h}
 
     # Fun insights
+    if get_rating_games(squad_name):
+        report["insights"].append(f"📈 Elo rating: **{rating:.0f}**")
     if total > 0:
         report["insights"].append(f"🎯 Point efficiency: **{si.get('points', 0) / total:.1f}** pts per match")
     if si.get("biggest_win_streak", 0) > 0:
@@ -1017,26 +2079,17 @@ def generate_realm_news():
     if matches:
         last = matches[-1]
         t1, t2, score = last["team1"], last["team2"], last["score"]
-        try:
-            s1, s2 = map(int, score.split('-'))
-            if s1 > s2:
-                headlines.append(f"⚔️ **{SQUADS.get(t1, "?")} {t1}** triumphs over **{SQUADS.get(t2, "?")} {t2}** ({score}) in the latest battle!")
-            elif s2 > s1:
-                headlines.append(f"⚔️ **{SQUADS.get(t2, "?")} {t2}** triumphs over **{SQUADS.get(t1, "?")} {t1}** ({score}) in the latest battle!")
-            else:
-                headlines.append(f"⚖️ **{SQUADS.get(t1, "?")} {t1}** and **{SQUADS.get(t2, "?")} {t2}** battle to a stalemate ({score})!")
-        except:
-            pass
+        outcome = match_outcome(last, t1)
+        if outcome == "W":
+            headlines.append(f"⚔️ **{SQUADS.get(t1, "?")} {t1}** triumphs over **{SQUADS.get(t2, "?")} {t2}** ({score}) in the latest battle!")
+        elif outcome == "L":
+            headlines.append(f"⚔️ **{SQUADS.get(t2, "?")} {t2}** triumphs over **{SQUADS.get(t1, "?")} {t1}** ({score}) in the latest battle!")
+        elif outcome == "D":
+            headlines.append(f"⚖️ **{SQUADS.get(t1, "?")} {t1}** and **{SQUADS.get(t2, "?")} {t2}** battle to a stalemate ({score})!")
 
     # 2. Hottest streak in the realm
-    hottest_name, hottest_count = None, 0
-    coldest_name, coldest_count = None, 0
-    for sn, d in squad_data["squads"].items():
-        cs = d.get("current_streak", {"type": "none", "count": 0})
-        if cs.get("type") == "win" and cs.get("count", 0) > hottest_count:
-            hottest_name, hottest_count = sn, cs["count"]
-        if cs.get("type") == "loss" and cs.get("count", 0) > coldest_count:
-            coldest_name, coldest_count = sn, cs["count"]
+    hottest_name, hottest_count = streak_leader("win")
+    coldest_name, coldest_count = streak_leader("loss")
 
     if hottest_name and hottest_count >= 2:
         headlines.append(f"🔥 **{SQUADS.get(hottest_name, "?")} {hottest_name}** blazes with a ROYAL **{hottest_count}-win streak**! Who dares challenge the throne?")
@@ -1070,15 +2123,15 @@ def generate_realm_news():
             headlines.append(f"⚔️ Royal Rivalry: **{SQUADS.get(hottest_pair[0], '?')} {hottest_pair[0]}** vs **{SQUADS.get(hottest_pair[1], '?')} {hottest_pair[1]}** — {matchup_counts[hottest_pair]} clashes in the royal arena!")
 
     # 6. Random fun fact
-    total_matches = len(matches)
+    total_matches = _realm["matches"]
     total_players = len([p for p in squad_data["players"].values() if p.get("ingame_name")])
     fun_facts = [
-        f"📊 The Dominion has witnessed **{total_matches}** royal battles in the chronicles!",
+        f"📊 The Dominion has witnessed **{total_matches}** royal battles this season!",
         f"🗡️ **{total_players}** warriors have sworn their oath to the Crown!",
         f"🏰 **{len(SQUADS)}** kingdoms vie for sovereign dominion!",
     ]
     if total_matches > 0:
-        total_draws = sum(1 for m in matches if len(set(m["score"].split('-'))) == 1)
+        total_draws = _realm["draws"]
         fun_facts.append(f"🤝 **{total_draws}** battles ended in a royal stalemate ({total_draws/total_matches*100:.0f}%)")
     headlines.append(random.choice(fun_facts))
 
@@ -1212,7 +2265,7 @@ class PlayerSetupModal(Modal, title="⚜️ Majestic Profile Setup"):
         pd["role"] = self.player_role
         pd["squad"] = self.squad_name
         squad_data["players"][pk] = pd
-        save_data(squad_data)
+        save_data(squad_data, ("players", pk))
 
         embed = discord.Embed(title="✅ Profile Updated!", description="Your majestic warrior profile is now inscribed.", color=ROYAL_GOLD)
         embed.add_field(name="⚔️ IGN", value=pd["ingame_name"] or "Not set", inline=True)
@@ -1233,7 +2286,7 @@ class SetLogoModal(Modal, title="🖼️ Set Kingdom Emblem"):
 
     async def on_submit(self, interaction: discord.Interaction):
         squad_data["squads"][self.squad_name]["logo_url"] = self.logo_url.value
-        save_data(squad_data)
+        save_data(squad_data, ("squads", self.squad_name))
         embed = discord.Embed(title="✅ Emblem Set!", description=f"The crest of **{self.squad_name}** has been updated!", color=ROYAL_GOLD)
         embed.set_thumbnail(url=self.logo_url.value)
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -1249,7 +2302,7 @@ async def show_squad_info(interaction, squad_role, squad_name, tag, public=False
     # Auto-create data entry if missing (e.g. newly added squad)
     if squad_name not in squad_data["squads"]:
         squad_data["squads"][squad_name] = _new_squad_entry()
-        save_data(squad_data)
+        save_data(squad_data, ("squads", squad_name))
     si = squad_data["squads"].get(squad_name, {})
     rank = get_squad_rank(squad_name)
     re = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else "🏅"
@@ -1441,14 +2494,8 @@ async def show_squad_match_history(interaction, squad_name):
             ds = dt.strftime("%b %d, %Y")
         except:
             ds = "Unknown"
-        try:
-            s1, s2 = map(int, score.split('-'))
-            if t1 == squad_name:
-                re, rt = ("🏆", "Victory") if s1 > s2 else ("💀", "Defeat") if s2 > s1 else ("⚖️", "Draw")
-            else:
-                re, rt = ("🏆", "Victory") if s2 > s1 else ("💀", "Defeat") if s1 > s2 else ("⚖️", "Draw")
-        except:
-            re, rt = "⚔️", "Battle"
+        re, rt = {"W": ("🏆", "Victory"), "L": ("💀", "Defeat"), "D": ("⚖️", "Draw")}.get(
+            match_outcome(m, squad_name), ("⚔️", "Battle"))
         # Show glory points earned
         pts_info = ""
         if t1 == squad_name:
@@ -1561,6 +2608,14 @@ async def show_rivalry_stats(interaction, sq1, sq2):
     else:
         embed.add_field(name="⚖️ Balanced", value="Both kingdoms are perfectly matched!", inline=False)
 
+    last = h2h.get("last_match")
+    if last:
+        try:
+            ds = datetime.fromisoformat(last.get("date", "")).strftime("%b %d, %Y")
+        except:
+            ds = "?"
+        embed.add_field(name="🕰️ Last Meeting", value=f"{last['team1']} **{last['score']}** {last['team2']} — {ds}", inline=False)
+
     try:
         await interaction.response.edit_message(embed=embed, view=None)
     except:
@@ -1668,7 +2723,7 @@ class MemberSelectorView(View):
         await member.remove_roles(self.squad_role)
         await safe_nick_update(member, None, "")
         update_player_squad(member.id, "Free Agent", self.squad_name)
-        save_data(squad_data)
+        save_data(squad_data, ("squads", self.squad_name))
         embed = discord.Embed(title="✅ Removed", description=f"{member.mention} removed from **{self.squad_name}**", color=ROYAL_PURPLE)
         await interaction.response.edit_message(embed=embed, view=None)
         await log_action(self.guild, "➖ Removed", f"{interaction.user.mention} removed {member.mention} from **{self.squad_name}**")
@@ -1679,7 +2734,7 @@ class MemberSelectorView(View):
         if len(mr) >= 5: await interaction.response.edit_message(content="❌ Main roster full (5 max)!", embed=None, view=None); return
         if member.id in mr: await interaction.response.edit_message(content="❌ Already on main roster!", embed=None, view=None); return
         if member.id in si.get("subs", []): si["subs"].remove(member.id)
-        mr.append(member.id); save_data(squad_data)
+        mr.append(member.id); save_data(squad_data, ("squads", self.squad_name))
         embed = discord.Embed(title="⭐ Main Roster Updated!", description=f"{member.mention} → Main Roster ({len(mr)}/5)", color=ROYAL_GOLD)
         await interaction.response.edit_message(embed=embed, view=None)
         await log_action(self.guild, "⭐ Main Set", f"{member.mention} added to main roster")
@@ -1688,7 +2743,7 @@ class MemberSelectorView(View):
         si = squad_data["squads"][self.squad_name]
         mr = si.get("main_roster", [])
         if member.id not in mr: await interaction.response.edit_message(content="❌ Not on main roster!", embed=None, view=None); return
-        mr.remove(member.id); save_data(squad_data)
+        mr.remove(member.id); save_data(squad_data, ("squads", self.squad_name))
         embed = discord.Embed(title="✅ Removed from Mains", description=f"{member.mention} removed from main roster", color=ROYAL_PURPLE)
         await interaction.response.edit_message(embed=embed, view=None)
         await log_action(self.guild, "❌ Main Removed", f"{interaction.user.mention} removed {member.mention} from **{self.squad_name}** main roster")
@@ -1699,7 +2754,7 @@ class MemberSelectorView(View):
         if len(subs) >= 3: await interaction.response.edit_message(content="❌ Subs full (3 max)!", embed=None, view=None); return
         if member.id in subs: await interaction.response.edit_message(content="❌ Already a sub!", embed=None, view=None); return
         if member.id in si.get("main_roster", []): si["main_roster"].remove(member.id)
-        subs.append(member.id); save_data(squad_data)
+        subs.append(member.id); save_data(squad_data, ("squads", self.squad_name))
         embed = discord.Embed(title="🔄 Sub Added!", description=f"{member.mention} → Substitutes ({len(subs)}/3)", color=ROYAL_BLUE)
         await interaction.response.edit_message(embed=embed, view=None)
         await log_action(self.guild, "🔄 Sub Set", f"{interaction.user.mention} added {member.mention} to **{self.squad_name}** substitutes")
@@ -1708,7 +2763,7 @@ class MemberSelectorView(View):
         si = squad_data["squads"][self.squad_name]
         subs = si.get("subs", [])
         if member.id not in subs: await interaction.response.edit_message(content="❌ Not a substitute!", embed=None, view=None); return
-        subs.remove(member.id); save_data(squad_data)
+        subs.remove(member.id); save_data(squad_data, ("squads", self.squad_name))
         embed = discord.Embed(title="✅ Removed from Subs", description=f"{member.mention} removed from substitutes", color=ROYAL_PURPLE)
         await interaction.response.edit_message(embed=embed, view=None)
         await log_action(self.guild, "❌ Sub Removed", f"{interaction.user.mention} removed {member.mention} from **{self.squad_name}** substitutes")
@@ -1750,7 +2805,7 @@ class MemberSelectorView(View):
         if not old_h:
             await interaction.response.edit_message(content="ℹ️ No history to clear.", embed=None, view=None); return
         pd["squad_history"] = []
-        save_data(squad_data)
+        save_data(squad_data, ("players", pk))
         embed = discord.Embed(title="🗑️ History Cleared", description=f"Cleared **{len(old_h)}** entries for {member.mention}", color=ROYAL_PURPLE)
         await interaction.response.edit_message(embed=embed, view=None)
         await log_action(self.guild, "🗑️ History Cleared", f"{interaction.user.mention} cleared history for {member.mention}")
@@ -1761,33 +2816,33 @@ class MemberSelectorView(View):
 # =====================================================================
 
 def calculate_glory_points(winner_name, loser_name, score1, score2, is_draw=False):
-    """Calculate dynamic Glory Points based on rank difference, streaks, and performance."""
+    """Calculate dynamic Glory Points based on rating expectation, streaks, and performance."""
     if is_draw:
         return 1, 1, [], []  # t1_pts, t2_pts, t1_tags, t2_tags
 
-    winner_rank = get_squad_rank(winner_name) or 999
     loser_rank = get_squad_rank(loser_name) or 999
+    # Pre-match Elo expectation — called before the match is recorded
+    expected = expected_score(get_rating(winner_name), get_rating(loser_name))
 
     base = GLORY_BASE_WIN
     bonus = 0
     tags = []
 
-    # --- Upset Bonus (winner was ranked LOWER = higher number) ---
-    rank_diff = winner_rank - loser_rank  # positive = upset
-    if rank_diff > 0:
+    # --- Upset Bonus (winner was the rating underdog) ---
+    if expected < 0.5:
         if loser_rank <= 3:
             bonus += 3
             tags.append("👑 **GIANT SLAYER** (+3)")
-        elif rank_diff >= 8:
+        elif expected < 0.25:
             bonus += 3
             tags.append("⚡ **MASSIVE UPSET** (+3)")
-        elif rank_diff >= 4:
+        elif expected < 0.4:
             bonus += 2
             tags.append("⚡ **UPSET** (+2)")
         else:
             bonus += 1
             tags.append("🎯 Underdog (+1)")
-    elif rank_diff < -8:
+    elif expected >= 0.85:
         # Beating a much weaker team
         bonus += GLORY_EXPECTED_TAX
         tags.append("📉 Expected (-1)")
@@ -1801,7 +2856,6 @@ def calculate_glory_points(winner_name, loser_name, score1, score2, is_draw=Fals
 
     # --- Clean Sheet Bonus ---
     # Winner's opponent scored 0
-    winner_is_t1 = (winner_rank == get_squad_rank(winner_name))  # always true
     opp_score = score2 if winner_name != loser_name else score1
     # Actually determine by who won
     if score1 > score2:  # team1 won
@@ -1821,28 +2875,411 @@ def calculate_glory_points(winner_name, loser_name, score1, score2, is_draw=Fals
         # Remove claimed bounty
         squad_data["bounties"].pop(loser_name, None)
 
-    total = max(base + bonus, 1)  # minimum 1 point for a win
-    return total, 0, tags, []
+    total = max(base + bonus, 1)  # minimum 1 point for a win
+    return total, 0, tags, []
+
+
+def refresh_bounties():
+    """Auto-place bounties on top 3 kingdoms. Called after each match."""
+    rankings = get_squad_ranking()
+    if not rankings:
+        return
+    bounties = squad_data.get("bounties", {})
+
+    # Auto-bounties on top 3 if they don't already have one
+    tier_bounties = {1: 3, 2: 2, 3: 1}
+    for r in rankings[:3]:
+        if r["name"] not in bounties and r["total_matches"] >= 3:
+            bounties[r["name"]] = {
+                "points": tier_bounties[r["rank"]],
+                "reason": f"🏆 #{r['rank']} Ranked Kingdom",
+                "placed_by": "system",
+                "date": datetime.utcnow().isoformat()
+            }
+    squad_data["bounties"] = bounties
+
+
+# -------------------- MATCH RECORDING --------------------
+# apply_match_result() is the one place a scored result lands: stats, glory,
+# streaks, challenges, achievements, the match record and its prediction.
+# Single results (RecordBattleScoreModal) refresh the ranking and bounties
+# per match. Batches (record_results_batch) apply every row oldest first
+# against the standings as they stood when the batch began, then refresh
+# the ranking and bounties once and save once. Elo, streaks and the replay
+# follow list order, so a batch may not reach back before the last
+# recorded battle — such rows are rejected rather than rated out of order.
+BULK_MAX_ROWS = 100
+
+
+def apply_match_result(team1, team2, score, added_by, date=None, ranked=True):
+    """Apply one "X-Y" result. Returns the outcome and the save paths it touched.
+
+    ranked=False leaves the ranking cache and bounties for the caller to refresh.
+    """
+    s1, s2 = map(int, score.split("-"))
+    date = date or datetime.utcnow().isoformat()  # before any bounty this match places
+    pred = predict_match(team1, team2)  # before stats change
+    t1d, t2d = squad_data["squads"][team1], squad_data["squads"][team2]
+    tags1, tags2 = [], []
+    if s1 > s2:
+        t1_pts, t2_pts, tags1, tags2 = calculate_glory_points(team1, team2, s1, s2)
+        t1d["wins"] += 1; t1d["points"] += t1_pts; t2d["losses"] += 1
+        st1, st2 = update_streak(team1, "win"), update_streak(team2, "loss")
+        winner = team1
+    elif s2 > s1:
+        t2_pts, t1_pts, tags2, tags1 = calculate_glory_points(team2, team1, s2, s1)
+        t2d["wins"] += 1; t2d["points"] += t2_pts; t1d["losses"] += 1
+        st1, st2 = update_streak(team1, "loss"), update_streak(team2, "win")
+        winner = team2
+    else:
+        t1_pts = t2_pts = 1
+        t1d["draws"] += 1; t1d["points"] += 1
+        t2d["draws"] += 1; t2d["points"] += 1
+        st1, st2 = update_streak(team1, "draw"), update_streak(team2, "draw")
+        winner = "draw"
+    if ranked:
+        invalidate_ranking()
+        refresh_bounties()
+
+    # Auto-complete any active challenge between these two
+    for c in squad_data.get("challenges", []):
+        if c["status"] in ("accepted", "scheduled") and {c["challenger"], c["challenged"]} == {team1, team2}:
+            c["status"] = "completed"
+
+    ach1, ach2 = check_achievements(team1), check_achievements(team2)
+    match_data = {
+        "match_id": str(uuid.uuid4())[:8], "team1": team1, "team2": team2,
+        "score": score, "date": date, "added_by": added_by,
+        "team1_participants": get_match_participants(team1),
+        "team2_participants": get_match_participants(team2),
+        "t1_pts": t1_pts, "t2_pts": t2_pts
+    }
+    add_match_record(match_data)
+    paths = [("matches", len(squad_data["matches"]) - 1), ("squads", team1), ("squads", team2),
+             ("bounties",), ("challenges",), log_prediction(match_data, pred)]
+    return {"match": match_data, "pred": pred, "winner": winner, "pts": (t1_pts, t2_pts),
+            "tags": (tags1, tags2), "streaks": (dict(st1), dict(st2)),
+            "achievements": (ach1, ach2), "paths": paths}
+
+
+def _resolve_squad_name(text):
+    """Active squad by exact name or tag, case-insensitive."""
+    key = text.strip().lower()
+    for name, tag in SQUADS.items():
+        if key in (name.lower(), str(tag).lower()):
+            return name
+    return None
+
+
+_BULK_LINE = re.compile(r"^(.+?)\s+(\d+)\s*[-:]\s*(\d+)\s+(.+?)(?:\s+@\s*(\S.*))?$")
+
+
+def _bulk_row(team1, team2, score, date, where):
+    """Validate one import row. Returns (row, None) or (None, error)."""
+    t1, t2 = _resolve_squad_name(team1 or ""), _resolve_squad_name(team2 or "")
+    if not t1 or not t2:
+        return None, f"{where}: unknown kingdom '{team1 if not t1 else team2}'"
+    if t1 == t2:
+        return None, f"{where}: {t1} can't fight itself"
+    try:
+        s1, s2 = map(int, str(score).replace(":", "-").split("-"))
+        if s1 < 0 or s2 < 0:
+            raise ValueError
+    except:
+        return None, f"{where}: bad score '{score}' (use X-Y)"
+    if date:
+        try:
+            date = datetime.fromisoformat(str(date).strip()).isoformat()
+        except ValueError:
+            return None, f"{where}: bad date '{date}' (use YYYY-MM-DD [HH:MM])"
+    return {"team1": t1, "team2": t2, "score": f"{s1}-{s2}", "date": date or None}, None
+
+
+def _bulk_csv_row(cells, where):
+    if len(cells) < 3:
+        return None, f"{where}: expected team1,team2,score[,date]"
+    return _bulk_row(cells[0], cells[1], cells[2], cells[3] if len(cells) > 3 else None, where)
+
+
+def parse_bulk_results(text, fmt="lines"):
+    """Parse a results batch. fmt: "json" (list of objects), "csv" or "lines".
+
+    csv rows are team1,team2,score[,date] (header optional); lines are
+    "Team A 2-1 Team B" with an optional "@ 2026-05-01 20:00".
+    Returns (rows, errors).
+    """
+    raw = []
+    if fmt == "json":
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            return [], [f"invalid JSON: {e}"]
+        if not isinstance(items, list):
+            return [], ["JSON must be a list of results"]
+        for i, it in enumerate(items, 1):
+            if not isinstance(it, dict):
+                raw.append((None, f"item {i}: not an object"))
+                continue
+            raw.append(_bulk_row(it.get("team1"), it.get("team2"), it.get("score", ""), it.get("date"), f"item {i}"))
+    elif fmt == "csv":
+        for i, cells in enumerate(csv.reader(io.StringIO(text)), 1):
+            cells = [c.strip() for c in cells]
+            if any(cells) and not (i == 1 and cells[0].lower() == "team1"):
+                raw.append(_bulk_csv_row(cells, f"line {i}"))
+    else:
+        for i, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line:
+                continue
+            if "," in line:
+                raw.append(_bulk_csv_row([c.strip() for c in next(csv.reader([line]))], f"line {i}"))
+                continue
+            m = _BULK_LINE.match(line)
+            if not m:
+                raw.append((None, f"line {i}: expected 'Team A 2-1 Team B'"))
+                continue
+            raw.append(_bulk_row(m.group(1), m.group(4), f"{m.group(2)}-{m.group(3)}", m.group(5), f"line {i}"))
+    rows = [r for r, e in raw if r]
+    errors = [e for r, e in raw if e]
+    if len(rows) > BULK_MAX_ROWS:
+        errors.append(f"too many results ({len(rows)}) — at most {BULK_MAX_ROWS} per batch")
+    return rows, errors
+
+
+def backdated_errors(rows):
+    """Errors for dated rows older than the last recorded battle (the log is append-only)."""
+    last = squad_data["matches"][-1].get("date") if squad_data["matches"] else None
+    if not last:
+        return []
+    return [f"{r['team1']} {r['score']} {r['team2']} @ {r['date'][:16]}: before the last recorded "
+            f"battle ({last[:16]}) — back-dated results can't be imported"
+            for r in rows if r.get("date") and r["date"] < last]
+
+
+def record_results_batch(rows, added_by):
+    """Apply rows oldest first with one ranking refresh, one bounty pass and one save.
+
+    Undated rows take the import time and keep their order. Returns
+    (results, old_ranks) — ranks as they stood before the batch.
+    """
+    now = datetime.utcnow().isoformat()
+    rows = sorted(rows, key=lambda r: r.get("date") or now)
+    teams = {t for r in rows for t in (r["team1"], r["team2"])}
+    old_ranks = {t: get_squad_rank(t) for t in teams}
+    results = [apply_match_result(r["team1"], r["team2"], r["score"], added_by,
+                                  r.get("date") or now, ranked=False) for r in rows]
+    invalidate_ranking()
+    refresh_bounties()
+    paths = list(dict.fromkeys(p for res in results for p in res["paths"]))
+    save_data(squad_data, *paths)
+    return results, old_ranks
+
+
+def build_batch_embed(results, old_ranks):
+    """One consolidated announcement for a batch of results."""
+    lines = []
+    for res in results:
+        m, (p1, p2) = res["match"], res["pts"]
+        t1, t2 = m["team1"], m["team2"]
+        mark = "🤝" if res["winner"] == "draw" else "⚔️"
+        lines.append(f"{mark} {SQUADS.get(t1, '?')} **{t1}** {m['score']} **{t2}** {SQUADS.get(t2, '?')} "
+                     f"(+{p1} / +{p2})")
+    desc = "\n".join(lines)
+    if len(desc) > 4000:
+        desc = desc[:3990].rsplit("\n", 1)[0] + "\n*…*"
+    embed = discord.Embed(title=f"📜 THE CHRONICLES ARE WRITTEN — {len(results)} BATTLES",
+                          description=desc, color=ROYAL_GOLD)
+
+    movers = []
+    for team, old in old_ranks.items():
+        new = get_squad_rank(team)
+        if old and new and old != new:
+            movers.append((old - new, f"{'📈' if new < old else '📉'} **{team}** #{old} → #{new}"))
+    if movers:
+        movers.sort(key=lambda x: -abs(x[0]))
+        embed.add_field(name="🏆 Rank Changes", value="\n".join(t for _, t in movers[:10]), inline=False)
+
+    honours = [f"{a['name']} — **{team}**" for res in results
+               for team, achs in zip((res["match"]["team1"], res["match"]["team2"]), res["achievements"])
+               for a in achs]
+    if honours:
+        embed.add_field(name="🏅 Honours Earned", value="\n".join(honours[:10]), inline=False)
+
+    streaks = []
+    for team in old_ranks:
+        cs = recalculate_streak(team)
+        if cs["type"] in ("win", "loss") and cs["count"] >= 3:
+            streaks.append(f"{'🔥' if cs['type'] == 'win' else '❄️'} **{team}** — {cs['count']} {cs['type']}s in a row")
+    if streaks:
+        embed.add_field(name="📊 Streaks", value="\n".join(streaks[:10]), inline=False)
+
+    called = sum(1 for res in results if res["winner"] == _favourite_name(res))
+    embed.add_field(name="🔮 Oracle", value=f"Called **{called}/{len(results)}** results", inline=False)
+    embed.set_footer(text=f"⚜️ Majestic Dominion | {datetime.utcnow().strftime('%b %d, %Y · %H:%M')} UTC")
+    return embed
+
 
+def _favourite_name(res):
+    pred, m = res["pred"], res["match"]
+    if pred["t1_pct"] > pred["t2_pct"]:
+        return m["team1"]
+    return m["team2"] if pred["t2_pct"] > pred["t1_pct"] else "draw"
 
-def refresh_bounties():
-    """Auto-place bounties on top 3 kingdoms. Called after each match."""
-    rankings = get_squad_ranking()
-    if not rankings:
-        return
-    bounties = squad_data.get("bounties", {})
 
-    # Auto-bounties on top 3 if they don't already have one
-    tier_bounties = {1: 3, 2: 2, 3: 1}
-    for r in rankings[:3]:
-        if r["name"] not in bounties and r["total_matches"] >= 3:
-            bounties[r["name"]] = {
-                "points": tier_bounties[r["rank"]],
-                "reason": f"🏆 #{r['rank']} Ranked Kingdom",
-                "placed_by": "system",
-                "date": datetime.utcnow().isoformat()
-            }
-    squad_data["bounties"] = bounties
+# -------------------- REPLAY ENGINE --------------------
+# The match log is canonical. replay_match_log() recomputes every squad's
+# season fields from it in one pass: points come from the glory points
+# stored on each match, W/D/L and current streak from the results. Manual
+# corrections live in squad["adjust"] and are added on top. Career fields
+# only grow: best streaks are raised and earned achievements added, never
+# taken away. Bounties whose squad has lost since they were placed are
+# dropped; replay never places bounties, so a deleted auto-bounty stays gone.
+# reconcile_match_log() diffs the result against the stored values and
+# writes the corrections. It runs at startup and after /restore.
+REPLAY_FIELDS = ("points", "wins", "draws", "losses")
+LEGACY_WIN_POINTS = 2  # matches recorded before glory points were stored
+
+
+def set_squad_stats(squad_name, **values):
+    """Manually set season stats, kept as an adjustment so replays preserve it."""
+    si = squad_data["squads"][squad_name]
+    adjust = si.setdefault("adjust", {})
+    for field, value in values.items():
+        adjust[field] = adjust.get(field, 0) + value - si.get(field, 0)
+        si[field] = value
+    invalidate_ranking()
+    return ("squads", squad_name)
+
+
+def replay_match_log(data=None):
+    """Derived squad fields and bounties recomputed from data["matches"]. Doesn't modify data."""
+    data = data or squad_data
+    squads = data["squads"]
+    state = {}
+    for name, si in squads.items():
+        adj = si.get("adjust", {})
+        st = {f: adj.get(f, 0) for f in REPLAY_FIELDS}
+        st.update({"current_streak": {"type": "none", "count": 0}, "match_history": [],
+                   "biggest_win_streak": si.get("biggest_win_streak", 0),
+                   "biggest_loss_streak": si.get("biggest_loss_streak", 0),
+                   "championship_wins": si.get("championship_wins", 0),
+                   "achievements": list(si.get("achievements", [])), "last_loss": None})
+        state[name] = st
+
+    for m in data["matches"]:
+        outcome = match_outcome(m, m["team1"])
+        teams = (m["team1"], m["team2"])
+        for team in teams:
+            state.setdefault(team, None)
+        if outcome is None or None in (state[teams[0]], state[teams[1]]):
+            continue
+        results = {"W": ("win", "loss"), "L": ("loss", "win"), "D": ("draw", "draw")}[outcome]
+        for team, result, pts_key in zip(teams, results, ("t1_pts", "t2_pts")):
+            st = state[team]
+            st["match_history"].append(m.get("match_id"))
+            if result == "win":
+                st["wins"] += 1; st["points"] += m.get(pts_key, LEGACY_WIN_POINTS)
+            elif result == "loss":
+                st["losses"] += 1; st["last_loss"] = m.get("date")
+            else:
+                st["draws"] += 1; st["points"] += 1
+            cs = st["current_streak"]
+            st["current_streak"] = cs = ({"type": result, "count": cs["count"] + 1}
+                                         if cs["type"] == result else {"type": result, "count": 1})
+            if result != "draw":
+                key = f"biggest_{result}_streak"
+                st[key] = max(st[key], cs["count"])
+        for team in teams:
+            st = state[team]
+            for key in _achievement_keys(st):
+                if key not in st["achievements"]:
+                    st["achievements"].append(key)
+
+    # Bounties: drop the ones a later defeat should have claimed
+    bounties = {}
+    for name, b in data.get("bounties", {}).items():
+        st = state.get(name)
+        lost = st and st["last_loss"]
+        if st and not (lost and b.get("date") and lost > b["date"]):
+            bounties[name] = b
+    for st in state.values():
+        if st:
+            del st["last_loss"], st["championship_wins"]
+    return {"squads": {n: st for n, st in state.items() if st}, "bounties": bounties}
+
+
+def diff_match_log(replayed, data=None):
+    """(squad, field, stored, replayed) for every stored value the replay disagrees with."""
+    data = data or squad_data
+    diffs = []
+    for name, st in replayed["squads"].items():
+        si = data["squads"][name]
+        for field, value in st.items():
+            stored = si.get(field)
+            if field == "achievements":
+                missing = [a for a in value if a not in (stored or [])]
+                if missing:
+                    diffs.append((name, field, len(stored or []), f"+{', '.join(missing)}"))
+            elif field == "current_streak":
+                if (stored or {}).get("type", "none") != value["type"] or (stored or {}).get("count", 0) != value["count"]:
+                    diffs.append((name, field, stored, value))
+            elif field == "match_history":
+                if stored != value:
+                    diffs.append((name, field, len(stored or []), len(value)))
+            elif stored != value:
+                diffs.append((name, field, stored, value))
+    stored_b, new_b = data.get("bounties", {}), replayed["bounties"]
+    for name in sorted(set(stored_b) | set(new_b)):
+        if (name in stored_b) != (name in new_b):
+            diffs.append((name, "bounty", stored_b.get(name, {}).get("points"), new_b.get(name, {}).get("points")))
+    return diffs
+
+
+def _adopt_stat_drift(replayed):
+    """First replay on a file: keep today's standings, recording any gap as adjustments.
+
+    Files from before adjustments existed can't tell manual corrections from drift.
+    """
+    for name, st in replayed["squads"].items():
+        si = squad_data["squads"][name]
+        for field in REPLAY_FIELDS:
+            gap = si.get(field, 0) - st[field]
+            if gap:
+                adjust = si.setdefault("adjust", {})
+                adjust[field] = adjust.get(field, 0) + gap
+                st[field] += gap
+                print(f"🔁 {name}: kept {field} {si.get(field, 0)} as a manual adjustment ({gap:+d})")
+    squad_data["replay_baseline"] = True
+    save_data(squad_data, *[("squads", n) for n in replayed["squads"]], ("replay_baseline",))
+
+
+def reconcile_match_log(apply=True):
+    """Replay the match log, write any corrections and return the diffs."""
+    started = time.perf_counter()
+    replayed = replay_match_log()
+    if apply and not squad_data.get("replay_baseline"):
+        _adopt_stat_drift(replayed)
+    diffs = diff_match_log(replayed)
+    if diffs and apply:
+        touched = {name for name, field, _, _ in diffs if field != "bounty"}
+        for name in touched:
+            squad_data["squads"][name].update(replayed["squads"][name])
+        squad_data["bounties"] = replayed["bounties"]
+        invalidate_ranking()
+        save_data(squad_data, *[("squads", n) for n in sorted(touched)], ("bounties",))
+    print(f"🔁 Replayed {len(squad_data['matches'])} matches in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms — {len(diffs)} correction(s)"
+          + ("" if apply or not diffs else " (not applied)"))
+    return diffs
+
+
+def format_replay_diffs(diffs, limit=20):
+    if not diffs:
+        return "✅ Stored stats match the match log."
+    lines = [f"• **{n}** {f}: `{a}` → `{b}`" for n, f, a, b in diffs[:limit]]
+    if len(diffs) > limit:
+        lines.append(f"*…and {len(diffs) - limit} more*")
+    return "\n".join(lines)
 
 
 # =====================================================================
@@ -2014,15 +3451,11 @@ async def daily_pulse_task():
         )
 
         # Today's stats
-        today_str = now.strftime("%Y-%m-%d")
-        today_matches = [m for m in squad_data["matches"] if m.get("date", "").startswith(today_str)]
-        yesterday = (now.timestamp() - 86400)
-        yesterday_str = datetime.utcfromtimestamp(yesterday).strftime("%Y-%m-%d")
-        yesterday_matches = [m for m in squad_data["matches"] if m.get("date", "").startswith(yesterday_str)]
+        yesterday_count = matches_on(now - timedelta(days=1))
 
         embed.add_field(
             name="📊 Activity",
-            value=f"⚔️ Yesterday: **{len(yesterday_matches)}** battles\n🏰 Total: **{len(squad_data['matches'])}** all-time",
+            value=f"⚔️ Yesterday: **{yesterday_count}** battles\n🏰 Total: **{_realm['matches']}** this season",
             inline=True
         )
 
@@ -2084,23 +3517,15 @@ async def daily_pulse_task():
                 ev_text += f"{si} **{ev['name']}** — {ev.get('format','?')} | 👥 {rc}{mx}{extra}\n"
             embed.add_field(name="🎪 Active Events", value=ev_text.strip(), inline=False)
 
-        # Oracle prediction for today — who will fight next?
-        active_ch = [c for c in squad_data.get("challenges", []) if c["status"] == "scheduled"]
-        if active_ch:
-            next_match = active_ch[0]
+        # Oracle prediction slate — scheduled fights, predicted in one batch
+        scheduled = [c for c in squad_data.get("challenges", []) if c["status"] == "scheduled"][:3]
+        if scheduled:
             try:
-                pred = predict_match(next_match["challenger"], next_match["challenged"])
-                t1_tag = SQUADS.get(next_match["challenger"],"?")
-                t2_tag = SQUADS.get(next_match["challenged"],"?")
-                fav = next_match["challenger"] if pred["t1_pct"] > pred["t2_pct"] else next_match["challenged"]
-                fav_pct = max(pred["t1_pct"], pred["t2_pct"])
-                embed.add_field(
-                    name=f"🔮 Oracle Watches: {t1_tag} vs {t2_tag}",
-                    value=(f"📅 **{next_match.get('scheduled_date','TBD')}**\n"
-                           f"👑 Favoured: **{fav}** ({fav_pct}%)\n"
-                           f"*{pred['narrative'][:80]}...*"),
-                    inline=False
-                )
+                fixtures = [(c["challenger"], c["challenged"]) for c in scheduled]
+                preds = predict_fixtures(fixtures)
+                lines = [f"📅 {c.get('scheduled_date','TBD')} · {format_prediction_line(t1, t2, p)}"
+                         for c, (t1, t2), p in zip(scheduled, fixtures, preds)]
+                embed.add_field(name="🔮 Oracle Watches", value="\n".join(lines)[:1024], inline=False)
             except: pass
 
         # Bottom leaderboard teaser — who's climbing?
@@ -2224,7 +3649,7 @@ class ChallengeMessageModal(Modal, title="⚔️ War Declaration"):
             "challenger_user_id": interaction.user.id,
         }
         squad_data["challenges"].append(challenge)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("challenges", challenge))
 
         # Confirm to challenger
         embed = discord.Embed(
@@ -2317,7 +3742,7 @@ class ChallengeResponseView(View):
         else:
             await interaction.response.send_message("❌ Challenge no longer pending.", ephemeral=True)
             return
-        save_data(squad_data)
+        save_data(squad_data, _list_path("challenges", c))
 
         embed = discord.Embed(
             title="⚔️ THE CHALLENGE IS ANSWERED!",
@@ -2352,7 +3777,7 @@ class ChallengeResponseView(View):
         else:
             await interaction.response.send_message("❌ Challenge no longer pending.", ephemeral=True)
             return
-        save_data(squad_data)
+        save_data(squad_data, _list_path("challenges", c))
 
         embed = discord.Embed(
             title="✋ Challenge Declined",
@@ -2410,7 +3835,7 @@ class BountyBoardView(View):
     @discord.ui.button(label="Refresh", style=discord.ButtonStyle.secondary, emoji="🔄")
     async def refresh_btn(self, interaction: discord.Interaction, button: Button):
         refresh_bounties()
-        save_data(squad_data)
+        save_data(squad_data, ("bounties",))
         await interaction.response.edit_message(embed=build_bounty_embed(), view=BountyBoardView())
 
 
@@ -2443,7 +3868,7 @@ class ManageBountiesView(View):
             return
         count = len(bounties)
         squad_data["bounties"] = {}
-        save_data(squad_data)
+        save_data(squad_data, ("bounties",))
         await interaction.response.edit_message(
             embed=discord.Embed(title="💣 All Bounties Cleared", description=f"Removed **{count}** bounties.", color=ROYAL_RED),
             view=None
@@ -2453,7 +3878,7 @@ class ManageBountiesView(View):
     @discord.ui.button(label="Refresh Board", style=discord.ButtonStyle.secondary, emoji="🔄", row=1)
     async def refresh_btn(self, interaction: discord.Interaction, button: Button):
         refresh_bounties()
-        save_data(squad_data)
+        save_data(squad_data, ("bounties",))
         embed = build_bounty_embed()
         embed.title = "💰 Bounty Manager"
         await interaction.response.edit_message(embed=embed, view=ManageBountiesView())
@@ -2478,7 +3903,7 @@ class DeleteBountyView(View):
     async def selected(self, interaction):
         target = interaction.data["values"][0]
         removed = squad_data.get("bounties", {}).pop(target, None)
-        save_data(squad_data)
+        save_data(squad_data, ("bounties", target))
         if removed:
             embed = discord.Embed(
                 title="🗑️ Bounty Removed",
@@ -2540,7 +3965,7 @@ class SetBountyModal(Modal, title="💰 Set Bounty"):
             "placed_by": str(interaction.user.id),
             "date": datetime.utcnow().isoformat()
         }
-        save_data(squad_data)
+        save_data(squad_data, ("bounties", self.target_name))
 
         embed = discord.Embed(
             title="💰 Bounty Placed!",
@@ -2634,7 +4059,7 @@ class ManageChallengesView(View):
                                     if c["status"] in ("pending", "accepted", "scheduled")]
         after = len(squad_data["challenges"])
         removed = before - after
-        save_data(squad_data)
+        save_data(squad_data, ("challenges",))
         embed = build_challenge_manager_embed()
         if removed > 0:
             embed.description = f"🗑️ Cleared **{removed}** completed/declined challenges.\n\n" + (embed.description or "")
@@ -2723,7 +4148,7 @@ class ScheduleDateModal(Modal, title="📅 Schedule Match Date"):
             await interaction.response.send_message("❌ Challenge not found.", ephemeral=True)
             return
 
-        save_data(squad_data)
+        save_data(squad_data, _list_path("challenges", challenge))
 
         tag1 = SQUADS.get(challenge["challenger"], "?")
         tag2 = SQUADS.get(challenge["challenged"], "?")
@@ -2806,7 +4231,7 @@ class CancelChallengeSelectView(View):
             await interaction.response.send_message("❌ Challenge not found or already resolved.", ephemeral=True)
             return
 
-        save_data(squad_data)
+        save_data(squad_data, _list_path("challenges", challenge))
         tag1 = SQUADS.get(challenge["challenger"], "?")
         tag2 = SQUADS.get(challenge["challenged"], "?")
 
@@ -3275,7 +4700,7 @@ async def setup_bot_commands_channel(guild):
         if guide_msg:
             squad_data[BOT_GUIDE_POSTED_KEY] = str(guide_msg.id)
         squad_data["bot_guide_banner_id"] = str(banner_msg.id)
-        save_data(squad_data)
+        save_data(squad_data, (BOT_GUIDE_POSTED_KEY,), ("bot_guide_banner_id",))
         print(f"👑 Bot guide posted in #{BOT_COMMANDS_CHANNEL_NAME} ({len(embeds)} pages)")
     except Exception as e:
         print(f"⚠️ Could not post guide: {e}")
@@ -3340,20 +4765,12 @@ async def weekly_digest_task():
         if not rankings:
             continue
 
-        # Gather stats for the week (last 7 days)
-        week_ago = datetime.utcnow().timestamp() - (7 * 86400)
-        week_matches = []
-        for m in squad_data["matches"]:
-            try:
-                md = datetime.fromisoformat(m["date"]).timestamp()
-                if md >= week_ago:
-                    week_matches.append(m)
-            except:
-                pass
+        # Stats for the week (last 7 days) from the realm aggregates
+        week_count = sum(matches_on(day) for day in recent_day_keys(7, now))
 
         embed = discord.Embed(
             title="📰 WEEKLY ROYAL CHRONICLE",
-            description=f"*Week of {now.strftime('%B %d, %Y')}*\n⚔️ **{len(week_matches)}** battles fought this week!",
+            description=f"*Week of {now.strftime('%B %d, %Y')}*\n⚔️ **{week_count}** battles fought this week!",
             color=ROYAL_GOLD
         )
 
@@ -3365,16 +4782,7 @@ async def weekly_digest_task():
         embed.add_field(name="👑 Top 3 Kingdoms", value=top3 or "No data", inline=False)
 
         # Week's biggest mover — most wins this week
-        week_wins = {}
-        for m in week_matches:
-            try:
-                s1, s2 = map(int, m["score"].split("-"))
-                if s1 > s2:
-                    week_wins[m["team1"]] = week_wins.get(m["team1"], 0) + 1
-                elif s2 > s1:
-                    week_wins[m["team2"]] = week_wins.get(m["team2"], 0) + 1
-            except:
-                pass
+        week_wins = wins_in_last_days(7, now)
         if week_wins:
             hot_name = max(week_wins, key=week_wins.get)
             embed.add_field(
@@ -3424,10 +4832,7 @@ async def weekly_digest_task():
 
         # Most active kingdom (most matches this week)
         if week_wins:
-            total_week = {}
-            for m in week_matches:
-                total_week[m["team1"]] = total_week.get(m["team1"], 0) + 1
-                total_week[m["team2"]] = total_week.get(m["team2"], 0) + 1
+            total_week = played_in_last_days(7, now)
             if total_week:
                 most_active = max(total_week, key=total_week.get)
                 ma_tag = SQUADS.get(most_active, "?")
@@ -3438,13 +4843,13 @@ async def weekly_digest_task():
                 )
 
         # Fun stat of the week
-        total_matches = len(squad_data["matches"])
-        total_pts = sum(s["points"] for s in squad_data["squads"].values())
+        total_matches = _realm["matches"]
+        total_pts = _realm["points"]
         fun_facts_weekly = [
-            f"⚔️ The Dominion has witnessed **{total_matches}** total battles in its chronicles!",
-            f"💎 A combined **{total_pts}** Glory Points have been earned across all kingdoms!",
+            f"⚔️ The Dominion has witnessed **{total_matches}** battles this season!",
+            f"💎 A combined **{total_pts}** Glory Points have been earned across all kingdoms this season!",
             f"🏰 **{len(SQUADS)}** kingdoms are currently vying for the throne!",
-            f"🔮 The Oracle has analysed **{total_matches}** clashes of steel — it has seen everything.",
+            f"🔮 The Oracle has analysed **{total_matches}** clashes of steel this season — it has seen everything.",
         ]
         embed.add_field(name="📜 Chronicle Fact", value=random.choice(fun_facts_weekly), inline=False)
 
@@ -3536,7 +4941,8 @@ def build_profile_embed(member: discord.Member, guild: discord.Guild):
     if stats and sn and sn != "Free Agent":
         embed.add_field(
             name="📊 Battle Record",
-            value=f"⚔️ {stats['matches_played']} battles | 🏆 {stats['wins']}W ⚔️ {stats['draws']}D 💀 {stats['losses']}L | **{stats['win_rate']:.1f}%** WR",
+            value=f"⚔️ {stats['matches_played']} battles | 🏆 {stats['wins']}W ⚔️ {stats['draws']}D 💀 {stats['losses']}L | **{stats['win_rate']:.1f}%** WR"
+                  + (f"\n📈 Form: {' '.join(stats['form'])}" if stats.get("form") else ""),
             inline=False
         )
 
@@ -3800,7 +5206,7 @@ class MemberPanelView(View):
     @discord.ui.button(label="Bounties", style=discord.ButtonStyle.primary, emoji="💰", row=3)
     async def bounty_btn(self, interaction: discord.Interaction, button: Button):
         refresh_bounties()
-        save_data(squad_data)
+        save_data(squad_data, ("bounties",))
         await interaction.response.send_message(embed=build_bounty_embed(), view=BountyBoardView(), ephemeral=True)
         await log_action(interaction.guild, "💰 Bounties", f"{interaction.user.mention} viewed **Bounty Board**")
 
@@ -3832,6 +5238,11 @@ class MemberPanelView(View):
         embed.set_footer(text="⚜️ Leaders issue challenges from /leader panel")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @discord.ui.button(label="Chronicles", style=discord.ButtonStyle.secondary, emoji="🗓️", row=3)
+    async def chronicles_btn(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.send_message(embed=build_period_embed("week"), view=PeriodStatsView(), ephemeral=True)
+        await log_action(interaction.guild, "🗓️ Chronicles", f"{interaction.user.mention} viewed the **Chronicles**")
+
     @discord.ui.button(label="Leave Kingdom", style=discord.ButtonStyle.danger, emoji="🚪", row=4)
     async def leave_btn(self, interaction: discord.Interaction, button: Button):
         role, _ = get_member_squad(interaction.user, interaction.guild)
@@ -4105,72 +5516,22 @@ class RecordBattleScoreModal(Modal, title="⚔️ Enter Battle Score"):
         t1_old_rank = get_squad_rank(self.team1_name)
         t2_old_rank = get_squad_rank(self.team2_name)
 
-        # Pre-match prediction (before stats change)
-        pred = predict_match(self.team1_name, self.team2_name)
-
+        res = apply_match_result(self.team1_name, self.team2_name, self.result.value, interaction.user.id)
+        save_data(squad_data, *res["paths"])
         team1_data = squad_data["squads"][self.team1_name]
         team2_data = squad_data["squads"][self.team2_name]
-
-        glory_tags_t1 = []
-        glory_tags_t2 = []
-        t1_pts = 0
-        t2_pts = 0
-
-        if score1 > score2:
-            t1_pts, t2_pts, glory_tags_t1, glory_tags_t2 = calculate_glory_points(
-                self.team1_name, self.team2_name, score1, score2)
-            team1_data["wins"] += 1; team1_data["points"] += t1_pts; team2_data["losses"] += 1
-            team1_streak = update_streak(self.team1_name, "win")
-            team2_streak = update_streak(self.team2_name, "loss")
-            result_text = f"🏆 **{self.team1_name}** has conquered **{self.team2_name}** in glorious battle!"
-            flavor_quote = random.choice(VICTORY_QUOTES)
-            actual_winner = self.team1_name
-        elif score2 > score1:
-            t2_pts, t1_pts, glory_tags_t2, glory_tags_t1 = calculate_glory_points(
-                self.team2_name, self.team1_name, score2, score1)
-            team2_data["wins"] += 1; team2_data["points"] += t2_pts; team1_data["losses"] += 1
-            team1_streak = update_streak(self.team1_name, "loss")
-            team2_streak = update_streak(self.team2_name, "win")
-            result_text = f"🏆 **{self.team2_name}** has conquered **{self.team1_name}** in glorious battle!"
-            flavor_quote = random.choice(VICTORY_QUOTES)
-            actual_winner = self.team2_name
-        else:
-            t1_pts = 1; t2_pts = 1
-            team1_data["draws"] += 1; team1_data["points"] += 1
-            team2_data["draws"] += 1; team2_data["points"] += 1
-            team1_streak = update_streak(self.team1_name, "draw")
-            team2_streak = update_streak(self.team2_name, "draw")
+        match_id, pred, actual_winner = res["match"]["match_id"], res["pred"], res["winner"]
+        t1_pts, t2_pts = res["pts"]
+        glory_tags_t1, glory_tags_t2 = res["tags"]
+        team1_streak, team2_streak = res["streaks"]
+        team1_achievements, team2_achievements = res["achievements"]
+        if actual_winner == "draw":
             result_text = f"⚔️ **{self.team1_name}** and **{self.team2_name}** fought to an honorable stalemate!"
             flavor_quote = random.choice(DRAW_QUOTES)
-            actual_winner = "draw"
-
-        # Refresh bounties after match
-        refresh_bounties()
-
-        # Auto-complete any active challenge between these two
-        for c in squad_data.get("challenges", []):
-            if c["status"] in ("accepted", "scheduled"):
-                if (c["challenger"] == self.team1_name and c["challenged"] == self.team2_name) or \
-                   (c["challenger"] == self.team2_name and c["challenged"] == self.team1_name):
-                    c["status"] = "completed"
-
-        team1_achievements = check_achievements(self.team1_name)
-        team2_achievements = check_achievements(self.team2_name)
-        match_id = str(uuid.uuid4())[:8]
-        team1_participants = get_match_participants(self.team1_name)
-        team2_participants = get_match_participants(self.team2_name)
-
-        match_data = {
-            "match_id": match_id, "team1": self.team1_name, "team2": self.team2_name,
-            "score": self.result.value, "date": datetime.utcnow().isoformat(),
-            "added_by": interaction.user.id,
-            "team1_participants": team1_participants, "team2_participants": team2_participants,
-            "t1_pts": t1_pts, "t2_pts": t2_pts
-        }
-        squad_data["matches"].append(match_data)
-        team1_data["match_history"].append(match_data)
-        team2_data["match_history"].append(match_data)
-        save_data(squad_data)
+        else:
+            loser = self.team2_name if actual_winner == self.team1_name else self.team1_name
+            result_text = f"🏆 **{actual_winner}** has conquered **{loser}** in glorious battle!"
+            flavor_quote = random.choice(VICTORY_QUOTES)
 
         embed = discord.Embed(title="📜 The Royal Chronicles Are Written", description=f"{result_text}\n\n*{flavor_quote}*", color=ROYAL_GOLD)
         embed.add_field(name="🆔 Match ID", value=f"`{match_id}`", inline=False)
@@ -4311,6 +5672,40 @@ class RecordBattleScoreModal(Modal, title="⚔️ Enter Battle Score"):
             await announce_event(interaction.guild, ach_embed)
 
 
+async def run_results_batch(interaction, rows, errors, source):
+    """Record a parsed batch (all or nothing) and post one announcement. Interaction must be deferred."""
+    errors = errors + backdated_errors(rows)
+    if errors:
+        await interaction.followup.send("❌ Nothing was recorded — fix these and send the batch again:\n"
+            + "\n".join(f"• {e}" for e in errors[:15])
+            + (f"\n*…and {len(errors) - 15} more*" if len(errors) > 15 else ""), ephemeral=True)
+        return
+    if not rows:
+        await interaction.followup.send("📜 No results found.", ephemeral=True)
+        return
+    results, old_ranks = record_results_batch(rows, interaction.user.id)
+    embed = build_batch_embed(results, old_ranks)
+    await announce_match(interaction.guild, embed)
+    await interaction.followup.send(f"✅ Recorded **{len(results)}** battles.", embed=embed, ephemeral=True)
+    await log_action(interaction.guild, "📜 Battles Recorded (Batch)",
+        f"{interaction.user.mention} recorded **{len(results)}** battles from {source} | IDs: "
+        + ", ".join(f"`{r['match']['match_id']}`" for r in results)[:900])
+
+
+class BulkRecordModal(Modal, title="📥 Record Battles in Bulk"):
+    results = TextInput(
+        label="One battle per line (name or tag)",
+        style=discord.TextStyle.paragraph,
+        placeholder="Manschaft 2-1 SAT\nZVS 1-1 SAT @ 2026-05-01 20:00",
+        required=True, max_length=4000
+    )
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        rows, errors = parse_bulk_results(self.results.value)
+        await run_results_batch(interaction, rows, errors, "the bulk form")
+
+
 # --- Award Title: Step 1 pick squad, Step 2 enter title + position ---
 class AwardTitleSquadView(View):
     """Step 1: Select kingdom to award title"""
@@ -4356,7 +5751,7 @@ class AwardTitleDetailsModal(Modal, title="🏆 Award Championship Title"):
         squad_info["titles"].append(full_title)
         if self.position.value.lower() in ["1st", "first", "1"]:
             squad_info["championship_wins"] = squad_info.get("championship_wins", 0) + 1
-        save_data(squad_data)
+        save_data(squad_data, ("squads", self.squad_name))
 
         pe = "🥇" if self.position.value.lower() in ["1st", "first", "1"] else "🥈" if self.position.value.lower() in ["2nd", "second", "2"] else "🥉"
         embed = discord.Embed(title="🏆 Royal Title Bestowed", description=f"{pe} **{self.squad_name}** has been awarded the title:\n\n**{full_title}**", color=ROYAL_GOLD)
@@ -4428,16 +5823,18 @@ class DeleteMatchSelectorView(View):
                 await ci.response.edit_message(content="❌ Invalid match data.", embed=None, view=None)
                 return
 
+            if find_match_by_id(match_id)[1] is None:
+                await ci.response.edit_message(content=f"❌ Match `{match_id}` was already deleted.", embed=None, view=None)
+                return
             t1d, t2d = squad_data["squads"][t1], squad_data["squads"][t2]
-            stored_t1_pts = squad_data["matches"][idx].get("t1_pts", 2)
-            stored_t2_pts = squad_data["matches"][idx].get("t2_pts", 2)
+            stored_t1_pts = match.get("t1_pts", 2)
+            stored_t2_pts = match.get("t2_pts", 2)
             if s1 > s2: t1d["wins"] -= 1; t1d["points"] -= stored_t1_pts; t2d["losses"] -= 1
             elif s2 > s1: t2d["wins"] -= 1; t2d["points"] -= stored_t2_pts; t1d["losses"] -= 1
             else: t1d["draws"] -= 1; t1d["points"] -= 1; t2d["draws"] -= 1; t2d["points"] -= 1
+            invalidate_ranking()
 
-            squad_data["matches"].pop(idx)
-            t1d["match_history"] = [m for m in t1d["match_history"] if m.get("match_id") != match_id]
-            t2d["match_history"] = [m for m in t2d["match_history"] if m.get("match_id") != match_id]
+            remove_match_record(match_id)
             t1d["current_streak"] = recalculate_streak(t1)
             t2d["current_streak"] = recalculate_streak(t2)
             save_data(squad_data)
@@ -4769,17 +6166,10 @@ class EditSquadModal(Modal, title="✏️ Edit Kingdom"):
             # --- 1. Tag change ---
             if tag_changed:
                 SQUADS[self.old_name] = new_tag
+                _retired_tags.add(self.old_tag)
+                _retired_tags.discard(new_tag)
                 changes.append(f"🏴 Tag: `{self.old_tag}` → `{new_tag}`")
 
-                # Update nicknames for all members with this role
-                role = discord.utils.get(guild.roles, name=self.old_name)
-                if role:
-                    for member in role.members:
-                        try:
-                            await safe_nick_update(member, role, new_tag)
-                        except:
-                            pass
-
             # --- 2. Kingdom name change (renames everything) ---
             if name_changed:
                 old = self.old_name
@@ -4811,14 +6201,10 @@ class EditSquadModal(Modal, title="✏️ Edit Kingdom"):
                         match["team1"] = new_name
                     if match.get("team2") == old:
                         match["team2"] = new_name
-
-                # Update squad_data["squads"][new_name]["match_history"]
-                si = squad_data["squads"].get(new_name, {})
-                for mh in si.get("match_history", []):
-                    if mh.get("team1") == old:
-                        mh["team1"] = new_name
-                    if mh.get("team2") == old:
-                        mh["team2"] = new_name
+                base = squad_data.get("season", {}).get("base_ratings", {})
+                if old in base:
+                    base[new_name] = base.pop(old)
+                rebuild_match_indexes()
 
                 # Update player squad references
                 for pk, pd in squad_data["players"].items():
@@ -4863,9 +6249,13 @@ class EditSquadModal(Modal, title="✏️ Edit Kingdom"):
 
             # --- 4. Persist ---
             ALL_TAGS = list(SQUADS.values())
+            invalidate_squad_roles()
             squad_data["squad_registry"] = dict(SQUADS)
             squad_data["guest_registry"] = dict(GUEST_ROLES)
             save_data(squad_data)
+            nick_job = queue_squad_nicks(guild, actual_name) if tag_changed else None
+            if name_changed and not tag_changed:
+                mark_squad_nicks_dirty(guild, actual_name)
 
             # --- 5. Response ---
             embed = discord.Embed(
@@ -4876,6 +6266,9 @@ class EditSquadModal(Modal, title="✏️ Edit Kingdom"):
             embed.add_field(name="📝 Changes Applied", value="\n".join(changes), inline=False)
             embed.set_footer(text="⚜️ Majestic Dominion | The royal chronicles have been rewritten!")
             await interaction.followup.send(embed=embed, ephemeral=True)
+            if nick_job and nick_job.total:
+                msg = await interaction.followup.send(nick_job.progress_line(), ephemeral=True, wait=True)
+                asyncio.create_task(report_nick_job(nick_job, msg))
             await log_action(guild, "✏️ Kingdom Edited",
                 f"{interaction.user.mention} edited **{actual_name}**: " + ", ".join(changes))
 
@@ -4931,21 +6324,43 @@ class ModeratorPanelView(View):
         e = discord.Embed(title="🗑️ Clear Squad History", description="Select a player:", color=ROYAL_RED)
         await interaction.response.send_message(embed=e, view=v, ephemeral=True)
 
+    @discord.ui.button(label="Bulk Record", style=discord.ButtonStyle.primary, emoji="📥", row=1)
+    async def bulk_record_btn(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.send_modal(BulkRecordModal())
+        await log_action(interaction.guild, "📥 Bulk Record", f"{interaction.user.mention} started **Bulk Record**")
+
+    @discord.ui.button(label="Close Season", style=discord.ButtonStyle.danger, emoji="🏁", row=1)
+    async def close_season_btn(self, interaction: discord.Interaction, button: Button):
+        n = current_season_number()
+        embed = discord.Embed(
+            title=f"🏁 Close Season {n}",
+            description=(f"⚠️ This freezes the standings, archives **{len(squad_data['matches'])}** battles "
+                         f"and resets every kingdom's points and record for **Season {n + 1}**.\n"
+                         f"Ratings, titles, achievements and best streaks carry over."),
+            color=ROYAL_RED
+        )
+        await interaction.response.send_message(embed=embed, view=CloseSeasonConfirmView(interaction.user.id), ephemeral=True)
+
     @discord.ui.button(label="Download Backup", style=discord.ButtonStyle.secondary, emoji="💾", row=2)
     async def backup_btn(self, interaction: discord.Interaction, button: Button):
-
-        if not os.path.exists(DATA_FILE):
-            await interaction.response.send_message("❌ No data file found.", ephemeral=True)
-            return
+        await interaction.response.defer(ephemeral=True)
+        fname = f"backup_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip"
         try:
-            await interaction.response.send_message(
-                "💾 **Data Backup**",
-                file=discord.File(DATA_FILE, filename=f"backup_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"),
+            # Export from memory (includes unflushed changes). Encode on the loop like
+            # the persist path does — handlers may be mutating squad_data meanwhile
+            raw = _store.encode_snapshot(squad_data)
+            numbers = [s["number"] for s in squad_data.get("seasons", [])]
+            blob, missing = await asyncio.to_thread(build_backup_zip, raw, numbers)
+            note = (f"\n⚠️ No archive on disk for season(s) {', '.join(map(str, missing))} — not included."
+                    if missing else "")
+            await interaction.followup.send(
+                f"💾 **Data Backup** — live data + {len(numbers) - len(missing)} season archive(s){note}",
+                file=discord.File(io.BytesIO(blob), filename=fname),
                 ephemeral=True
             )
             await log_action(interaction.guild, "💾 Backup", f"{interaction.user.mention} downloaded backup")
         except Exception as e:
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+            await interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
 
     @discord.ui.button(label="War Oracle", style=discord.ButtonStyle.primary, emoji="🔮", row=2)
     async def oracle_btn(self, interaction: discord.Interaction, button: Button):
@@ -4991,7 +6406,7 @@ class ModeratorPanelView(View):
     @discord.ui.button(label="Bounties", style=discord.ButtonStyle.primary, emoji="💰", row=4)
     async def bounty_btn(self, interaction: discord.Interaction, button: Button):
         refresh_bounties()
-        save_data(squad_data)
+        save_data(squad_data, ("bounties",))
         embed = build_bounty_embed()
         embed.title = "💰 Bounty Manager"
         await interaction.response.send_message(embed=embed, view=ManageBountiesView(), ephemeral=True)
@@ -5041,6 +6456,42 @@ class ModeratorPanelView(View):
         await log_action(interaction.guild, "🎪 Events", f"{interaction.user.mention} opened **Event Manager**")
 
 
+class CloseSeasonConfirmView(View):
+    """Confirmation button for closing the running season."""
+    def __init__(self, author_id: int):
+        super().__init__(timeout=60)
+        self.author_id = author_id
+
+    @discord.ui.button(label="Close Season", style=discord.ButtonStyle.danger, emoji="🏁")
+    async def confirm_btn(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.author_id:
+            return await interaction.response.send_message("❌ Not yours.", ephemeral=True)
+        try:
+            summary = close_season()
+            await _persist.flush_async()
+        except Exception as e:
+            return await interaction.response.edit_message(content=f"❌ Error: {e}", embed=None, view=None)
+        embed = build_season_embed(summary["number"])
+        await interaction.response.edit_message(embed=embed, view=None)
+        await log_action(interaction.guild, "🏁 Season Closed",
+            f"{interaction.user.mention} closed **Season {summary['number']}** ({summary['match_count']} battles archived)")
+        podium = "\n".join(f"{'🥇🥈🥉'[i]} **{s['name']}** — {s['points']} pts"
+                           for i, s in enumerate(summary["standings"][:3]))
+        pub = discord.Embed(
+            title=f"🏁 SEASON {summary['number']} HAS ENDED!",
+            description=(f"👑 **{summary['champion']}** reigns as champion!\n\n" if summary["champion"] else "")
+                        + (podium or "*No battles were fought.*")
+                        + f"\n\n⚔️ **Season {summary['number'] + 1}** begins now — every kingdom starts at zero!",
+            color=ROYAL_GOLD
+        )
+        pub.set_footer(text="⚜️ Majestic Dominion | The chronicles turn a page.")
+        await announce_major(interaction.guild, pub)
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, emoji="✖️")
+    async def cancel_btn(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.edit_message(content="Cancelled.", embed=None, view=None)
+
+
 async def show_recent_matches(interaction, limit=10):
     recent = squad_data["matches"][-limit:][::-1]
     if not recent:
@@ -5058,27 +6509,91 @@ async def show_recent_matches(interaction, limit=10):
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
-async def show_fun_stats(interaction):
-    tm = len(squad_data["matches"])
-    tp = sum(s["points"] for s in squad_data["squads"].values())
-    tw = sum(s["wins"] for s in squad_data["squads"].values())
-    td = sum(s["draws"] for s in squad_data["squads"].values())
+def build_period_embed(period):
+    """Chronicle of one window (week / month / season) from the time index."""
+    s = period_summary(period)
+    start = period_start(period)
+    since = start.strftime("%b %d, %Y") if start else "the first battle"
+    title = f"Season {current_season_number()}" if period == "season" else PERIODS[period]
+    embed = discord.Embed(title=f"🗓️ Royal Chronicle — {title}",
+        description=f"*Since {since}*\n⚔️ **{len(s['matches'])}** battles · 🤝 **{s['draws']}** draws",
+        color=ROYAL_GOLD)
+    if s["wins"]:
+        top = sorted(s["wins"].items(), key=lambda x: -x[1])[:5]
+        embed.add_field(name="🏆 Most Victories", value="\n".join(
+            f"{SQUADS.get(n, '?')} **{n}** — {w}W" for n, w in top), inline=True)
+    if s["played"]:
+        busy = sorted(s["played"].items(), key=lambda x: -x[1])[:5]
+        embed.add_field(name="⚔️ Most Active", value="\n".join(
+            f"{SQUADS.get(n, '?')} **{n}** — {c} battles" for n, c in busy), inline=True)
+    if s["matches"]:
+        embed.add_field(name="📜 Latest Battles", value="\n".join(
+            f"• {m['team1']} **{m['score']}** {m['team2']} ({(m.get('date') or '?')[:10]})"
+            for m in s["matches"][-5:][::-1]), inline=False)
+    apply_branding(embed, thumbnail=True)
+    return embed
+
+
+def build_season_embed(number):
+    """Frozen standings of a closed season; the archive is read for its last battles."""
+    s = season_summary(number)
+    if s is None:
+        return discord.Embed(title=f"🗓️ Season {number}", description="*No such season.*", color=ROYAL_RED)
+    span = " → ".join((d or "?")[:10] for d in (s.get("started"), s.get("ended")))
+    desc = f"*{span}*\n⚔️ **{s['match_count']}** battles"
+    if s.get("champion"):
+        desc += f"\n👑 Champion: **{s['champion']}**"
+    embed = discord.Embed(title=f"🗓️ Season {number} — Final Standings", description=desc, color=ROYAL_GOLD)
+    if s["standings"]:
+        embed.add_field(name="🏆 Standings", value="\n".join(
+            f"`{r['rank']:>2}` {r['tag']} **{r['name']}** — {r['points']} pts "
+            f"({r['wins']}W/{r['draws']}D/{r['losses']}L)" for r in s["standings"][:10]), inline=False)
+    doc = load_season(number)
+    if doc and doc.get("matches"):
+        embed.add_field(name="📜 Final Battles", value="\n".join(
+            f"• {m['team1']} **{m['score']}** {m['team2']} ({(m.get('date') or '?')[:10]})"
+            for m in doc["matches"][-5:][::-1]), inline=False)
+    apply_branding(embed, thumbnail=True)
+    return embed
+
+
+class PeriodStatsView(View):
+    """Switch the chronicle between this week / month / season, or open a past season."""
+    def __init__(self):
+        super().__init__(timeout=180)
+        for period, label in PERIODS.items():
+            btn = Button(label=label, style=discord.ButtonStyle.secondary)
+            btn.callback = self._make_cb(period)
+            self.add_item(btn)
+        past = squad_data.get("seasons", [])[-25:][::-1]
+        if past:
+            sel = Select(placeholder="📚 Past seasons...", row=1, options=[
+                discord.SelectOption(label=f"Season {s['number']}", value=str(s["number"]),
+                                     description=(f"👑 {s['champion']}" if s.get("champion") else "No champion")[:100])
+                for s in past])
+            sel.callback = self._season_cb
+            self.add_item(sel)
+
+    def _make_cb(self, period):
+        async def cb(interaction):
+            await interaction.response.edit_message(embed=build_period_embed(period), view=self)
+        return cb
+
+    async def _season_cb(self, interaction):
+        number = int(interaction.data["values"][0])
+        await interaction.response.edit_message(embed=build_season_embed(number), view=self)
 
-    lws_name, lws = None, 0
-    mas_name, mas_count = None, 0
-    mach_name, mach_count = None, 0
 
-    for sn, d in squad_data["squads"].items():
-        if d.get("biggest_win_streak", 0) > lws: lws = d["biggest_win_streak"]; lws_name = sn
-        mc = d["wins"] + d["draws"] + d["losses"]
-        if mc > mas_count: mas_count = mc; mas_name = sn
-        ac = len(d.get("achievements", []))
-        if ac > mach_count: mach_count = ac; mach_name = sn
+async def show_fun_stats(interaction):
+    tm, tp, tw, td = _realm["matches"], _realm["points"], _realm["wins"], _realm["draws"]
+
+    lws_name, lws = realm_record("best_streak")
+    mas_name, mas_count = realm_record("played")
 
     rankings = get_squad_ranking()[:3]
 
     embed = discord.Embed(title="🎲 Realm Statistics", description="Fun facts from the chronicles!", color=ROYAL_GOLD)
-    embed.add_field(name="📊 Global", value=f"⚔️ {tm} battles | 💎 {tp} points | 🏆 {tw} victories | 🤝 {td} draws", inline=False)
+    embed.add_field(name=f"📊 Season {current_season_number()}", value=f"⚔️ {tm} battles | 💎 {tp} points | 🏆 {tw} victories | 🤝 {td} draws", inline=False)
     if lws_name and lws > 0:
         embed.add_field(name="🔥 Best Win Streak", value=f"**{lws_name}** — {lws} in a row!", inline=False)
     if mas_name and mas_count > 0:
@@ -5086,12 +6601,23 @@ async def show_fun_stats(interaction):
     if rankings:
         podium = "\n".join(f"{'🥇🥈🥉'[i]} **{s['name']}** ({s['points']} pts)" for i, s in enumerate(rankings))
         embed.add_field(name="👑 Top 3", value=podium, inline=False)
+    rivalries = get_all_rivalries()[:3]
+    if rivalries:
+        embed.add_field(name="⚔️ Fiercest Rivalries", value="\n".join(
+            f"**{r['squad1']}** {r['squad1_wins']}-{r['draws']}-{r['squad2_wins']} **{r['squad2']}** ({r['total']} clashes)"
+            for r in rivalries), inline=False)
 
     facts = [
         f"🏰 **{len(SQUADS)}** kingdoms compete for glory!",
         f"💎 Average points: **{tp // len(SQUADS)}** per kingdom",
         f"⚔️ **{(td/tm*100):.0f}%** of battles end in draws!" if tm > 0 else "⚔️ First battles await!",
     ]
+    mach_name, mach_count = realm_record("achievements")
+    if mach_name:
+        facts.append(f"🏅 **{mach_name}** holds the most achievements (**{mach_count}**)!")
+    if _realm["per_week"]:
+        busiest = max(_realm["per_week"], key=_realm["per_week"].get)
+        facts.append(f"📅 Busiest week this season: **{busiest}** with **{_realm['per_week'][busiest]}** battles!")
     embed.add_field(name="💡 Did You Know?", value=random.choice(facts), inline=False)
     embed.set_footer(text="⚜️ History is written by the victorious!")
     await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -5122,6 +6648,7 @@ class HelpView(View):
             embed.add_field(name="⚜️ My Profile", value="View your royal warrior scroll", inline=False)
             embed.add_field(name="⚙️ Setup Profile", value="Register your identity with the Crown", inline=False)
             embed.add_field(name="🎲 Fun Stats", value="Royal court curiosities and realm trivia", inline=False)
+            embed.add_field(name="🗓️ Chronicles", value="Battles, victors and most active kingdoms this week, month or season", inline=False)
             embed.add_field(name="🔮 War Oracle", value="AI-powered match predictor — see win probabilities before battles!", inline=False)
             embed.add_field(name="📰 Realm News", value="Auto-generated news bulletin with latest headlines", inline=False)
             embed.add_field(name="💰 Bounties", value="View the Bounty Board — beat top-ranked kingdoms for bonus Glory Points!", inline=False)
@@ -5147,7 +6674,7 @@ class HelpView(View):
             embed.add_field(name="🗑️ Delete Match", value="Select a match from recent matches dropdown to delete", inline=False)
             embed.add_field(name="📜 Recent Matches", value="View the last 10 recorded battles", inline=False)
             embed.add_field(name="🗑️ Clear History", value="Select a player to clear their squad transfer history", inline=False)
-            embed.add_field(name="💾 Download Backup", value="Download the full data file as JSON", inline=False)
+            embed.add_field(name="💾 Download Backup", value="Download the live data plus every closed season's archive as a zip", inline=False)
             embed.add_field(name="🔮 War Oracle", value="AI match prediction before recording battles", inline=False)
             embed.add_field(name="🏰 Add Kingdom", value="Create a new kingdom with squad role, tag, and guest role", inline=False)
             embed.add_field(name="✏️ Edit Kingdom", value="Edit a kingdom's name, tag, or guest role — renames Discord roles too", inline=False)
@@ -5509,7 +7036,7 @@ async def guide_command(interaction: discord.Interaction):
     # Clear stored IDs so setup re-posts
     squad_data.pop(BOT_GUIDE_POSTED_KEY, None)
     squad_data.pop("bot_guide_banner_id", None)
-    save_data(squad_data)
+    save_data(squad_data, (BOT_GUIDE_POSTED_KEY,), ("bot_guide_banner_id",))
 
     # Re-post
     await setup_bot_commands_channel(interaction.guild)
@@ -5557,9 +7084,9 @@ async def help_command(interaction: discord.Interaction):
 
 
 @bot.tree.command(name="restore", description="💾 Restore the royal archives from a backup scroll")
-@app_commands.describe(backup="The backup JSON file to restore")
+@app_commands.describe(backup="The backup file to restore (.zip with season archives, or a plain .json)")
 async def restore_command(interaction: discord.Interaction, backup: discord.Attachment):
-    global squad_data
+    global ALL_TAGS
 
     # Only moderators can restore
     if not is_moderator(interaction.user):
@@ -5567,16 +7094,18 @@ async def restore_command(interaction: discord.Interaction, backup: discord.Atta
         return
 
     # Validate file
-    if not backup.filename.endswith(".json"):
-        await interaction.response.send_message("❌ Please upload a `.json` file.", ephemeral=True)
+    if not backup.filename.lower().endswith((".json", ".zip")):
+        await interaction.response.send_message("❌ Please upload a `.zip` or `.json` backup.", ephemeral=True)
         return
 
     await interaction.response.defer(ephemeral=True)
+    # Land any pending writes before the data is replaced
+    await _persist.flush_async()
 
     try:
         # Download and parse
         file_bytes = await backup.read()
-        new_data = json.loads(file_bytes.decode("utf-8"))
+        new_data, archives = await asyncio.to_thread(read_backup, file_bytes, backup.filename)
 
         # Basic validation — must have these keys
         if "squads" not in new_data or "matches" not in new_data:
@@ -5587,43 +7116,15 @@ async def restore_command(interaction: discord.Interaction, backup: discord.Atta
         if "players" not in new_data:
             new_data["players"] = {}
 
-        # Fill in any missing squad entries
-        for match in new_data.get("matches", []):
-            if "team1_participants" not in match:
-                match["team1_participants"] = []
-            if "team2_participants" not in match:
-                match["team2_participants"] = []
-
-        # Rebuild registries from backup
-        if "squad_registry" in new_data:
-            SQUADS.clear()
-            SQUADS.update(new_data["squad_registry"])
-        else:
-            # Old backup format — rebuild from defaults + dynamic
-            SQUADS.clear()
-            SQUADS.update(DEFAULT_SQUADS)
-            for sn, info in new_data.get("dynamic_squads", {}).items():
-                SQUADS[sn] = info.get("tag", "?")
-            for sn, si in new_data.get("squads", {}).items():
-                if si.get("disbanded") and sn in SQUADS:
-                    del SQUADS[sn]
-            new_data["squad_registry"] = dict(SQUADS)
-
-        if "guest_registry" in new_data:
-            GUEST_ROLES.clear()
-            GUEST_ROLES.update(new_data["guest_registry"])
-        else:
-            GUEST_ROLES.clear()
-            GUEST_ROLES.update(DEFAULT_GUEST_ROLES)
-            for sn, info in new_data.get("dynamic_squads", {}).items():
-                if info.get("guest_role"):
-                    GUEST_ROLES[sn] = info["guest_role"]
-            for sn, si in new_data.get("squads", {}).items():
-                if si.get("disbanded") and sn in GUEST_ROLES:
-                    del GUEST_ROLES[sn]
-            new_data["guest_registry"] = dict(GUEST_ROLES)
+        # Rebuild registries from backup (migrating old formats)
+        _migrate_registries(new_data)
+        _migrate_match_history(new_data)
+        _migrate_match_scores(new_data)
+        _migrate_season(new_data)
 
+        _retired_tags.update(set(ALL_TAGS) - set(SQUADS.values()))
         ALL_TAGS = list(SQUADS.values())
+        invalidate_squad_roles()
 
         # Ensure new data fields exist
         if "challenges" not in new_data:
@@ -5631,9 +7132,17 @@ async def restore_command(interaction: discord.Interaction, backup: discord.Atta
         if "bounties" not in new_data:
             new_data["bounties"] = {}
 
-        # Save to disk and update runtime
-        save_data(new_data)
-        squad_data = new_data
+        # Closed seasons live in their own files — put them back before the data points at them
+        missing_seasons = await asyncio.to_thread(restore_season_archives, archives, new_data.get("seasons", []))
+
+        # Update runtime in place (the Oracle holds a reference) and save
+        squad_data.clear()
+        squad_data.update(new_data)
+        rebuild_match_indexes()
+        replay_diffs = reconcile_match_log()
+        save_data(squad_data)
+        await _persist.flush_async()
+        mark_nick_dirty(interaction.guild, [m.id for m in interaction.guild.members])
 
         # Stats for confirmation
         num_squads = len(new_data["squads"])
@@ -5648,8 +7157,16 @@ async def restore_command(interaction: discord.Interaction, backup: discord.Atta
         embed.add_field(name="📊 Restored", value=(
             f"🏰 **{num_squads}** kingdoms\n"
             f"⚔️ **{num_matches}** matches\n"
-            f"👤 **{num_players}** player profiles"
+            f"👤 **{num_players}** player profiles\n"
+            f"📜 **{len(archives)}** season archive(s)"
         ), inline=False)
+        if missing_seasons:
+            embed.add_field(name="⚠️ Missing Season Archives", value=(
+                f"No archive for season(s) {', '.join(map(str, missing_seasons))} — their matches are "
+                f"left out of past-season stats and `/backtest`."), inline=False)
+        if replay_diffs:
+            embed.add_field(name=f"🔁 Corrected From Match Log ({len(replay_diffs)})",
+                            value=format_replay_diffs(replay_diffs, limit=10)[:1024], inline=False)
         embed.set_footer(text="⚜️ The chronicles have been restored!")
         await interaction.followup.send(embed=embed, ephemeral=True)
         await log_action(interaction.guild, "💾 Data Restored",
@@ -5661,6 +7178,53 @@ async def restore_command(interaction: discord.Interaction, backup: discord.Atta
         await interaction.followup.send(f"❌ Restore failed: {e}", ephemeral=True)
 
 
+@bot.tree.command(name="import_results", description="📥 Record a batch of battle results from a CSV or JSON file (Moderator only)")
+@app_commands.describe(file="CSV (team1,team2,score[,date]), JSON list, or 'Team A 2-1 Team B' lines; no date before last battle")
+async def import_results_command(interaction: discord.Interaction, file: discord.Attachment):
+    if not is_moderator(interaction.user):
+        await interaction.response.send_message("❌ Only the **Royal Council** may use this.", ephemeral=True)
+        return
+    if file.size > 256 * 1024:
+        await interaction.response.send_message("❌ File too large (256 KB max).", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except Exception as e:
+        await interaction.followup.send(f"❌ Couldn't read `{file.filename}`: {e}", ephemeral=True)
+        return
+    name = file.filename.lower()
+    fmt = "json" if name.endswith(".json") else "csv" if name.endswith(".csv") else "lines"
+    rows, errors = parse_bulk_results(text, fmt)
+    await run_results_batch(interaction, rows, errors, f"`{file.filename}`")
+
+
+@bot.tree.command(name="backtest", description="🔮 Score the Oracle's predictions against match history (Moderator only)")
+@app_commands.describe(k="Candidate Elo K-factor", k_provisional="Candidate K for squads still being placed",
+                       draw_base="Candidate draw chance for an even matchup (%)")
+async def backtest_command(interaction: discord.Interaction, k: Optional[int] = None,
+                           k_provisional: Optional[int] = None, draw_base: Optional[int] = None):
+    if not is_moderator(interaction.user):
+        await interaction.response.send_message("❌ Only the **Royal Council** may use this.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    # Replaying every season is CPU-bound — keep it off the event loop
+    reports = [archive_report(), await asyncio.to_thread(backtest)]
+    if k is not None or k_provisional is not None or draw_base is not None:
+        candidate = EloModel(k=k if k is not None else ELO_K,
+                             k_provisional=k_provisional if k_provisional is not None else ELO_K_PROVISIONAL,
+                             draw_base=draw_base if draw_base is not None else 30)
+        reports.append(await asyncio.to_thread(backtest, candidate))
+
+    embed = discord.Embed(title="🔮 Oracle Backtest",
+        description="\n\n".join(format_backtest_report(r) for r in reports)[:4000], color=ROYAL_PURPLE)
+    embed.set_footer(text="Lower Brier / log-loss is better · replay never touches live ratings")
+    apply_branding(embed, thumbnail=True)
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+
 # =====================================================================
 #                    TOURNAMENT ENGINE v2
 # =====================================================================
@@ -6562,7 +8126,7 @@ class EventMatchScoreModal(Modal, title="⚔️ Record Match Result"):
         result_info = TournamentEngine.record_result(
             self.event, self.match["match_id"], winner, score, interaction.user.id
         )
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
 
         # Confirm to mod
         conf = discord.Embed(
@@ -6677,7 +8241,7 @@ class AddRegistrantModal(Modal, title="➕ Add Registrant"):
                 "team_name": name, "leader_id": None, "members": [],
                 "registered_at": datetime.utcnow().isoformat(), "added_by_mod": True
             })
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="✅ Registrant Added",
             description=f"**{name}** added to **{self.event['name']}**.", color=ROYAL_GREEN)
         apply_branding(embed, thumbnail=True)
@@ -6711,7 +8275,7 @@ class ReplaceRegistrantModal(Modal, title="✏️ Replace Registrant"):
             import json
             bd_str = json.dumps(bd).replace(f'"{old}"', f'"{new}"')
             self.event["bracket_data"] = json.loads(bd_str)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="✅ Registrant Replaced",
             description=f"**{old}** → **{new}** in **{self.event['name']}**.", color=ROYAL_GREEN)
         apply_branding(embed, thumbnail=True)
@@ -6738,7 +8302,7 @@ class ForceAdvanceView(View):
         rounds = bd.get("rounds", [])
         if cur + 1 < len(rounds):
             bd["current_round"] = cur + 1
-            save_data(squad_data)
+            save_data(squad_data, _list_path("events", self.event))
             embed = discord.Embed(title="⚡ Force Advanced",
                 description=f"Advanced to **Round {cur + 2}** manually.", color=ROYAL_GOLD)
             apply_branding(embed, thumbnail=True)
@@ -6767,7 +8331,7 @@ class DeclareWinnerModal(Modal, title="🏆 Declare Tournament Winner"):
         bd = self.event.get("bracket_data")
         if bd:
             bd["champion"] = winner
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="🏆 Winner Declared",
             description=f"**{winner}** declared champion of **{self.event['name']}**.",
             color=ROYAL_GOLD)
@@ -6876,6 +8440,15 @@ class EventManagerViewV2(View):
         await interaction.response.send_message(embed=embed,
             view=EventActionSelectView(evs, "force", interaction.user.id), ephemeral=True)
 
+    @discord.ui.button(label="🔮 Predictions", style=discord.ButtonStyle.primary, row=3)
+    async def predict_btn(self, interaction, button):
+        evs = [e for e in get_all_events() if e.get("bracket_data")]
+        if not evs: return await interaction.response.send_message("❌ No events with brackets.", ephemeral=True)
+        embed = discord.Embed(title="🔮 Prediction Slate", description="Select event:", color=ROYAL_PURPLE)
+        apply_branding(embed, thumbnail=True)
+        await interaction.response.send_message(embed=embed,
+            view=EventActionSelectViewV2(evs, "predict", interaction.user.id), ephemeral=True)
+
     @discord.ui.button(label="🔄 Refresh", style=discord.ButtonStyle.secondary, row=3)
     async def refresh_btn(self, interaction, button):
         await interaction.response.edit_message(embed=build_event_manager_embed(), view=EventManagerViewV2())
@@ -6956,7 +8529,7 @@ class EventActionSelectViewV2(View):
                 view=ForceAdvanceView(event, interaction.user.id), ephemeral=True)
 
         elif self.action == "start":
-            event["status"] = "live"; save_data(squad_data)
+            event["status"] = "live"; save_data(squad_data, _list_path("events", event))
             embed = discord.Embed(title="▶️ Event Live!",
                 description=f"**{event['name']}** is now **LIVE**.", color=ROYAL_GREEN)
             apply_branding(embed, thumbnail=True)
@@ -6973,7 +8546,7 @@ class EventActionSelectViewV2(View):
                 f"{interaction.user.mention} started **{event['name']}**")
 
         elif self.action == "close":
-            event["status"] = "completed"; save_data(squad_data)
+            event["status"] = "completed"; save_data(squad_data, _list_path("events", event))
             champ = TournamentEngine.champion(event)
             embed = discord.Embed(title="⏹️ Event Closed!",
                 description=f"**{event['name']}** is now closed." + (f"\n👑 Champion: **{champ}**" if champ else ""),
@@ -7026,6 +8599,11 @@ class EventActionSelectViewV2(View):
             await interaction.response.send_message(embed=embed,
                 view=ScheduleMatchSelectView(event, unscheduled, interaction.user.id), ephemeral=True)
 
+        elif self.action == "predict":
+            fixtures = [(m["team1"], m["team2"]) for m in TournamentEngine.pending_matches(event)]
+            embed = build_prediction_slate_embed(f"🔮 Prediction Slate — {event['name']}", fixtures)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 # ── Updated public EventDetailView ───────────────────────────────────
 
@@ -7833,7 +9411,7 @@ class SocialEventManagerView(View):
             return await interaction.response.send_message("❌ No active round.", ephemeral=True)
         active["status"] = "completed"
         active["completed_at"] = datetime.utcnow().isoformat()
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="⏹️ Round Closed",
             description=f"**{active['round_name']}** closed without results.", color=ROYAL_RED)
         apply_branding(embed, thumbnail=True)
@@ -7846,7 +9424,7 @@ class SocialEventManagerView(View):
         if not name:
             return await interaction.response.send_message("❌ No registrations.", ephemeral=True)
         SocialEventEngine.log_moment(self.event, f"{name} was put in the spotlight!", "🎯")
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_social_spotlight_embed(self.event, name)
         await interaction.response.edit_message(embed=embed, view=self)
         await announce_event(interaction.guild, build_social_spotlight_embed(self.event, name))
@@ -7860,7 +9438,7 @@ class SocialEventManagerView(View):
         if not p1:
             return await interaction.response.send_message("❌ Need at least 2 on leaderboard.", ephemeral=True)
         SocialEventEngine.log_moment(self.event, f"Sudden Death: {p1} vs {p2}!", "⚡")
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_social_sudden_death_embed(self.event, p1, p2)
         await interaction.response.edit_message(embed=embed, view=self)
         await announce_event(interaction.guild, build_social_sudden_death_embed(self.event, p1, p2))
@@ -7874,7 +9452,7 @@ class SocialEventManagerView(View):
         if not pairs:
             return await interaction.response.send_message("❌ No registrations to shuffle.", ephemeral=True)
         SocialEventEngine.log_moment(self.event, "All pairings reshuffled — pure chaos!", "🌀")
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_social_chaos_embed(self.event, pairs)
         await interaction.response.edit_message(embed=embed, view=self)
         await announce_event(interaction.guild, build_social_chaos_embed(self.event, pairs))
@@ -7893,7 +9471,7 @@ class SocialEventManagerView(View):
         lb.setdefault(name, {"total_points":0,"rounds_played":0,"wins":0,"round_scores":[]})
         lb[name]["total_points"] += 1
         SocialEventEngine.log_moment(self.event, f"{name} won the Lucky Draw — +1 bonus point! 🎰", "🎰")
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(
             title="🎰 LUCKY DRAW!",
             description=f"## 🍀 {name}\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
@@ -8003,7 +9581,7 @@ class StartSocialRoundModal(Modal, title="▶️ Start New Round"):
             parts = [p.strip() for p in self.custom_participants.value.strip().split("\n") if p.strip()]
         rnd = SocialEventEngine.create_round(self.event, self.round_name.value.strip(), parts)
         rnd["status"] = "live"
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_social_round_start_embed(self.event, rnd)
         await interaction.response.edit_message(
             embed=build_social_dashboard_embed(self.event),
@@ -8114,7 +9692,7 @@ class RecordSocialRoundModal(Modal, title="📝 Record Match Results"):
 
         result_info = SocialEventEngine.record_round_results(
             self.event, self.rnd["round_id"], results, interaction.user.id)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
 
         recap = build_social_round_recap_embed(self.event, self.rnd, result_info)
         await interaction.response.edit_message(
@@ -8140,7 +9718,7 @@ class LogMomentModal(Modal, title="✨ Log Event Highlight"):
         emoji = self.emoji_input.value.strip() or random.choice(HIGHLIGHT_EMOJIS)
         desc  = self.description.value.strip()
         SocialEventEngine.log_moment(self.event, desc, emoji)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         moment_embed = build_social_moment_embed(self.event, emoji, desc)
         await interaction.response.edit_message(
             embed=build_social_dashboard_embed(self.event),
@@ -8168,7 +9746,7 @@ class CrownMVPModal(Modal, title="👑 Crown Event MVP"):
                 "❌ Could not determine MVP. Record some round results first.", ephemeral=True)
         self.event["status"]   = "completed"
         self.event["champion"] = mvp
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         mvp_embed = build_social_mvp_embed(self.event, mvp)
         await interaction.response.edit_message(
             embed=build_social_dashboard_embed(self.event),
@@ -8214,7 +9792,7 @@ class SocialSettingsModal(Modal, title="⚙️ MLBB Event Settings"):
         fl = self.flavor.value.strip().lower() if self.flavor.value else "custom"
         if fl in SOCIAL_FLAVORS:
             sd["flavor"] = fl
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         sys_info  = SCORING_SYSTEMS[sc]
         flav_name = SOCIAL_FLAVORS.get(fl, "⚙️ Custom")
         fmt_desc  = MLBB_EVENT_FORMATS.get(fl, "")
@@ -9046,7 +10624,7 @@ async def handle_cancel_registration(interaction, event):
         return await interaction.response.send_message(
             "❌ Only the **team leader** who registered can cancel.", ephemeral=True)
     event["registrations"].pop(idx)
-    save_data(squad_data)
+    save_data(squad_data, _list_path("events", event))
     embed = discord.Embed(title="✅ Registration Cancelled",
         description=f"You have been removed from **{event['name']}**.",
         color=ROYAL_RED)
@@ -9071,7 +10649,7 @@ class SoloRegisterModal(Modal, title="📝 Confirm Solo Registration"):
             "player_name": interaction.user.display_name,
             "registered_at": datetime.utcnow().isoformat()
         })
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="✅ You're Registered!",
             description=f"You have joined **{self.event['name']}**!\n📅 {self.event['date']}",
             color=ROYAL_GREEN)
@@ -9112,7 +10690,7 @@ class SmallTeamRegisterModal(Modal, title="📝 Team Registration"):
             "team_name": tname, "leader_id": str(interaction.user.id),
             "members": member_ids[1:], "registered_at": datetime.utcnow().isoformat()
         })
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         filled = len(member_ids)
         desc = f"**{tname}** joined **{self.event['name']}**!\n📅 {self.event['date']}\n👥 {filled}/{ts} members"
         if filled < ts:
@@ -9161,7 +10739,7 @@ class SquadRegisterConfirmView(View):
             "members": [m for m in mains if m != leader_id],
             "squad_ref": self.sq_name, "registered_at": datetime.utcnow().isoformat()
         })
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="✅ Kingdom Registered!",
             description=f"{self.tag} **{self.sq_name}** entered **{self.event['name']}**!\n📅 {self.event['date']}",
             color=ROYAL_GREEN)
@@ -9302,7 +10880,7 @@ class EventActionSelectView(View):
                 view=RegistrationsPageView(event, 1, interaction.user.id, interaction.guild), ephemeral=True)
 
         elif self.action == "start":
-            event["status"] = "ongoing"; save_data(squad_data)
+            event["status"] = "ongoing"; save_data(squad_data, _list_path("events", event))
             embed = discord.Embed(title="▶️ Event Started!",
                 description=f"**{event['name']}** is now **ONGOING**.", color=ROYAL_GREEN)
             apply_branding(embed, thumbnail=True)
@@ -9314,7 +10892,7 @@ class EventActionSelectView(View):
             await log_action(interaction.guild, "▶️ Event Started", f"{interaction.user.mention} started **{event['name']}**")
 
         elif self.action == "close":
-            event["status"] = "closed"; save_data(squad_data)
+            event["status"] = "closed"; save_data(squad_data, _list_path("events", event))
             embed = discord.Embed(title="⏹️ Event Closed!",
                 description=f"**{event['name']}** is now **CLOSED**.", color=ROYAL_RED)
             apply_branding(embed, thumbnail=True)
@@ -9352,7 +10930,7 @@ class ConfirmDeleteEventView(View):
     @discord.ui.button(label="✅ Confirm Delete", style=discord.ButtonStyle.danger)
     async def confirm(self, interaction, button):
         squad_data["events"] = [e for e in get_all_events() if e["id"] != self.event["id"]]
-        save_data(squad_data)
+        save_data(squad_data, ("events",))
         embed = discord.Embed(title="🗑️ Event Deleted", description=f"**{self.event['name']}** removed.", color=ROYAL_RED)
         apply_branding(embed, thumbnail=True)
         await interaction.response.edit_message(embed=embed, view=None)
@@ -9421,7 +10999,7 @@ class RemoveRegistrantView(View):
         if idx >= len(self.event["registrations"]):
             return await interaction.response.edit_message(content="❌ Invalid selection.", embed=None, view=None)
         removed = self.event["registrations"].pop(idx)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         name = get_reg_name(removed)
         embed = discord.Embed(title="✅ Registrant Removed",
             description=f"**{name}** removed from **{self.event['name']}**.", color=ROYAL_RED)
@@ -9449,7 +11027,7 @@ class RandomizeView(View):
     async def _gen(self, interaction, bd, label):
         self.event["bracket_data"] = bd
         self.event["schedule"] = []
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_bracket_embed(self.event)
         await interaction.response.edit_message(embed=embed, view=None)
         await announce_major(interaction.guild, build_bracket_embed(self.event))
@@ -9551,7 +11129,7 @@ class RandomizeView(View):
         if not self._ok(interaction): return
         self.event["bracket_data"] = None
         self.event["schedule"] = []
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         desc = ("**Choose a draw type above:**\n\n"
                 "**Row 1 — Simple Draws** (no bracket)\n"
                 "🎲 **Random Draw** — pair everyone up randomly\n"
@@ -9588,7 +11166,7 @@ class RandomTeamSizeModal(Modal, title="👥 Random Teams — Team Size"):
         bd = generate_random_teams_from_solo(regs, team_size=ts)
         self.event["bracket_data"] = bd
         self.event["schedule"] = []
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_bracket_embed(self.event)
         await interaction.response.send_message(embed=embed, ephemeral=True)
         await announce_major(interaction.guild, build_bracket_embed(self.event))
@@ -9618,7 +11196,7 @@ class GatherGroupModal(Modal, title="👥 Gather Random Group"):
         bd = generate_gather_group(regs, size=n)
         self.event["bracket_data"] = bd
         self.event["schedule"] = []
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         # Confirmation embed
         conf = discord.Embed(
             title=f"👥 Random Group of {n} — {self.event['name']}",
@@ -9668,7 +11246,7 @@ class GroupCountModal(Modal, title="🎲 Random Groups"):
         bd["advances_per_group"] = adv
         self.event["bracket_data"] = bd
         self.event["schedule"] = []
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = build_bracket_embed(self.event)
         await interaction.response.send_message(embed=embed, ephemeral=True)
         await announce_major(interaction.guild, build_bracket_embed(self.event))
@@ -9724,7 +11302,7 @@ class ScheduleMatchModal(Modal, title="📅 Schedule Match"):
         # Remove any existing schedule for this match_id
         self.event["schedule"] = [s for s in self.event["schedule"] if s["match_id"] != self.match["match_id"]]
         self.event["schedule"].append(entry)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="📅 Match Scheduled!",
             description=(f"⚔️ **{self.match['team1']}** vs **{self.match['team2']}**\n"
                          f"📅 **{date_str}**\n"
@@ -9995,7 +11573,7 @@ class CreateEventSettingsView(View):
         }
         if "events" not in squad_data: squad_data["events"] = []
         squad_data["events"].append(event)
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", event))
         embed = discord.Embed(title="✅ Event Created!",
             description=f"**{event['name']}** is live!\n`ID: {event_id}`", color=ROYAL_GREEN)
         apply_branding(embed, thumbnail=True)
@@ -10171,7 +11749,7 @@ class EditEventModal(Modal, title="✏️ Edit Event"):
             "date": self.ev_date.value.strip(), "prize_pool": self.ev_prize.value.strip(),
             "status": status,
         })
-        save_data(squad_data)
+        save_data(squad_data, _list_path("events", self.event))
         embed = discord.Embed(title="✅ Event Updated!",
             description=f"**{self.event['name']}** has been updated.", color=ROYAL_GREEN)
         apply_branding(embed, thumbnail=True)
@@ -10222,66 +11800,363 @@ async def events_command(interaction: discord.Interaction):
     await log_action(interaction.guild, "🎪 /events", f"{interaction.user.mention} opened the **Events Board**")
 
 
-# -------------------- EVENTS --------------------
-@bot.event
-async def on_ready():
-    # ── Start Oracle handlers ─────────────────────────────────────────
-    if oracle and ORACLE_AVAILABLE:
+# -------------------- STARTUP --------------------
+# on_ready fires again on every reconnect; the warm-up pipeline runs once,
+# in the background, so commands answer while it works:
+#   1. core   — Oracle handlers, background tasks, command tree sync (only
+#               when the tree's hash changed), avatar — concurrently
+#   2. guilds — every guild at once: chunk members (once, shared with the
+#               Oracle), cache the logo, check the commands-channel guide
+# The nickname audit waits NICK_AUDIT_DELAY seconds after the bot is ready.
+# Per-stage timings land in _startup_timings and the console.
+_startup = {"task": None, "oracle": False}
+_startup_timings = {}  # stage → ms (guild stages as "guild name/stage")
+_chunking = {}         # guild id → in-flight chunk task
+
+
+async def ensure_chunked(guild):
+    """Chunk guild's members once; concurrent callers share the request."""
+    if guild.chunked:
+        return
+    task = _chunking.get(guild.id)
+    if task is None:
+        task = _chunking[guild.id] = asyncio.create_task(guild.chunk())
+        task.add_done_callback(lambda _t, gid=guild.id: _chunking.pop(gid, None))
+    await asyncio.shield(task)
+
+
+async def _timed(stage, coro):
+    t0 = time.perf_counter()
+    try:
+        return await coro
+    except Exception as e:
+        print(f"⚠️ Startup stage {stage} failed: {e}")
+    finally:
+        _startup_timings[stage] = (time.perf_counter() - t0) * 1000
+
+
+def _command_tree_hash():
+    cmds = []
+    for cmd in bot.tree.get_commands():
         try:
-            setup_oracle(bot, oracle)
-            # Chunk all guilds so member cache is full
-            for g in bot.guilds:
-                try: await g.chunk()
-                except: pass
-        except Exception as _oe3:
-            print(f"⚠️ Oracle setup failed: {_oe3}")
+            cmds.append(cmd.to_dict(bot.tree))
+        except TypeError:
+            cmds.append(cmd.to_dict())  # discord.py < 2.4
+    raw = json.dumps([bot.application_id, cmds], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
 
+
+async def sync_command_tree(force=False):
+    """Push slash commands to Discord only when they changed since the last sync."""
+    digest = _command_tree_hash()
+    try:
+        with open(TREE_HASH_FILE, "r") as f:
+            synced = f.read().strip()
+    except:
+        synced = None
+    if not force and synced == digest:
+        return False
     await bot.tree.sync()
-    safety_sync.start()
-    if not weekly_digest_task.is_running():
-        weekly_digest_task.start()
-    if not daily_pulse_task.is_running():
-        daily_pulse_task.start()
-    if not bot_commands_cleanup_task.is_running():
-        bot_commands_cleanup_task.start()
+    try:
+        atomic_write(TREE_HASH_FILE, digest.encode("ascii"))
+    except Exception as e:
+        print(f"⚠️ Couldn't store command tree hash: {e}")
+    print("🌳 Command tree synced")
+    return True
 
+
+async def _set_avatar():
     # Set bot avatar to Majestic Dominion logo (once)
-    if os.path.exists(LOGO_DARK):
+    if os.path.exists(LOGO_DARK) and not squad_data.get("_avatar_set_dark"):
+        with open(LOGO_DARK, "rb") as f:
+            await bot.user.edit(avatar=f.read())
+        squad_data["_avatar_set_dark"] = True
+        save_data(squad_data, ("_avatar_set_dark",))
+        print("👑 Bot avatar set to Majestic Dominion dark logo!")
+
+
+def _start_background_tasks():
+    for task in (nick_reconciler, nick_audit, weekly_digest_task, daily_pulse_task, bot_commands_cleanup_task):
+        if not task.is_running():
+            task.start()
+
+
+async def _warm_guild(guild):
+    name = guild.name
+    await _timed(f"{name}/chunk", ensure_chunked(guild))
+    await asyncio.gather(
+        _timed(f"{name}/logo", cache_transparent_logo(guild)),
+        _timed(f"{name}/guide", setup_bot_commands_channel(guild)),
+    )
+
+
+async def run_startup():
+    t0 = time.perf_counter()
+    await asyncio.gather(
+        _timed("tree", sync_command_tree()),
+        _timed("avatar", _set_avatar()),
+    )
+    await _timed("guilds", asyncio.gather(*(_warm_guild(g) for g in bot.guilds)))
+    _startup_timings["total"] = (time.perf_counter() - t0) * 1000
+    print("⏱️ Startup: " + " · ".join(f"{k} {v:.0f}ms" for k, v in _startup_timings.items()))
+    print("✅ Initial sync done")
+
+
+@bot.event
+async def on_ready():
+    # ── Start Oracle handlers (once — listeners would stack on reconnect) ──
+    if oracle and ORACLE_AVAILABLE and not _startup["oracle"]:
         try:
-            if not squad_data.get("_avatar_set_dark"):
-                with open(LOGO_DARK, "rb") as f:
-                    await bot.user.edit(avatar=f.read())
-                squad_data["_avatar_set_dark"] = True
-                save_data(squad_data)
-                print("👑 Bot avatar set to Majestic Dominion dark logo!")
-        except Exception as e:
-            print(f"⚠️ Could not set avatar: {e}")
+            setup_oracle(bot, oracle)
+            _startup["oracle"] = True
+        except Exception as _oe3:
+            print(f"⚠️ Oracle setup failed: {_oe3}")
 
+    _start_background_tasks()
     print(f"✅ Logged in as {bot.user}")
     print(f"⚜️ Majestic Dominion Bot is online! The Crown watches over all.")
-    for guild in bot.guilds:
-        await cache_transparent_logo(guild)
-        await setup_bot_commands_channel(guild)
-        for member in guild.members:
-            role, tag = get_member_squad(member, guild)
-            await safe_nick_update(member, role, tag)
-    print("✅ Initial sync done")
+    if _startup["task"] is None:
+        _startup["task"] = asyncio.create_task(run_startup())
 
 
 @bot.event
 async def on_member_update(before, after):
-    role, tag = get_member_squad(after, after.guild)
-    await bot.wait_until_ready()
-    await safe_nick_update(after, role, tag)
+    if before.roles != after.roles or before.nick != after.nick:
+        mark_nick_dirty(after.guild, (after.id,))
+
 
+@bot.event
+async def on_member_join(member):
+    mark_nick_dirty(member.guild, (member.id,))
+
+
+@bot.event
+async def on_guild_role_create(role):
+    invalidate_squad_roles(role.guild)
+
+
+@bot.event
+async def on_guild_role_update(before, after):
+    if before.name != after.name or before.position != after.position:
+        invalidate_squad_roles(after.guild)
+
+
+@bot.event
+async def on_guild_role_delete(role):
+    invalidate_squad_roles(role.guild)
+
+
+# -------------------- NICKNAME SYNC --------------------
+# Nicknames are reconciled from events instead of full-guild sweeps: a
+# member whose roles or nick changed, a new member, or every member of a
+# squad that was added, renamed or re-tagged goes into a dirty set that
+# nick_reconciler works off every few seconds into the edit queue below. nick_audit is the slow
+# safety net for anything missed (e.g. changes while the bot was offline):
+# it checks a rotating slice of each guild locally and only marks the
+# members whose nick is wrong.
+NICK_SYNC_SECONDS = 5
+NICK_AUDIT_MINUTES = 10
+NICK_AUDIT_BATCH = 200
+NICK_AUDIT_DELAY = 120
+_nick_dirty = {}         # guild id → member ids awaiting a nick check
+_nick_audit_cursor = {}  # guild id → next index into guild.members
+
+
+def mark_nick_dirty(guild, member_ids):
+    if guild:
+        _nick_dirty.setdefault(guild.id, set()).update(member_ids)
+
+
+def mark_squad_nicks_dirty(guild, squad_name):
+    role = discord.utils.get(guild.roles, name=squad_name) if guild else None
+    if role:
+        mark_nick_dirty(guild, [m.id for m in role.members])
+
+
+# ── Edit queue ──
+# All nick edits go through one queue per guild, worked by a single task:
+# member edits share the guild's rate-limit bucket, which discord.py paces
+# for us, so there's no fixed sleep. Pending edits are deduplicated per
+# member (latest nick wins). Members the bot can't edit (owner, equal or
+# higher top role) are skipped without an API call. A 429 that reaches us
+# is retried after the server's Retry-After.
+NICK_RETRIES = 3
+_nick_pending = {}  # guild id → {member id: (nick, NickJob or None)}, oldest first
+_nick_workers = {}  # guild id → worker task
+
+
+class NickJob:
+    """Progress of a bulk nick edit (e.g. a squad re-tag)."""
+    def __init__(self, label):
+        self.label = label
+        self.total = self.done = self.skipped = self.failed = self.superseded = 0
+
+    @property
+    def finished(self):
+        return self.done + self.skipped + self.failed + self.superseded >= self.total
+
+    def record(self, outcome):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def progress_line(self):
+        state = "✅ Done" if self.finished else "⏳ Working"
+        line = f"🏷️ {self.label}: {state} — **{self.done}/{self.total}** updated"
+        if self.skipped:
+            line += f" · {self.skipped} skipped (above the bot's role)"
+        if self.failed:
+            line += f" · {self.failed} failed"
+        if self.superseded:
+            line += f" · {self.superseded} taken over by a newer edit"
+        return line
+
+
+def queue_nick_edit(member, nick, job=None):
+    pending = _nick_pending.setdefault(member.guild.id, {})
+    prev_job = pending[member.id][1] if member.id in pending else None
+    if job is None:
+        job = prev_job  # still counts toward the job that queued it
+    elif job is not prev_job:
+        job.total += 1
+        if prev_job:
+            prev_job.record("superseded")
+    pending[member.id] = (nick, job)  # keeps its place in line; latest nick wins
+    if member.guild.id not in _nick_workers:
+        _nick_workers[member.guild.id] = asyncio.create_task(_nick_worker(member.guild.id))
+
+
+def queue_squad_nicks(guild, squad_name, label=None):
+    """Queue nick fixes for every member of squad_name's role. Returns the NickJob."""
+    job = NickJob(label or f"Re-tagging {squad_name}")
+    role = discord.utils.get(guild.roles, name=squad_name)
+    tag = SQUADS.get(squad_name)
+    for member in (role.members if role and tag else []):
+        desired = desired_nick(member, role, tag)
+        if member.display_name != desired:
+            queue_nick_edit(member, desired, job)
+    return job
+
+
+async def report_nick_job(job, message, every=3):
+    """Keep message showing job's progress until it finishes."""
+    while True:
+        await asyncio.sleep(every)
+        try:
+            await message.edit(content=job.progress_line())
+        except:
+            return
+        if job.finished:
+            return
+
+
+async def _apply_nick(guild, member, nick):
+    """Edit one nick. Returns "done", "skipped" or "failed"."""
+    if member is None:
+        return "skipped"
+    if member.display_name == nick:
+        return "done"
+    me = guild.me
+    if member.id == guild.owner_id or not me.guild_permissions.manage_nicknames or (
+            member.id != me.id and member.top_role >= me.top_role):
+        return "skipped"
+    for _ in range(NICK_RETRIES):
+        try:
+            await member.edit(nick=nick)
+            return "done"
+        except discord.RateLimited as e:
+            delay = e.retry_after
+        except discord.Forbidden:
+            return "skipped"
+        except discord.HTTPException as e:
+            if e.status != 429:
+                print(f"⚠️ Nick edit failed for {member}: {e}")
+                return "failed"
+            delay = float(e.response.headers.get("Retry-After", 1))
+        await asyncio.sleep(delay)
+    return "failed"
+
+
+async def _nick_worker(guild_id):
+    pending = _nick_pending.get(guild_id, {})
+    try:
+        while pending:
+            member_id = next(iter(pending))
+            nick, job = pending.pop(member_id)
+            guild = bot.get_guild(guild_id)
+            outcome = await _apply_nick(guild, guild.get_member(member_id), nick) if guild else "skipped"
+            if job:
+                job.record(outcome)
+    finally:
+        _nick_workers.pop(guild_id, None)
+
+
+@tasks.loop(seconds=NICK_SYNC_SECONDS)
+async def nick_reconciler():
+    for guild_id in list(_nick_dirty):
+        member_ids = _nick_dirty.pop(guild_id)
+        guild = bot.get_guild(guild_id)
+        if not guild:
+            continue
+        unresolved = []
+        for member_id in member_ids:
+            member = guild.get_member(member_id)
+            if member:
+                role, tag = get_member_squad(member, guild)
+                await safe_nick_update(member, role, tag)
+            else:
+                unresolved.append(member_id)
+        if unresolved and not guild.chunked:
+            # Member cache still filling — retry once chunking lands; once chunked, a miss means they left
+            mark_nick_dirty(guild, unresolved)
 
-@tasks.loop(minutes=5)
-async def safety_sync():
+
+@tasks.loop(minutes=NICK_AUDIT_MINUTES)
+async def nick_audit():
     for guild in bot.guilds:
-        for member in guild.members:
-            role, tag = get_member_squad(member, guild)
-            await safe_nick_update(member, role, tag)
+        members = guild.members
+        if not members:
+            continue
+        start = _nick_audit_cursor.get(guild.id, 0) % len(members)
+        window = members[start:start + NICK_AUDIT_BATCH]
+        _nick_audit_cursor[guild.id] = start + len(window)
+        wrong = [m.id for m in window if m.display_name != desired_nick(m, *get_member_squad(m, guild))]
+        if wrong:
+            mark_nick_dirty(guild, wrong)
+        await asyncio.sleep(0)
+
+
+@nick_audit.before_loop
+async def _defer_nick_audit():
+    # Keep the first audit out of the startup rush
+    await bot.wait_until_ready()
+    await asyncio.sleep(NICK_AUDIT_DELAY)
 
 
 # -------------------- RUN --------------------
-bot.run(os.getenv("DISCORD_TOKEN"))
+def _on_sigterm(signum, frame):
+    # Railway/Heroku stop with SIGTERM — unwind bot.run() like Ctrl+C so we can flush
+    raise KeyboardInterrupt
+
+
+signal.signal(signal.SIGTERM, _on_sigterm)
+atexit.register(_persist.flush)
+
+if "--replay" in sys.argv:
+    # Offline dry run: python Bot.py --replay
+    print(format_replay_diffs(reconcile_match_log(apply=False), limit=1000).replace("**", "").replace("`", ""))
+    sys.exit(0)
+
+if "--backtest" in sys.argv:
+    # Offline: python Bot.py --backtest [k k_provisional provisional_games draw_base]
+    # Runs before reconcile so a report never persists replay corrections
+    _bt_args = [int(a) for a in sys.argv[sys.argv.index("--backtest") + 1:]]
+    _bt_reports = [archive_report(), backtest()] + ([backtest(EloModel(*_bt_args))] if _bt_args else [])
+    for _bt in _bt_reports:
+        print(format_backtest_report(_bt).replace("**", ""))
+    sys.exit(0)
+
+reconcile_match_log()
+
+try:
+    bot.run(os.getenv("DISCORD_TOKEN"))
+finally:
+    _persist.flush()
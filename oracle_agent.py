@@ -946,6 +946,12 @@ class OracleAgent:
         if R(r'(?:list|show)\s+(?:all\s+)?(?:squads?|kingdoms?)',tl,S):
             return {"action":"list_squads"}
 
+        m = R(r'^(?:show\s+)?(?:predictions?|prediction\s+slate|odds)(?:\s+(?:for|in)\s+(.+))?$',tl,S)
+        if m:
+            ev = (m.group(1) or "").strip()
+            if R(r'^(?:all\s+)?(?:scheduled\s+)?(?:matches|fixtures|challenges)$',ev,S): ev = ""
+            return {"action":"predict_slate","event":ev}
+
         m = R(r'(?:match\s+history|recent\s+matches?|results?)\s+(?:for\s+|of\s+)?(.+)',tl,S)
         if not m:
             m = R(r'(.+?)\s+(?:match\s+history|recent\s+matches?|last\s+\d+\s+matches?)',tl,S)
@@ -1045,6 +1051,7 @@ timeout:      {{"action":"timeout","member":"name","minutes":10,"reason":"reason
 list_squad:   {{"action":"list_squad","squad":"kingdom"}}
 list_squads:  {{"action":"list_squads"}}
 get_match_history:{{"action":"get_match_history","kingdom":"optional","limit":10}}
+predict_slate:{{"action":"predict_slate","event":"optional event name"}}
 get_profile:  {{"action":"get_profile","member":"name"}}
 list_members: {{"action":"list_members","role":"optional"}}
 list_roles:   {{"action":"list_roles"}}
@@ -1114,22 +1121,16 @@ Return ONLY the JSON object or null. No explanation."""
             ), None)
 
         def save():
-            saved = False
+            # Only through the store — a raw file write would bypass the checksum and journal
             try:
                 sf = bot_fn("save_data")
-                if sf: sf(sd); saved = True
+                if sf:
+                    sf(sd)
+                    return True
+                print("⚠️ save_data unavailable — Oracle change not saved")
             except Exception as e:
                 print(f"⚠️ save via main: {e}")
-            if not saved:
-                try:
-                    import os
-                    f_path = os.environ.get("DATA_FILE", "/data/squad_data.json")
-                    with open(f_path, "w", encoding="utf-8") as f:
-                        json.dump(sd, f, ensure_ascii=False, indent=2)
-                    saved = True
-                except Exception as e2:
-                    print(f"⚠️ JSON fallback save: {e2}")
-            return saved
+            return False
 
         async def oracle_log(title, desc):
             """Log to bot-logs showing Oracle as the executor."""
@@ -1226,6 +1227,9 @@ Return ONLY the JSON object or null. No explanation."""
             except: s1, s2 = 1, 0
 
             t1d = sq[wn]; t2d = sq[ln]
+            played_at = datetime.utcnow().isoformat()   # before any bounty this match places
+            pred_fn = bot_fn("predict_match")
+            pred    = pred_fn(wn, ln) if pred_fn else None   # pre-match, for the prediction archive
             calc    = bot_fn("calculate_glory_points")
             upd     = bot_fn("update_streak")
             chk_ach = bot_fn("check_achievements")
@@ -1256,18 +1260,28 @@ Return ONLY the JSON object or null. No explanation."""
             for ch in sd.get("challenges",[]):
                 if ch["status"] in ("accepted","scheduled") and {ch["challenger"],ch["challenged"]} == {wn,ln}:
                     ch["status"] = "completed"
+            inv_rank = bot_fn("invalidate_ranking")
+            if inv_rank: inv_rank()
             if ref_b: ref_b()
             t1_ach = chk_ach(wn) if chk_ach else []
             t2_ach = chk_ach(ln) if chk_ach else []
             match_id = str(uuid.uuid4())[:8]
             match_data = {"match_id":match_id,"team1":wn,"team2":ln,"score":score,
-                "date":datetime.utcnow().isoformat(),"added_by":invoker.id,"added_by_oracle":True,
+                "date":played_at,"added_by":invoker.id,"added_by_oracle":True,
                 "team1_participants":(get_part(wn) if get_part else []),
                 "team2_participants":(get_part(ln) if get_part else []),
                 "t1_pts":t1_pts,"t2_pts":t2_pts}
-            sd.setdefault("matches",[]).append(match_data)
-            t1d.setdefault("match_history",[]).append(match_data)
-            t2d.setdefault("match_history",[]).append(match_data)
+            add_rec = bot_fn("add_match_record")
+            if add_rec: add_rec(match_data)
+            else:
+                # Histories hold match IDs into sd["matches"]
+                sd.setdefault("matches",[]).append(match_data)
+                t1d.setdefault("match_history",[]).append(match_id)
+                t2d.setdefault("match_history",[]).append(match_id)
+                mark_dirty = bot_fn("mark_match_index_dirty")
+                if mark_dirty: mark_dirty()
+            log_pred = bot_fn("log_prediction")
+            if pred and log_pred: log_pred(match_data, pred)
             ok = save()
             if not ok: return "⚠️ Couldn't save. Try again or use /mod → Record Battle."
 
@@ -1309,14 +1323,24 @@ Return ONLY the JSON object or null. No explanation."""
             if not t1 or not t2:
                 return f"⚠️ Kingdom not found: '{action.get('team1')}' or '{action.get('team2')}'"
             upd = bot_fn("update_streak")
+            pred_fn = bot_fn("predict_match")
+            pred    = pred_fn(t1, t2) if pred_fn else None
             for k in [t1,t2]:
                 sq[k]["draws"]  = sq[k].get("draws",0)+1
                 sq[k]["points"] = sq[k].get("points",0)+1
             if upd: upd(t1,"draw"); upd(t2,"draw")
             match_id = str(uuid.uuid4())[:8]
-            sd.setdefault("matches",[]).append({"match_id":match_id,"team1":t1,"team2":t2,
+            match_data = {"match_id":match_id,"team1":t1,"team2":t2,
                 "score":score,"winner":"draw","date":datetime.utcnow().isoformat(),
-                "added_by":invoker.id,"added_by_oracle":True,"t1_pts":1,"t2_pts":1})
+                "added_by":invoker.id,"added_by_oracle":True,"t1_pts":1,"t2_pts":1}
+            add_rec = bot_fn("add_match_record")
+            if add_rec: add_rec(match_data)
+            else:
+                sd.setdefault("matches",[]).append(match_data)
+                mark_dirty = bot_fn("mark_match_index_dirty")
+                if mark_dirty: mark_dirty()
+            log_pred = bot_fn("log_prediction")
+            if pred and log_pred: log_pred(match_data, pred)
             ok = save()
             if not ok: return "⚠️ Couldn't save. Try again!"
             await oracle_log("📜 Draw Recorded", f"**{t1}** vs **{t2}** ({score}) — both +1pt | ID:`{match_id}`")
@@ -1496,7 +1520,10 @@ Return ONLY the JSON object or null. No explanation."""
             km  = fuzzy(action.get("kingdom",""), sq)
             pts = int(action.get("points",0))
             if not km: return f"❌ Kingdom '{action.get('kingdom')}' not found."
-            sq[km]["points"] = pts; ok = save()
+            set_stats = bot_fn("set_squad_stats")
+            if set_stats: set_stats(km, points=pts)   # kept as an adjustment on replay
+            else: sq[km]["points"] = pts
+            ok = save()
             return f"✅ **{km}** points set to **{pts}**." if ok else "⚠️ Couldn't save. Try again!"
 
         # ── remove_from_squad — removes Discord role + cleans nickname ──
@@ -1667,7 +1694,8 @@ Return ONLY the JSON object or null. No explanation."""
                 role_members = [rname(uid) for uid in r_ids]
                 leader_name = "Not set"
             # Recent match history
-            recent_matches = info.get("match_history",[])[-5:][::-1]
+            hist_fn = bot_fn("get_squad_history")
+            recent_matches = (hist_fn(sm, 5) if hist_fn else [])[::-1]
             match_lines = []
             for m in recent_matches:
                 t1 = m.get("team1","?"); t2 = m.get("team2","?")
@@ -1713,7 +1741,9 @@ Return ONLY the JSON object or null. No explanation."""
                 sm2 = fuzzy(sq_filter, sq)
                 if sm2:
                     # Use squad's own match_history for accuracy
-                    matches = sq[sm2].get("match_history", sd.get("matches",[]))
+                    hist_fn = bot_fn("get_squad_history")
+                    matches = hist_fn(sm2) if hist_fn else [
+                        m for m in sd.get("matches",[]) if sm2 in (m.get("team1"), m.get("team2"))]
                     sq_filter = sm2.lower()
                 else:
                     matches = [m for m in sd.get("matches",[])
@@ -1735,6 +1765,28 @@ Return ONLY the JSON object or null. No explanation."""
                 lines.append(f"• {t1} {sc} {t2} → {result} [{date}]")
             return "\n".join(lines)
 
+        elif act == "predict_slate":
+            predict = bot_fn("predict_fixtures")
+            if not predict: return "❌ Prediction engine unavailable."
+            ev_name = (action.get("event") or "").lower()
+            if ev_name:
+                ev = next((e for e in sd.get("events",[]) if ev_name in e["name"].lower()), None)
+                if not ev: return f"❌ Event '{action.get('event')}' not found."
+                engine = bot_fn("TournamentEngine")
+                fixtures = [(m["team1"], m["team2"]) for m in engine.pending_matches(ev)] if engine else []
+                title = f"Prediction slate — {ev['name']}"
+            else:
+                sched = bot_fn("scheduled_fixtures")
+                fixtures = sched() if sched else [(c["challenger"], c["challenged"]) for c in sd.get("challenges",[])
+                                                  if c.get("status") == "scheduled"]
+                title = "Prediction slate — scheduled challenges"
+            if not fixtures:
+                return f"No pending fixtures to predict for {title.split(' — ')[1]}."
+            line = bot_fn("format_prediction_line")
+            preds = predict(fixtures)
+            return f"**{title} ({len(fixtures)}):**\n" + "\n".join(
+                f"• {line(t1, t2, p)}" for (t1, t2), p in zip(fixtures, preds))
+
         elif act == "list_roles":
             roles = [r.name for r in reversed(guild.roles) if r.name != "@everyone"]
             return f"**Roles ({len(roles)})**: {', '.join(roles)}"
@@ -1794,7 +1846,10 @@ Return ONLY the JSON object or null. No explanation."""
         elif act == "reset_stats":
             km = fuzzy(action.get("kingdom",""), sq)
             if not km: return f"❌ Kingdom '{action.get('kingdom')}' not found."
-            sq[km].update({"wins":0,"draws":0,"losses":0,"points":0,"streak":0})
+            set_stats = bot_fn("set_squad_stats")
+            if set_stats: set_stats(km, wins=0, draws=0, losses=0, points=0)
+            else: sq[km].update({"wins":0,"draws":0,"losses":0,"points":0})
+            sq[km]["streak"] = 0
             ok = save()
             return f"✅ **{km}** stats reset to zero." if ok else "⚠️ Couldn't save. Try again!"
 
@@ -1833,7 +1888,15 @@ Return ONLY the JSON object or null. No explanation."""
                 if m.get("team1") == matched: m["team1"] = new_n
                 if m.get("team2") == matched: m["team2"] = new_n
                 if m.get("winner") == matched: m["winner"] = new_n
+            base = sd.get("season",{}).get("base_ratings",{})
+            if matched in base: base[new_n] = base.pop(matched)
+            rb = bot_fn("rebuild_match_indexes")
+            if rb: rb()
             ok = save()
+            inv_roles = bot_fn("invalidate_squad_roles")
+            if inv_roles: inv_roles()
+            mark_nicks = bot_fn("mark_squad_nicks_dirty")
+            if mark_nicks: mark_nicks(guild, new_n)
             await oracle_log("✏️ Kingdom Renamed", f"**{matched}** → **{new_n}** | Discord role renamed")
             return f"✅ **{matched}** renamed to **{new_n}** — Discord role, match history, and data all updated." if ok else "⚠️ Couldn't save."
 
@@ -1978,9 +2041,12 @@ def setup_oracle(bot, oracle: OracleAgent):
     @bot.listen("on_ready")
     async def oracle_cache_warm():
         """Fetch all guild members on startup so IDs resolve correctly."""
+        import sys
+        chunk = getattr(sys.modules.get("__main__"), "ensure_chunked", None)   # shared with the bot's startup pipeline
         for guild in bot.guilds:
             try:
-                await guild.chunk()
+                if guild.chunked: continue
+                await (chunk(guild) if chunk else guild.chunk())
                 print(f"✅ Oracle: cached {guild.member_count} members in {guild.name}")
             except Exception as e:
                 print(f"⚠️ Oracle: member cache failed for {guild.name}: {e}")
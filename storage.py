@@ -0,0 +1,705 @@
+# =====================================================================
+#   STORAGE — Majestic Dominion persistence layer
+#
+#   squad_data.json          → full snapshot (compacted state)
+#   squad_data.json.sha256   → checksum of the snapshot
+#   squad_data.json.journal  → append-only log of mutations since the
+#                              snapshot, one "<crc32> <json>" per line
+#   generations/             → last GENERATIONS snapshots + checksums
+#   squad_data.db            → SQLite backend instead of the above
+#                              (STORAGE_BACKEND=sqlite, see SQLiteStore)
+#   seasons/season_NNN.json.gz → closed seasons (SeasonArchive), read
+#                              only when someone asks for them
+#
+#   Journal ops:
+#     {"op": "set", "path": ["squads", "SAT"], "value": {...}}
+#     {"op": "del", "path": ["bounties", "SAT"]}
+#
+#   The first journal line is a header carrying the sha256 of the
+#   snapshot it applies to — a journal left over from an older snapshot
+#   is ignored. load() replays the journal on top of the snapshot; once
+#   the journal grows past COMPACT_OPS lines or past the snapshot size,
+#   the next write folds everything back into a fresh snapshot.
+#
+#   Snapshots are written to a temp file, fsynced and renamed into place,
+#   so a kill mid-write leaves the previous file intact. If the snapshot
+#   fails its checksum on load, the newest valid generation is used.
+# =====================================================================
+
+import os, json, hashlib, asyncio, threading, zlib, shutil, gzip
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+COMPACT_OPS = 500
+GENERATIONS = 5
+
+
+# ── Path helpers ──────────────────────────────────────────────────────
+
+_MISSING = object()
+
+
+def resolve_path(data, path):
+    """Return the value at path inside data, or _MISSING if absent."""
+    node = data
+    for key in path:
+        if isinstance(node, dict):
+            if key not in node:
+                return _MISSING
+            node = node[key]
+        elif isinstance(node, list):
+            if not isinstance(key, int) or key >= len(node) or key < -len(node):
+                return _MISSING
+            node = node[key]
+        else:
+            return _MISSING
+    return node
+
+
+def apply_op(data, op):
+    """Apply one journal op to data in place."""
+    path = op["path"]
+    if not path:
+        return
+    node = data
+    for i, key in enumerate(path[:-1]):
+        if isinstance(node, dict):
+            # Missing parent: a list if the next key is an index, else a dict
+            node = node.setdefault(key, [] if isinstance(path[i + 1], int) else {})
+        elif isinstance(node, list) and isinstance(key, int) and key < len(node):
+            node = node[key]
+        else:
+            return
+    last = path[-1]
+    if op["op"] == "set":
+        if isinstance(node, dict):
+            node[last] = op["value"]
+        elif isinstance(node, list):
+            if last == len(node):
+                node.append(op["value"])
+            elif last < len(node):
+                node[last] = op["value"]
+    elif op["op"] == "del":
+        if isinstance(node, dict):
+            node.pop(last, None)
+        elif isinstance(node, list) and last < len(node):
+            node.pop(last)
+
+
+# ── File helpers ──────────────────────────────────────────────────────
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except:
+        pass  # not supported on every platform
+
+
+def atomic_write(path, raw):
+    """Write bytes to path via temp file + fsync + rename."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path)
+
+
+def _crc_line(line):
+    return f"{zlib.crc32(line.encode('utf-8')):08x} {line}"
+
+
+def _parse_journal_line(line):
+    """Return the op in a journal line, or None if it is torn/corrupt."""
+    line = line.rstrip("\n")
+    if not line:
+        return None
+    if line.startswith("{"):
+        # Unchecksummed line from before checksums were added
+        try:
+            return json.loads(line)
+        except:
+            return None
+    crc, _, body = line.partition(" ")
+    try:
+        if int(crc, 16) != zlib.crc32(body.encode("utf-8")):
+            return None
+        return json.loads(body)
+    except:
+        return None
+
+
+# ── Journal store ─────────────────────────────────────────────────────
+
+class JournalStore:
+    """Snapshot + append-only journal for one JSON document."""
+
+    def __init__(self, path, compact_ops=COMPACT_OPS, generations=GENERATIONS):
+        self.path         = path
+        self.journal_path = path + ".journal"
+        self.gen_dir      = os.path.join(os.path.dirname(os.path.abspath(path)), "generations")
+        self.compact_ops  = compact_ops
+        self.generations  = generations
+        self._base_sha    = None
+        self._snap_size   = 0
+        self._ops         = 0
+        self._journal_size = 0
+
+    # ── Load ──────────────────────────────────────────────────────────
+    def _generation_files(self):
+        """Generation snapshots, newest first."""
+        if not os.path.isdir(self.gen_dir):
+            return []
+        names = sorted((n for n in os.listdir(self.gen_dir) if n.endswith(".json")), reverse=True)
+        return [os.path.join(self.gen_dir, n) for n in names]
+
+    @staticmethod
+    def _read_valid(path):
+        """Return (data, raw) if path holds a snapshot matching its checksum."""
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            sha = hashlib.sha256(raw).hexdigest()
+            if os.path.exists(path + ".sha256"):
+                with open(path + ".sha256", "r") as f:
+                    if f.read().strip() != sha:
+                        return None
+            return json.loads(raw.decode("utf-8")), raw
+        except:
+            return None
+
+    def load(self):
+        """Return the stored document with the journal replayed, or None.
+
+        Falls back to the newest valid generation if the snapshot is
+        missing or corrupt. If nothing valid is found the bad snapshot is
+        moved aside and None is returned.
+        """
+        candidates = [self.path] + self._generation_files()
+        if not any(os.path.exists(p) for p in candidates):
+            return None
+        for path in candidates:
+            got = self._read_valid(path)
+            if got is None:
+                if os.path.exists(path):
+                    print(f"⚠️ {os.path.basename(path)} failed validation")
+                continue
+            data, raw = got
+            self._base_sha  = hashlib.sha256(raw).hexdigest()
+            self._snap_size = len(raw)
+            if path != self.path:
+                print(f"♻️ Recovered from generation {os.path.basename(path)}")
+            self._ops = self._replay(data)
+            self._journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+            if path != self.path:
+                # The journal may have stopped matching — force a fresh snapshot
+                self._base_sha = None
+            return data
+        if os.path.exists(self.path):
+            aside = f"{self.path}.corrupt-{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+            os.replace(self.path, aside)
+            print(f"🚨 No valid snapshot found — moved bad file to {aside}")
+        return None
+
+    def _replay(self, data):
+        if not os.path.exists(self.journal_path):
+            return 0
+        applied = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            header = f.readline()
+            try:
+                if json.loads(header).get("base") != self._base_sha:
+                    print("⚠️ Journal does not match snapshot — ignoring it")
+                    return 0
+            except:
+                return 0
+            for line in f:
+                op = _parse_journal_line(line)
+                if op is None:
+                    # Torn tail from a crash mid-append — nothing after it is trustworthy
+                    print("⚠️ Journal ends in an unreadable entry — stopping replay there")
+                    break
+                apply_op(data, op)
+                applied += 1
+        if applied:
+            print(f"📒 Replayed {applied} journal entries")
+        return applied
+
+    # ── Encode (cheap, runs on the caller's thread) ───────────────────
+    @staticmethod
+    def encode_snapshot(data):
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def encode_ops(data, paths):
+        """Return [(path_tuple, journal_line)] for the current value of each path."""
+        out = []
+        for path in paths:
+            path  = list(path)
+            value = resolve_path(data, path)
+            if value is _MISSING and path and isinstance(resolve_path(data, path[:-1]), list):
+                # List item already gone — indices shifted, journal the whole list
+                path  = path[:-1]
+                value = resolve_path(data, path)
+            if value is _MISSING:
+                line = json.dumps({"op": "del", "path": path}, ensure_ascii=False)
+            else:
+                line = json.dumps({"op": "set", "path": path, "value": value},
+                                  ensure_ascii=False, separators=(",", ":"))
+            out.append((tuple(path), line))
+        return out
+
+    # ── Write (file I/O) ──────────────────────────────────────────────
+    def _rotate(self):
+        """Keep the current snapshot as a generation, prune old ones."""
+        if not os.path.exists(self.path):
+            return
+        os.makedirs(self.gen_dir, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
+        base  = os.path.splitext(os.path.basename(self.path))[0]
+        dest  = os.path.join(self.gen_dir, f"{base}.{stamp}.json")
+        for src, dst in ((self.path, dest), (self.path + ".sha256", dest + ".sha256")):
+            if not os.path.exists(src):
+                continue
+            try:
+                os.link(src, dst)  # the rename below leaves this inode alone
+            except:
+                shutil.copy2(src, dst)
+        for old in self._generation_files()[self.generations:]:
+            for p in (old, old + ".sha256"):
+                try:
+                    os.remove(p)
+                except:
+                    pass
+
+    def write_snapshot(self, raw):
+        """Atomically write encoded snapshot bytes and start a fresh journal."""
+        sha = hashlib.sha256(raw).hexdigest()
+        try:
+            self._rotate()
+        except Exception as e:
+            print(f"⚠️ Could not keep generation: {e}")
+        atomic_write(self.path, raw)
+        atomic_write(self.path + ".sha256", sha.encode("ascii"))
+        self._base_sha  = sha
+        self._snap_size = len(raw)
+        self._start_journal()
+
+    def _start_journal(self):
+        header = json.dumps({"base": self._base_sha}) + "\n"
+        atomic_write(self.journal_path, header.encode("utf-8"))
+        self._ops = 0
+        self._journal_size = len(header)
+
+    def write_lines(self, lines):
+        """Append encoded journal lines."""
+        if not lines:
+            return
+        blob = "\n".join(_crc_line(l) for l in lines) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        self._ops += len(lines)
+        self._journal_size += len(blob.encode("utf-8"))
+
+    def snapshot(self, data):
+        self.write_snapshot(self.encode_snapshot(data))
+
+    def append(self, data, paths):
+        """Journal the current value of each path; compact when the log is large."""
+        if self.needs_compaction():
+            self.snapshot(data)
+        else:
+            self.write_lines([line for _, line in self.encode_ops(data, paths)])
+
+    def needs_compaction(self):
+        return (self._base_sha is None or self._ops >= self.compact_ops
+                or self._journal_size > max(self._snap_size, 65536))
+
+
+# ── SQLite store ──────────────────────────────────────────────────────
+#   Optional backend (STORAGE_BACKEND=sqlite). Same interface as
+#   JournalStore, so PersistService and save_data() paths work unchanged:
+#   each path maps to one row upsert keyed by name / id / position. Top-level
+#   keys without a table live as JSON in `meta`. On first start with an
+#   empty database the JSON snapshot (+ journal / generations) is imported.
+#   Reads go through load() only — lookups are served by the bot's
+#   in-memory indexes, so rows carry no query columns or secondary indexes.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS squads (name TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE IF NOT EXISTS players (id TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE IF NOT EXISTS matches (pos INTEGER PRIMARY KEY, data TEXT);
+CREATE TABLE IF NOT EXISTS events (pos INTEGER PRIMARY KEY, data TEXT);
+CREATE TABLE IF NOT EXISTS registrations (
+    event_pos INTEGER, idx INTEGER, data TEXT, PRIMARY KEY (event_pos, idx));
+CREATE TABLE IF NOT EXISTS challenges (pos INTEGER PRIMARY KEY, data TEXT);
+CREATE TABLE IF NOT EXISTS predictions (pos INTEGER PRIMARY KEY, data TEXT);
+"""
+
+DICT_TABLES = ("squads", "players")
+LIST_TABLES = ("matches", "events", "challenges", "predictions")
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class SQLiteStore:
+    """Indexed SQLite storage for squad_data."""
+
+    def __init__(self, db_path, json_path=None):
+        import sqlite3
+        self.path      = db_path
+        self.json_path = json_path
+        self._lock     = threading.RLock()
+        self._db       = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(SCHEMA)
+
+    # ── Load / migrate ────────────────────────────────────────────────
+    def _is_empty(self):
+        return self._db.execute("SELECT 1 FROM meta WHERE substr(key, 1, 2) != '__' "
+                                "UNION ALL SELECT 1 FROM squads LIMIT 1").fetchone() is None
+
+    def load(self):
+        """Return the stored document, importing the JSON file on first use."""
+        with self._lock:
+            if self._is_empty():
+                if self.json_path:
+                    data = JournalStore(self.json_path).load()
+                    if data is not None:
+                        print(f"📦 Migrating {os.path.basename(self.json_path)} into SQLite")
+                        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('__migrated_from_json', ?)",
+                                         (datetime.utcnow().isoformat(),))
+                    return data
+                return None
+            db = self._db
+            data = {"squads": {}, "players": {}, "matches": [], "events": [], "challenges": [],
+                    "predictions": []}
+            for key, value in db.execute("SELECT key, value FROM meta"):
+                if not key.startswith("__"):
+                    data[key] = json.loads(value)
+            for name, raw in db.execute("SELECT name, data FROM squads ORDER BY rowid"):
+                data["squads"][name] = json.loads(raw)
+            for pid, raw in db.execute("SELECT id, data FROM players ORDER BY rowid"):
+                data["players"][pid] = json.loads(raw)
+            data["matches"] = [json.loads(r) for (r,) in db.execute("SELECT data FROM matches ORDER BY pos")]
+            data["challenges"] = [json.loads(r) for (r,) in db.execute("SELECT data FROM challenges ORDER BY pos")]
+            data["predictions"] = [json.loads(r) for (r,) in db.execute("SELECT data FROM predictions ORDER BY pos")]
+            regs = {}
+            for pos, raw in db.execute("SELECT event_pos, data FROM registrations ORDER BY event_pos, idx"):
+                regs.setdefault(pos, []).append(json.loads(raw))
+            for pos, raw in db.execute("SELECT pos, data FROM events ORDER BY pos"):
+                ev = json.loads(raw)
+                ev["registrations"] = regs.get(pos, [])
+                data["events"].append(ev)
+            return data
+
+    # ── Encode ────────────────────────────────────────────────────────
+    @staticmethod
+    def encode_snapshot(data):
+        return JournalStore.encode_snapshot(data)
+
+    @staticmethod
+    def _row_path(path):
+        """Widen a path to the unit stored in one row (or one meta key)."""
+        path = tuple(path)
+        if path and path[0] in DICT_TABLES + LIST_TABLES:
+            return path[:2]
+        return path[:1]
+
+    @classmethod
+    def encode_ops(cls, data, paths):
+        return JournalStore.encode_ops(data, [cls._row_path(p) for p in paths])
+
+    def needs_compaction(self):
+        return False
+
+    # ── Write ─────────────────────────────────────────────────────────
+    def _put_squad(self, name, sq):
+        self._db.execute("INSERT OR REPLACE INTO squads VALUES (?,?)", (name, _dumps(sq)))
+
+    def _put_player(self, pid, pd):
+        self._db.execute("INSERT OR REPLACE INTO players VALUES (?,?)", (str(pid), _dumps(pd)))
+
+    def _put_match(self, pos, m):
+        self._db.execute("INSERT OR REPLACE INTO matches VALUES (?,?)", (pos, _dumps(m)))
+
+    def _put_event(self, pos, ev):
+        body = {k: v for k, v in ev.items() if k != "registrations"}
+        self._db.execute("INSERT OR REPLACE INTO events VALUES (?,?)", (pos, _dumps(body)))
+        self._db.execute("DELETE FROM registrations WHERE event_pos=?", (pos,))
+        self._db.executemany("INSERT INTO registrations VALUES (?,?,?)", [
+            (pos, i, _dumps(r)) for i, r in enumerate(ev.get("registrations", []))])
+
+    def _put_challenge(self, pos, c):
+        self._db.execute("INSERT OR REPLACE INTO challenges VALUES (?,?)", (pos, _dumps(c)))
+
+    def _put_prediction(self, pos, p):
+        self._db.execute("INSERT OR REPLACE INTO predictions VALUES (?,?)", (pos, _dumps(p)))
+
+    def _put_key(self, key, value):
+        """Replace a whole top-level key."""
+        db = self._db
+        if key == "squads":
+            db.execute("DELETE FROM squads")
+            for name, sq in (value or {}).items(): self._put_squad(name, sq)
+        elif key == "players":
+            db.execute("DELETE FROM players")
+            for pid, pd in (value or {}).items(): self._put_player(pid, pd)
+        elif key == "matches":
+            db.execute("DELETE FROM matches")
+            for i, m in enumerate(value or []): self._put_match(i, m)
+        elif key == "events":
+            db.execute("DELETE FROM events"); db.execute("DELETE FROM registrations")
+            for i, ev in enumerate(value or []): self._put_event(i, ev)
+        elif key == "challenges":
+            db.execute("DELETE FROM challenges")
+            for i, c in enumerate(value or []): self._put_challenge(i, c)
+        elif key == "predictions":
+            db.execute("DELETE FROM predictions")
+            for i, p in enumerate(value or []): self._put_prediction(i, p)
+        elif value is _MISSING:
+            db.execute("DELETE FROM meta WHERE key=?", (key,))
+        else:
+            db.execute("INSERT OR REPLACE INTO meta VALUES (?,?)", (key, _dumps(value)))
+
+    def _apply(self, op):
+        path  = op["path"]
+        value = op.get("value", _MISSING) if op["op"] == "set" else _MISSING
+        if len(path) == 1:
+            return self._put_key(path[0], value)
+        key, sub = path[0], path[1]
+        if value is _MISSING:
+            table = {"squads": "squads WHERE name=?", "players": "players WHERE id=?"}.get(key)
+            if table:
+                self._db.execute(f"DELETE FROM {table}", (str(sub),))
+            return
+        {"squads": self._put_squad, "players": self._put_player, "matches": self._put_match,
+         "events": self._put_event, "challenges": self._put_challenge,
+         "predictions": self._put_prediction}[key](sub, value)
+
+    def write_snapshot(self, raw):
+        data = json.loads(raw.decode("utf-8"))
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DELETE FROM meta WHERE substr(key, 1, 2) != '__'")
+                for key, value in data.items():
+                    self._put_key(key, value)
+                for key in DICT_TABLES + LIST_TABLES:
+                    if key not in data:
+                        self._put_key(key, None)
+                self._db.execute("COMMIT")
+            except:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def write_lines(self, lines):
+        if not lines:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for line in lines:
+                    self._apply(json.loads(line))
+                self._db.execute("COMMIT")
+            except:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def snapshot(self, data):
+        self.write_snapshot(self.encode_snapshot(data))
+
+    def append(self, data, paths):
+        self.write_lines([line for _, line in self.encode_ops(data, paths)])
+
+
+# ── Season archive ────────────────────────────────────────────────────
+#   A closed season's matches and frozen standings live in one gzipped
+#   JSON file each, outside the live document, so they are never loaded,
+#   journaled or snapshotted with it.
+
+class SeasonArchive:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, number):
+        return os.path.join(self.directory, f"season_{int(number):03d}.json.gz")
+
+    @staticmethod
+    def number_of(name):
+        """Season number encoded in an archive file name, or None."""
+        name = os.path.basename(name)
+        if name.startswith("season_") and name.endswith(".json.gz"):
+            try:
+                return int(name[7:-8])
+            except ValueError:
+                pass
+        return None
+
+    def numbers(self):
+        """Season numbers with an archive on disk, ascending."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in map(self.number_of, names) if n is not None)
+
+    def write(self, number, doc):
+        os.makedirs(self.directory, exist_ok=True)
+        raw = json.dumps(doc, separators=(",", ":"), default=str).encode()
+        atomic_write(self.path(number), gzip.compress(raw, compresslevel=6))
+
+    def read_raw(self, number):
+        """The compressed archive bytes as stored, or None."""
+        try:
+            with open(self.path(number), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write_raw(self, number, raw):
+        """Store compressed archive bytes (e.g. from a backup) after checking they decode."""
+        json.loads(gzip.decompress(raw))
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self.path(number), raw)
+
+    def load(self, number):
+        """The archived season document, or None if there is no archive."""
+        try:
+            with open(self.path(number), "rb") as f:
+                return json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+
+
+# ── Persistence service ───────────────────────────────────────────────
+#   save_data() only marks the store dirty. Changes are encoded right
+#   away on the event loop (so later mutations can't race the writer),
+#   merged by path (last write wins) and handed to a single worker
+#   thread after DEBOUNCE seconds — a burst of saves becomes one write.
+#   A failed write has already left the queue, so the service marks itself
+#   broken and retries with a full snapshot of the last marked document.
+
+DEBOUNCE = 1.5
+
+
+class PersistService:
+    def __init__(self, store, delay=DEBOUNCE):
+        self.store    = store
+        self.delay    = delay
+        self._ops     = {}       # path tuple → journal line (insertion ordered)
+        self._full    = None     # document awaiting a full snapshot
+        self._handle  = None
+        self._lock    = threading.Lock()
+        self._pool    = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+        self._inflight = None
+        self._data    = None     # last document marked, for recovery snapshots
+        self._broken  = False    # a write failed; the next one must be a full snapshot
+
+    def mark(self, data, paths=()):
+        """Record a change. No paths → full snapshot of data."""
+        self._data = data
+        if not paths or self._broken or self.store.needs_compaction():
+            self._full = data
+            self._ops.clear()
+        elif self._full is None:
+            for key, line in self.store.encode_ops(data, paths):
+                # Setting a parent supersedes any pending child writes
+                for k in [k for k in self._ops if k[:len(key)] == key]:
+                    del self._ops[k]
+                self._ops[key] = line
+        self._schedule()
+
+    @property
+    def dirty(self):
+        return self._full is not None or bool(self._ops) or self._broken
+
+    def _schedule(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (startup / shutdown) — write synchronously
+            self.flush()
+            return
+        if self._handle is None:
+            self._handle = loop.call_later(self.delay, self._kick)
+
+    def _take(self):
+        """Detach the pending batch. Must run on the loop thread."""
+        self._handle = None
+        if self._broken and self._full is None:
+            self._full = self._data
+        raw   = self.store.encode_snapshot(self._full) if self._full is not None else None
+        lines = list(self._ops.values())
+        self._full = None
+        self._ops  = {}
+        return raw, lines
+
+    def _write(self, raw, lines):
+        with self._lock:
+            try:
+                if raw is not None:
+                    self.store.write_snapshot(raw)
+                    self._broken = False
+                self.store.write_lines(lines)
+            except Exception as e:
+                # The batch is gone from the queue and the journal may end in a torn
+                # line — only a fresh snapshot (which restarts the journal) recovers
+                self._broken = self._data is not None
+                if hasattr(self.store, "_base_sha"):
+                    self.store._base_sha = None
+                print(f"🚨 Persist write failed — retrying as a full snapshot: {e}")
+
+    def _submit(self, raw, lines):
+        loop = asyncio.get_running_loop()
+
+        def done(_f):
+            if self._broken:
+                try:
+                    loop.call_soon_threadsafe(self._retry)
+                except RuntimeError:
+                    pass  # loop already closed — the exit flush takes over
+
+        self._inflight = self._pool.submit(self._write, raw, lines)
+        self._inflight.add_done_callback(done)
+
+    def _retry(self):
+        if self._broken:
+            self._schedule()
+
+    def _kick(self):
+        if not self.dirty:
+            self._handle = None
+            return
+        self._submit(*self._take())
+
+    def flush(self):
+        """Write everything pending now and wait for the worker."""
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._inflight is not None:
+            self._inflight.result()
+        if self.dirty:
+            self._write(*self._take())
+        self._handle = None
+
+    async def flush_async(self):
+        """Like flush(), but the write runs on the worker thread."""
+        if self._handle is not None:
+            self._handle.cancel()
+        if self.dirty:
+            self._submit(*self._take())
+        self._handle = None
+        if self._inflight is not None:
+            await asyncio.wrap_future(self._inflight)
@@ -0,0 +1,68 @@
+import os
+import re
+import unittest
+import uuid
+
+BOT_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Bot.py")
+
+
+def load_function(name):
+    """Exec one top-level function from Bot.py without importing the bot."""
+    with open(BOT_PY, encoding="utf-8") as f:
+        source = f.read()
+    match = re.search(rf"^def {name}\(.*?(?=^\S)", source, re.S | re.M)
+    ns = {"uuid": uuid}
+    exec(match.group(0), ns)
+    return ns[name]
+
+
+class MigrateMatchHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.migrate = load_function("_migrate_match_history")
+
+    def test_embedded_copies_become_ids(self):
+        m = {"match_id": "a1", "team1": "A", "team2": "B", "score": "2-1", "date": "2024-01-01"}
+        data = {"matches": [dict(m)],
+                "squads": {"A": {"match_history": [dict(m)]}, "B": {"match_history": [dict(m), "a1"]}}}
+        self.migrate(data)
+        self.assertEqual(data["squads"]["A"]["match_history"], ["a1"])
+        self.assertEqual(data["squads"]["B"]["match_history"], ["a1"])
+        self.assertEqual(len(data["matches"]), 1)
+
+    def test_orphan_copies_are_backfilled_in_date_order(self):
+        kept = {"match_id": "k1", "team1": "A", "team2": "C", "score": "1-0", "date": "2024-02-01"}
+        orphan = {"match_id": "o1", "team1": "A", "team2": "B", "score": "0-2", "date": "2024-01-01"}
+        data = {"matches": [dict(kept)],
+                "squads": {"A": {"match_history": [dict(orphan), "k1"]},
+                           "B": {"match_history": [dict(orphan)]}}}
+        self.migrate(data)
+        self.assertEqual([m["match_id"] for m in data["matches"]], ["o1", "k1"])
+        self.assertEqual(data["matches"][0]["score"], "0-2")
+        self.assertEqual(data["squads"]["B"]["match_history"], ["o1"])
+
+    def test_orphan_copies_without_ids_share_one_backfilled_match(self):
+        orphan = {"team1": "A", "team2": "B", "score": "1-1", "date": "2023-05-05"}
+        data = {"squads": {"A": {"match_history": [dict(orphan)]},
+                           "B": {"match_history": [dict(orphan)]}}}
+        self.migrate(data)
+        self.assertEqual(len(data["matches"]), 1)
+        mid = data["matches"][0]["match_id"]
+        self.assertTrue(mid)
+        self.assertEqual(data["squads"]["A"]["match_history"], [mid])
+        self.assertEqual(data["squads"]["B"]["match_history"], [mid])
+
+    def test_history_copies_of_an_id_less_record_reuse_its_id(self):
+        m = {"team1": "A", "team2": "B", "score": "3-1", "date": "2023-04-04"}
+        data = {"matches": [dict(m)],
+                "squads": {"A": {"match_history": [dict(m)]},
+                           "B": {"match_history": [dict(m)]}}}
+        self.migrate(data)
+        self.assertEqual(len(data["matches"]), 1)
+        mid = data["matches"][0]["match_id"]
+        self.assertTrue(mid)
+        self.assertEqual(data["squads"]["A"]["match_history"], [mid])
+        self.assertEqual(data["squads"]["B"]["match_history"], [mid])
+
+
+if __name__ == "__main__":
+    unittest.main()
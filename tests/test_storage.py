@@ -0,0 +1,241 @@
+import asyncio
+import errno
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JournalStore, PersistService, SeasonArchive, SQLiteStore, apply_op
+
+
+class ApplyOpTests(unittest.TestCase):
+    def test_missing_list_parent_is_created_as_list(self):
+        data = {"squads": {}}
+        apply_op(data, {"op": "set", "path": ["predictions", 0], "value": {"id": 1}})
+        self.assertEqual(data["predictions"], [{"id": 1}])
+
+    def test_missing_dict_parent_is_created_as_dict(self):
+        data = {}
+        apply_op(data, {"op": "set", "path": ["bounties", "Alpha"], "value": {"amount": 5}})
+        self.assertEqual(data["bounties"], {"Alpha": {"amount": 5}})
+
+
+class JournalReplayTests(unittest.TestCase):
+    def test_list_key_absent_from_snapshot_replays_as_list(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = JournalStore(os.path.join(tmp, "data.json"))
+            data = {"squads": {}, "matches": []}
+            store.snapshot(data)
+
+            for key in ("predictions", "events", "challenges"):
+                data[key] = [{"id": 1}]
+                store.append(data, [(key, 0)])
+                data[key].append({"id": 2})
+                store.append(data, [(key, 1)])
+
+            loaded = JournalStore(os.path.join(tmp, "data.json")).load()
+            for key in ("predictions", "events", "challenges"):
+                self.assertIsInstance(loaded[key], list)
+                self.assertEqual(loaded[key], [{"id": 1}, {"id": 2}])
+
+    def test_bad_snapshot_checksum_falls_back_to_a_generation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            store = JournalStore(path)
+            store.snapshot({"version": 1})
+            store.snapshot({"version": 2})       # keeps version 1 as a generation
+            with open(path, "wb") as f:
+                f.write(b'{"version": 99}')       # no longer matches its .sha256
+            recovered = JournalStore(path)
+            self.assertEqual(recovered.load(), {"version": 1})
+            self.assertTrue(recovered.needs_compaction())
+
+    def test_replay_stops_at_a_corrupt_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            store = JournalStore(path)
+            data = {"squads": {"A": {"points": 0}}}
+            store.snapshot(data)
+            data["squads"]["A"]["points"] = 1
+            store.append(data, [("squads", "A")])
+            with open(store.journal_path, "a", encoding="utf-8") as f:
+                f.write('deadbeef {"op":"set","path":["squads","A","points"],"value":5}\n')
+            data["squads"]["A"]["points"] = 2
+            store.append(data, [("squads", "A")])
+            self.assertEqual(JournalStore(path).load()["squads"]["A"]["points"], 1)
+
+    def test_journal_from_another_snapshot_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            store = JournalStore(path)
+            store.snapshot({"n": 0})
+            journal = store.journal_path + ".old"
+            store.append({"n": 1}, [("n",)])
+            os.replace(store.journal_path, journal)
+            store.snapshot({"n": 2})
+            os.replace(journal, store.journal_path)
+            self.assertEqual(JournalStore(path).load(), {"n": 2})
+
+
+class PersistServiceTests(unittest.TestCase):
+    def test_burst_of_saves_is_debounced_into_one_coalesced_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            store = JournalStore(path)
+            data = {"squads": {"A": {"points": 0}, "B": {"points": 0}}}
+            store.snapshot(data)
+            batches = []
+            real = store.write_lines
+            store.write_lines = lambda lines: (batches.append(list(lines)), real(lines))
+
+            async def run():
+                svc = PersistService(store, delay=0.05)
+                for points in range(1, 6):
+                    data["squads"]["A"]["points"] = points
+                    svc.mark(data, [("squads", "A")])
+                data["squads"]["B"]["points"] = 7
+                svc.mark(data, [("squads", "B", "points")])
+                svc.mark(data, [("squads", "B")])      # parent supersedes the pending child
+                self.assertEqual(batches, [])          # nothing written inside the window
+                await asyncio.sleep(0.2)
+                await svc.flush_async()
+
+            asyncio.run(run())
+            self.assertEqual(len(batches), 1)
+            self.assertEqual(len(batches[0]), 2)
+            self.assertEqual(JournalStore(path).load(), data)
+
+    def test_no_paths_means_full_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            store = JournalStore(path)
+            store.snapshot({"a": 1})
+            svc = PersistService(store)
+            svc.mark({"b": 2})
+            self.assertEqual(JournalStore(path).load(), {"b": 2})
+            with open(store.journal_path, encoding="utf-8") as f:
+                self.assertEqual(len(f.readlines()), 1)   # header only — journal restarted
+
+
+def fail_once(store, name):
+    """Make store.<name> raise ENOSPC on its next call only."""
+    real = getattr(store, name)
+    calls = []
+
+    def flaky(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return real(*args)
+
+    setattr(store, name, flaky)
+    return calls
+
+
+class PersistFailureTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.json")
+        self.store = JournalStore(self.path)
+        self.data = {"squads": {"A": {"points": 0}}}
+        self.store.snapshot(self.data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_failed_journal_write_is_recovered_by_next_save(self):
+        svc = PersistService(self.store)
+        fail_once(self.store, "write_lines")
+        self.data["squads"]["A"]["points"] = 3
+        svc.mark(self.data, [("squads", "A")])       # no loop → written now, and fails
+        self.assertTrue(svc.dirty)
+        self.data["squads"]["B"] = {"points": 1}
+        svc.mark(self.data, [("squads", "B")])
+        self.assertFalse(svc.dirty)
+        self.assertEqual(JournalStore(self.path).load()["squads"],
+                         {"A": {"points": 3}, "B": {"points": 1}})
+
+    def test_failed_write_is_retried_without_another_save(self):
+        async def run():
+            svc = PersistService(self.store, delay=0.01)
+            fail_once(self.store, "write_lines")
+            self.data["squads"]["A"]["points"] = 3
+            svc.mark(self.data, [("squads", "A")])
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if not svc.dirty and svc._inflight.done():
+                    break
+            return svc
+
+        svc = asyncio.run(run())
+        self.assertFalse(svc.dirty)
+        self.assertEqual(JournalStore(self.path).load()["squads"]["A"]["points"], 3)
+
+
+class SeasonArchiveTests(unittest.TestCase):
+    def test_raw_archive_copies_between_directories(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            src, dst = SeasonArchive(a), SeasonArchive(b)
+            src.write(2, {"matches": [{"match_id": "m1"}]})
+            name = os.path.basename(src.path(2))
+            self.assertEqual(SeasonArchive.number_of("seasons/" + name), 2)
+            dst.write_raw(SeasonArchive.number_of(name), src.read_raw(2))
+            self.assertEqual(dst.numbers(), [2])
+            self.assertEqual(dst.load(2), {"matches": [{"match_id": "m1"}]})
+
+    def test_write_raw_rejects_corrupt_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = SeasonArchive(tmp)
+            with self.assertRaises(Exception):
+                archive.write_raw(1, b"not gzip")
+            self.assertEqual(archive.numbers(), [])
+
+
+class SQLiteStoreTests(unittest.TestCase):
+    def test_persist_service_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.db")
+            svc = PersistService(SQLiteStore(path))
+            data = {"squads": {"A": {"points": 0}}, "players": {}, "matches": [],
+                    "events": [{"id": 1, "registrations": [{"player_id": "7"}]}],
+                    "challenges": [], "predictions": [], "season": {"number": 1}}
+            svc.mark(data)
+            data["squads"]["A"]["points"] = 3
+            data["squads"]["B"] = {"points": 1}
+            data["matches"].append({"match_id": "a1", "team1": "A", "team2": "B"})
+            data["events"][0]["registrations"].append({"player_id": "8"})
+            data["season"]["number"] = 2
+            svc.mark(data, [("squads", "A"), ("squads", "B"), ("matches", 0),
+                            ("events", 0, "registrations"), ("season", "number")])
+            del data["squads"]["B"]
+            svc.mark(data, [("squads", "B")])
+            svc.flush()
+            self.assertEqual(SQLiteStore(path).load(), data)
+
+    def test_json_store_migrates_into_sqlite_and_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "data.json")
+            data = {"squads": {"A": {"points": 2}}, "players": {"1": {"squad": "A"}},
+                    "matches": [{"match_id": "a1", "team1": "A", "team2": "B"}],
+                    "events": [], "challenges": [], "predictions": [], "bounties": {}}
+            journal = JournalStore(json_path)
+            journal.snapshot({"squads": {}, "players": {}, "matches": []})
+            journal.append(data, [("squads",), ("players",), ("matches",), ("events",),
+                                  ("challenges",), ("predictions",), ("bounties",)])
+
+            sqlite = SQLiteStore(os.path.join(tmp, "data.db"), json_path=json_path)
+            imported = sqlite.load()                    # empty DB → JSON snapshot + journal
+            self.assertEqual(imported, data)
+            PersistService(sqlite).mark(imported)
+            from_db = SQLiteStore(os.path.join(tmp, "data.db")).load()
+            self.assertEqual(from_db, data)
+
+            back = JournalStore(os.path.join(tmp, "back.json"))
+            back.write_snapshot(sqlite.encode_snapshot(from_db))
+            self.assertEqual(JournalStore(os.path.join(tmp, "back.json")).load(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()